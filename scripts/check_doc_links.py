@@ -0,0 +1,253 @@
+#!/usr/bin/env python3
+"""
+文档链接检查脚本
+一次遍历为整个文档树建立标题锚点索引（采用GitHub的slug算法，兼容中文与emoji），
+按文件内容哈希缓存，再以 O(链接数) 校验所有相对链接与锚点，可用于 pre-commit
+"""
+
+import os
+import re
+import sys
+import time
+import hashlib
+import argparse
+import unicodedata
+from urllib.parse import unquote
+from typing import List, Dict, Any, Optional, Set, Tuple
+
+from tool_cache import ToolCache, default_cache_root
+
+
+INDEX_VERSION = 1
+# 作为链接来源扫描的文件：docs 目录下全部文档 + 仓库根目录的 Markdown
+SOURCE_DIRS = ["docs"]
+ATX_HEADING_PATTERN = re.compile(r'^ {0,3}(#{1,6})[ \t]+(.*?)(?:[ \t]+#+)?[ \t]*$')
+FENCE_PATTERN = re.compile(r'^ {0,3}(`{3,}|~{3,})')
+INLINE_LINK_PATTERN = re.compile(r'!?\[(?:[^\[\]]|\[[^\[\]]*\])*\]\(\s*(<[^>]*>|[^\s)]*(?:\([^\s)]*\)[^\s)]*)*)(?:\s+["\'(].*?["\')])?\s*\)')
+REFERENCE_PATTERN = re.compile(r'^ {0,3}\[[^\]]+\]:\s*(<[^>]*>|\S+)')
+HTML_ANCHOR_PATTERN = re.compile(r'<a\s[^>]*?(?:name|id)\s*=\s*["\']([^"\']+)["\']', re.IGNORECASE)
+INLINE_CODE_PATTERN = re.compile(r'(`+)(?:(?!\1).)+?\1')
+EXTERNAL_PATTERN = re.compile(r'^[a-zA-Z][a-zA-Z0-9+.-]*:|^//')
+
+# 渲染标题文本前需要剥离的行内标记
+MARKUP_PATTERNS = [
+    (re.compile(r'!\[([^\]]*)\]\([^)]*\)'), r'\1'),
+    (re.compile(r'\[([^\]]*)\]\([^)]*\)'), r'\1'),
+    (re.compile(r'\[([^\]]*)\]\[[^\]]*\]'), r'\1'),
+    (re.compile(r'<[^>]+>'), ''),
+    (re.compile(r'`([^`]*)`'), r'\1'),
+    (re.compile(r'(\*\*|__)(.+?)\1'), r'\2'),
+    (re.compile(r'(\*|_)(.+?)\1'), r'\2'),
+    (re.compile(r'~~(.+?)~~'), r'\1'),
+]
+
+
+def github_slug(text: str) -> str:
+    """GitHub 标题锚点算法（github-slugger）：转小写，去除标点与符号（含emoji），空格替换为连字符"""
+    for pattern, replacement in MARKUP_PATTERNS:
+        text = pattern.sub(replacement, text)
+    slug = []
+    for char in text.strip().lower():
+        if char in ' -_':
+            slug.append('-' if char == ' ' else char)
+        elif char in '\u200d\ufe0f':
+            continue
+        elif unicodedata.category(char)[0] in 'LNM':
+            slug.append(char)
+    return ''.join(slug)
+
+
+class HeadingAnchors:
+    """按出现顺序为文档标题分配锚点，与GitHub一致：重复标题依次追加 -1、-2 ..."""
+
+    def __init__(self):
+        self.seen = {}
+
+    def next(self, heading_text: str) -> str:
+        slug = github_slug(heading_text)
+        if slug not in self.seen:
+            self.seen[slug] = 0
+            return slug
+        self.seen[slug] += 1
+        anchor = f"{slug}-{self.seen[slug]}"
+        while anchor in self.seen:
+            self.seen[slug] += 1
+            anchor = f"{slug}-{self.seen[slug]}"
+        self.seen[anchor] = 0
+        return anchor
+
+
+def extract_anchors_and_links(content: str) -> Tuple[List[str], List[Tuple[int, str]]]:
+    """提取文档中的锚点（按出现顺序去重编号）与链接（行号, 目标）"""
+    anchors = []
+    links = []
+    heading_anchors = HeadingAnchors()
+    fence = None
+
+    for line_number, line in enumerate(content.split('\n'), 1):
+        fence_match = FENCE_PATTERN.match(line)
+        if fence:
+            if fence_match and fence_match.group(1)[0] == fence[0] and len(fence_match.group(1)) >= len(fence):
+                fence = None
+            continue
+        if fence_match:
+            fence = fence_match.group(1)
+            continue
+
+        heading = ATX_HEADING_PATTERN.match(line)
+        if heading:
+            anchors.append(heading_anchors.next(heading.group(2)))
+
+        anchors.extend(HTML_ANCHOR_PATTERN.findall(line))
+
+        code_free = INLINE_CODE_PATTERN.sub('', line)
+        for match in INLINE_LINK_PATTERN.finditer(code_free):
+            links.append((line_number, match.group(1)))
+        reference = REFERENCE_PATTERN.match(code_free)
+        if reference:
+            links.append((line_number, reference.group(1)))
+
+    return anchors, links
+
+
+class LinkIndex:
+    """标题锚点与链接的索引，按文件内容哈希增量更新"""
+
+    CACHE_NAMESPACE = 'link-index'
+
+    def __init__(self, root: str, cache: Optional[ToolCache] = None):
+        self.root = os.path.abspath(root)
+        # 每个文件的锚点与链接是共享缓存中的一个条目，只检查部分文件时不影响其他文件的条目
+        self.cache = cache
+        self.entries = {}
+        self.stats = {'parsed': 0, 'cached': 0}
+
+    def _cache_key(self, rel_path: str, digest: str) -> str:
+        # 只用仓库内相对路径与内容摘要，仓库移动或在其他目录检出后缓存仍然命中
+        return f"v{INDEX_VERSION}:{rel_path}:{digest}"
+
+    def source_files(self) -> List[str]:
+        """需要检查的Markdown文件（相对路径）"""
+        files = [name for name in os.listdir(self.root) if name.endswith('.md')]
+        for source_dir in SOURCE_DIRS:
+            for dirpath, _, filenames in os.walk(os.path.join(self.root, source_dir)):
+                for filename in filenames:
+                    if filename.endswith('.md'):
+                        files.append(os.path.relpath(os.path.join(dirpath, filename), self.root))
+        return sorted(path.replace(os.sep, '/') for path in files)
+
+    def get(self, rel_path: str) -> Optional[Dict[str, Any]]:
+        """读取单个文件的索引条目，内容哈希未变化时复用缓存"""
+        if rel_path in self.entries:
+            return self.entries[rel_path]
+        try:
+            with open(os.path.join(self.root, rel_path), 'rb') as f:
+                data = f.read()
+        except (FileNotFoundError, IsADirectoryError):
+            return None
+
+        digest = hashlib.sha256(data).hexdigest()
+        entry = self.cache.get(self.CACHE_NAMESPACE, self._cache_key(rel_path, digest)) if self.cache else None
+        if entry is not None:
+            self.stats['cached'] += 1
+        else:
+            self.stats['parsed'] += 1
+            anchors, links = extract_anchors_and_links(data.decode('utf-8', 'replace'))
+            entry = {'anchors': anchors, 'links': links}
+            if self.cache:
+                self.cache.put(self.CACHE_NAMESPACE, self._cache_key(rel_path, digest), entry)
+        self.entries[rel_path] = entry
+        return entry
+
+    def anchors(self, rel_path: str) -> Optional[Set[str]]:
+        entry = self.get(rel_path)
+        if entry is None:
+            return None
+        if 'anchorSet' not in entry:
+            entry['anchorSet'] = set(entry['anchors'])
+        return entry['anchorSet']
+
+
+class LinkChecker:
+    def __init__(self, root: str = ".", cache: Optional[ToolCache] = None):
+        self.index = LinkIndex(root, cache)
+        self.root = self.index.root
+
+    def _resolve(self, source: str, target: str) -> Tuple[Optional[str], Optional[str]]:
+        """把链接目标解析为 (仓库内相对路径, 锚点)，外部链接返回 (None, None)"""
+        if target.startswith('<') and target.endswith('>'):
+            target = target[1:-1]
+        if not target or EXTERNAL_PATTERN.match(target):
+            return None, None
+
+        path, _, fragment = target.partition('#')
+        path = unquote(path.split('?')[0])
+        fragment = unquote(fragment)
+        if not path:
+            return source, fragment
+        if path.startswith('/'):
+            resolved = path.lstrip('/')
+        else:
+            resolved = os.path.normpath(os.path.join(os.path.dirname(source), path))
+        return resolved.replace(os.sep, '/'), fragment
+
+    def check_file(self, rel_path: str) -> List[Dict[str, Any]]:
+        """检查单个文件中的全部链接"""
+        problems = []
+        entry = self.index.get(rel_path)
+        if entry is None:
+            return problems
+
+        for line_number, target in entry['links']:
+            resolved, fragment = self._resolve(rel_path, target)
+            if resolved is None:
+                continue
+            full_path = os.path.join(self.root, resolved)
+            if resolved.startswith('..') or not os.path.exists(full_path):
+                problems.append({'file': rel_path, 'line': line_number, 'target': target, 'reason': '目标文件不存在'})
+                continue
+            if not fragment or not resolved.endswith('.md'):
+                continue
+            anchors = self.index.anchors(resolved)
+            if fragment not in anchors and fragment.lower() not in anchors:
+                problems.append({'file': rel_path, 'line': line_number, 'target': target, 'reason': f'锚点 #{fragment} 不存在'})
+        return problems
+
+    def check(self, files: Optional[List[str]] = None) -> List[Dict[str, Any]]:
+        """检查指定文件（默认全部文档）中的链接"""
+        targets = files if files else self.index.source_files()
+        problems = []
+        for rel_path in targets:
+            if rel_path.endswith('.md'):
+                problems.extend(self.check_file(rel_path.replace(os.sep, '/')))
+        return problems
+
+
+def main():
+    parser = argparse.ArgumentParser(description='检查文档中的相对链接与标题锚点')
+    parser.add_argument('files', nargs='*', help='只检查这些文件中的链接（pre-commit 传入暂存文件），锚点索引仍覆盖整个文档树')
+    parser.add_argument('--root', default='.', help='仓库根目录')
+    parser.add_argument('--no-cache', action='store_true', help='不读写锚点索引缓存')
+    args = parser.parse_args()
+
+    started = time.perf_counter()
+    cache = None if args.no_cache else ToolCache(default_cache_root(args.root))
+    checker = LinkChecker(args.root, cache)
+    problems = checker.check([os.path.relpath(os.path.abspath(f), checker.root) for f in args.files])
+    elapsed = (time.perf_counter() - started) * 1000
+    if cache:
+        cache.record_stats('check_doc_links')
+
+    for problem in problems:
+        print(f"{problem['file']}:{problem['line']}: {problem['target']} - {problem['reason']}")
+
+    stats = checker.index.stats
+    summary = f"检查 {len(checker.index.entries)} 个文件（解析 {stats['parsed']}，缓存 {stats['cached']}），耗时 {elapsed:.0f}ms"
+    if problems:
+        print(f"❌ 发现 {len(problems)} 个失效链接，{summary}")
+        sys.exit(1)
+    print(f"✅ 未发现失效链接，{summary}")
+
+
+if __name__ == "__main__":
+    main()
@@ -7,40 +7,75 @@ GitHub Issues 自动创建脚本
 import os
 import json
 import sys
-from github import Github
-from typing import List, Dict, Any
+import time
+import random
+from datetime import datetime, timezone
+from github import Github, GithubException
+from typing import List, Dict, Any, Optional
 
+from github_http_cache import GitHubHttpClient, HttpCache, ConnectionPool, RateLimitBudget, RateLimitExhausted
+from tool_cache import ToolCache, default_cache_root
+from parse_tasks import TaskBodyLoader
+from sync_scheduler import SyncScheduler, schedule_key
+from sync_journal import SyncJournal, TASK_ID_MARKER, default_journal_dir, derive_task_id
 
-class GitHubIssueCreator:
-    def __init__(self, token: str, repo_name: str):
-        self.github = Github(token)
-        self.repo = self.github.get_repo(repo_name)
-        self.label_cache = set()
-        self._initialize_labels()
-        
-    def _initialize_labels(self):
-        """初始化标签缓存"""
-        try:
-            labels = self.repo.get_labels()
-            for label in labels:
-                self.label_cache.add(label.name)
-        except Exception as e:
-            print(f"警告: 无法获取现有标签: {e}")
-            
-    def _create_label_if_not_exists(self, label_name: str, color: str = "0075ca", description: str = ""):
-        """如果标签不存在则创建标签"""
-        if label_name not in self.label_cache:
-            try:
-                self.repo.create_label(
-                    name=label_name,
-                    color=color,
-                    description=description
-                )
-                self.label_cache.add(label_name)
-                print(f"已创建标签: {label_name}")
-            except Exception as e:
-                print(f"警告: 无法创建标签 {label_name}: {e}")
-                
+
+# 单个操作的最大尝试次数与退避基数（秒）
+MAX_ATTEMPTS = 4
+RETRY_BASE_DELAY = 2
+# 触发速率限制时最多等待的秒数，超过则留到下次运行
+MAX_RATE_LIMIT_WAIT = 300
+# 子任务的同步方式：checklist 渲染为父Issue正文中的任务清单，sub-issues 同步为子Issue
+SUB_TASK_MODES = ('checklist', 'sub-issues')
+
+
+# 自动创建/更新的Issue正文末尾的标记
+AUTO_CREATED_MARKER = "<!-- 此Issue由自动化脚本创建/更新 -->"
+
+
+def format_issue_title(task: Dict[str, Any], phase: str) -> str:
+    """生成任务对应的Issue标题（双向同步依赖此格式匹配Issue与任务）"""
+    clean_phase = phase.split('[')[0].strip()
+    clean_phase = clean_phase.replace('🔴', '').replace('🟡', '').replace('🟢', '').strip()
+    title = f"[{clean_phase}] {task.get('title', '未命名任务')}"
+    if len(title) > 250:  # GitHub标题限制
+        title = title[:247] + "..."
+    return title
+
+
+class IssueFormatter:
+    """Issue标题、正文与标签的格式化（不访问网络，可供离线同步计划复用）"""
+    
+    def __init__(self, docs_path: str = "docs", sub_task_mode: Optional[str] = None):
+        # 任务正文字段只在渲染Issue正文时按字节范围从文档中提取
+        self.body_loader = TaskBodyLoader(docs_path)
+        self.sub_task_mode = sub_task_mode or os.environ.get('SUBTASK_SYNC_MODE') or 'checklist'
+        if self.sub_task_mode not in SUB_TASK_MODES:
+            raise ValueError(f"未知的子任务同步方式: {self.sub_task_mode}（可选: {', '.join(SUB_TASK_MODES)}）")
+    
+    def _load_task(self, task: Dict[str, Any], phase: Optional[str] = None) -> Dict[str, Any]:
+        """补充从文档中按需提取的正文字段（给出 phase 时，缺少来源的任务按阶段文档中的同名任务提取）"""
+        if task.get('source') or phase:
+            return dict(self.body_loader.load(task, phase), **task)
+        return task
+    
+    def _format_sub_tasks(self, sub_tasks: List[Dict[str, Any]]) -> str:
+        """子任务渲染为任务清单（按所在分组输出小标题）；同步为子Issue时只输出完成情况"""
+        body = "## 子任务\n\n"
+        if self.sub_task_mode == 'sub-issues':
+            done = sum(1 for sub_task in sub_tasks if sub_task['checked'])
+            return body + f"以子Issue跟踪，已完成 {done}/{len(sub_tasks)}\n\n"
+        lines = []
+        group = None
+        for sub_task in sub_tasks:
+            if sub_task.get('group') and sub_task['group'] != group:
+                lines.extend(([""] if lines else []) + [f"**{sub_task['group']}**", ""])
+            group = sub_task.get('group')
+            lines.append(f"- [{'x' if sub_task['checked'] else ' '}] {sub_task['title']}")
+            for item in sub_task.get('items', []):
+                lines.append(f"  - [{'x' if item['checked'] else ' '}] {item['title']}")
+        return body + '\n'.join(lines) + "\n\n"
+    
     def _get_priority_labels(self, priority: str) -> List[str]:
         """根据优先级返回标签"""
         # 从文档中的符号映射到标签
@@ -68,8 +103,10 @@ class GitHubIssueCreator:
         }
         return status_map.get(status, ['status-pending'])
         
-    def _format_task_body(self, task: Dict[str, Any], phase: str) -> str:
-        """格式化任务内容为Issue正文"""
+    def _format_task_body(self, task: Dict[str, Any], phase: str, phase_status: Optional[str] = None) -> str:
+        """格式化任务内容为Issue正文（phase_status 为 phases 中该阶段的状态，阶段优先级记录在其中）"""
+        task = self._load_task(task)
+        
         body = f"# {task.get('title', '未命名任务')}\n\n"
         
         # 添加状态信息
@@ -82,7 +119,7 @@ class GitHubIssueCreator:
         # 添加阶段信息
         body += f"## 阶段信息\n\n"
         body += f"- **所属阶段**: {phase}\n"
-        body += f"- **优先级**: {self._extract_priority_from_phase(phase)}\n\n"
+        body += f"- **优先级**: {self._extract_priority_from_phase(phase_status or phase)}\n\n"
         
         # 添加任务描述（如果存在）
         if task.get('description'):
@@ -92,6 +129,10 @@ class GitHubIssueCreator:
         if task.get('implementation_logic'):
             body += f"## 实现逻辑\n\n{task['implementation_logic']}\n\n"
         
+        # 添加子任务清单（如果存在）
+        if task.get('sub_tasks'):
+            body += self._format_sub_tasks(task['sub_tasks'])
+        
         # 添加验收标准（如果存在）
         if task.get('acceptance_criteria'):
             body += "## 验收标准\n\n"
@@ -124,7 +165,8 @@ class GitHubIssueCreator:
         
         # 添加自动创建标识
         body += "---\n"
-        body += "<!-- 此Issue由自动化脚本创建/更新 -->\n"
+        body += AUTO_CREATED_MARKER + "\n"
+        body += TASK_ID_MARKER.format(task_id=task.get('id') or derive_task_id(task, phase)) + "\n"
         
         return body
     
@@ -139,13 +181,13 @@ class GitHubIssueCreator:
         else:
             return "🟡 中优先级"
         
-    def _get_labels_for_task(self, task: Dict[str, Any], phase: str) -> List[str]:
-        """为任务获取标签"""
+    def _compute_labels(self, task: Dict[str, Any], phase: str, phase_status: Optional[str] = None) -> List[str]:
+        """为任务计算标签（不访问网络）"""
         # 准备标签
         labels = ["task", "automated"]
         
         # 添加优先级标签（从阶段信息中提取）
-        priority = self._extract_priority_from_phase(phase)
+        priority = self._extract_priority_from_phase(phase_status or phase)
         labels.extend(self._get_priority_labels(priority))
         
         # 添加状态标签
@@ -159,89 +201,335 @@ class GitHubIssueCreator:
         if clean_phase:
             labels.append(f"phase-{clean_phase}")
             
+        return labels
+    
+    @staticmethod
+    def _clean_label(label: str) -> str:
+        """标准化标签名（移除特殊字符，转换为小写）"""
+        return label.lower().replace(' ', '-').replace('/', '-').replace('[', '').replace(']', '')
+
+
+class GitHubIssueCreator(IssueFormatter):
+    def __init__(self, token: str, repo_name: str, cache: Optional[ToolCache] = None, docs_path: str = "docs",
+                 project_root: Optional[str] = None, github: Optional[Github] = None,
+                 pool: Optional[ConnectionPool] = None, budget: Optional[RateLimitBudget] = None,
+                 sub_task_mode: Optional[str] = None):
+        super().__init__(docs_path, sub_task_mode)
+        # 批量同步多个仓库时，PyGithub客户端、连接池与速率额度由调用方共享传入
+        self.project_root = project_root or os.getcwd()
+        self.github = github or Github(token)
+        # 写操作走PyGithub，lazy避免额外的仓库读取请求
+        self.repo = self.github.get_repo(repo_name, lazy=True)
+        self.repo_name = repo_name
+        self.budget = budget
+        # 所有读取都经过带ETag条件请求缓存的客户端，响应存放在共享缓存中
+        self.cache = cache or ToolCache(default_cache_root(self.project_root))
+        self.http = GitHubHttpClient(token, HttpCache(self.cache), pool=pool, budget=budget)
+        self.label_cache = set()
+        self.snapshot = None
+        # 基于当前快照的同步规划器，同一次同步中复用，避免每个任务都重建标题索引
+        self.planner = None
+        self._initialize_labels()
+        
+    def _initialize_labels(self):
+        """初始化标签缓存"""
+        try:
+            for label in self.http.paginate(f"/repos/{self.repo_name}/labels"):
+                self.label_cache.add(label['name'])
+        except Exception as e:
+            print(f"警告: 无法获取现有标签: {e}")
+    
+    def fetch_remote_snapshot(self) -> Dict[str, Any]:
+        """读取全部Issue与标签，生成供离线同步计划使用的远程快照"""
+        issues = []
+        # 按创建时间升序分页，新Issue只会追加到末页，其余页保持304命中
+        params = {'state': 'all', 'sort': 'created', 'direction': 'asc'}
+        for issue in self.http.paginate(f"/repos/{self.repo_name}/issues", params):
+            if 'pull_request' in issue:
+                continue
+            issues.append({
+                'number': issue['number'],
+                'title': issue['title'],
+                'state': issue['state'],
+                'body': issue.get('body') or '',
+                'labels': [label['name'] for label in issue.get('labels', [])],
+                'html_url': issue['html_url'],
+                'node_id': issue.get('node_id'),
+                'updated_at': issue.get('updated_at')
+            })
+        self.snapshot = {
+            'repository': self.repo_name,
+            'fetchedAt': datetime.now(timezone.utc).isoformat(),
+            'labels': sorted(self.label_cache),
+            'issues': issues
+        }
+        self.planner = None
+        return self.snapshot
+            
+    def _create_label_if_not_exists(self, label_name: str, color: str = "0075ca", description: str = ""):
+        """如果标签不存在则创建标签"""
+        if label_name not in self.label_cache:
+            try:
+                self.repo.create_label(
+                    name=label_name,
+                    color=color,
+                    description=description
+                )
+                self.label_cache.add(label_name)
+                print(f"已创建标签: {label_name}")
+            except Exception as e:
+                print(f"警告: 无法创建标签 {label_name}: {e}")
+                
+    def _get_labels_for_task(self, task: Dict[str, Any], phase: str, phase_status: Optional[str] = None) -> List[str]:
+        """为任务获取标签"""
+        labels = self._compute_labels(task, phase, phase_status)
+            
         # 确保标签存在
         for label in labels:
-            # 标准化标签名（移除特殊字符，转换为小写）
-            clean_label = label.lower().replace(' ', '-').replace('/', '-').replace('[', '').replace(']', '')
-            self._create_label_if_not_exists(clean_label)
+            self._create_label_if_not_exists(self._clean_label(label))
             
         return labels
         
-    def create_or_update_issue(self, task: Dict[str, Any], phase: str) -> str:
+    def create_or_update_issue(self, task: Dict[str, Any], phase: str, phase_status: Optional[str] = None) -> str:
         """创建或更新Issue"""
-        # 格式化标题
-        clean_phase = phase.split('[')[0].strip()
-        clean_phase = clean_phase.replace('🔴', '').replace('🟡', '').replace('🟢', '').strip()
-        title = f"[{clean_phase}] {task.get('title', '未命名任务')}"
-        if len(title) > 250:  # GitHub标题限制
-            title = title[:247] + "..."
-            
-        # 格式化内容
-        body = self._format_task_body(task, phase)
+        if self.snapshot is None:
+            self.fetch_remote_snapshot()
+        self._get_labels_for_task(task, phase, phase_status)
+        planner = self._get_planner()
+        planner.reset_claims()
+        operation = planner.plan_task(task, phase, phase_status=phase_status)
+        return self.execute_operation(operation)
+    
+    def _get_planner(self):
+        """当前快照对应的同步规划器（标题索引每次同步只构建一次）"""
+        from sync_planner import SyncPlanner
         
-        # 获取标签
-        labels = self._get_labels_for_task(task, phase)
+        if self.planner is None or self.planner.snapshot is not self.snapshot:
+            self.planner = SyncPlanner(self, self.snapshot)
+        return self.planner
+    
+    def _apply_operation(self, operation: Dict[str, Any], journal: Optional[SyncJournal]) -> tuple:
+        """向GitHub提交单个操作，失败时抛出异常，返回 (Issue编号, Issue链接)"""
+        title = operation['title']
+        key = operation.get('idempotencyKey')
         
-        try:
-            # 检查是否已存在相同标题的Issue
-            existing_issues = self.repo.get_issues(state='all')
-            existing_issue = None
-            for issue in existing_issues:
-                if issue.title == title:
-                    existing_issue = issue
-                    break
-                    
-            if existing_issue:
-                # 更新已存在的Issue
-                existing_issue.edit(
-                    body=body,
-                    labels=labels
-                )
-                print(f"已更新Issue: {title}")
-                
-                # 如果任务已完成，关闭Issue
-                if "✅" in task.get('status', '') or "已完成" in task.get('status', ''):
-                    existing_issue.edit(state='closed')
-                    print(f"已关闭Issue: {title}")
-                
-                return existing_issue.html_url
-            else:
+        if operation['action'] == 'create':
+            created = journal.result(key) if journal else {}
+            issue = None
+            if created.get('number') is not None:
+                # 上次运行已创建但未完成后续步骤，直接复用；该Issue已被删除时重新创建
+                try:
+                    issue = self.repo.get_issue(created['number'])
+                except GithubException as e:
+                    if e.status not in (404, 410):
+                        raise
+                    print(f"上次创建的Issue #{created['number']} 已不存在，重新创建: {title}")
+            if issue is None:
                 # 创建新的Issue
                 issue = self.repo.create_issue(
                     title=title,
-                    body=body,
-                    labels=labels
+                    body=operation['body'],
+                    labels=operation['labels']
                 )
                 print(f"已创建Issue: {title}")
-                
-                # 如果任务已完成，关闭Issue
-                if "✅" in task.get('status', '') or "已完成" in task.get('status', ''):
-                    issue.edit(state='closed')
-                    print(f"已关闭Issue: {title}")
-                
-                return issue.html_url
+                created = {'number': issue.number, 'url': issue.html_url}
+                if journal:
+                    journal.created(key, issue.number, issue.html_url)
             
-        except Exception as e:
-            print(f"处理Issue失败: {title} - {e}")
-            return f"处理失败: {e}"
+            # 如果任务已完成，关闭Issue
+            if operation['state'] == 'closed':
+                issue.edit(state='closed')
+                print(f"已关闭Issue: {title}")
+            return created['number'], created['url']
+        
+        # 更新已存在的Issue，只提交有变化的字段
+        changes = operation['changes']
+        fields = {}
+        if 'title' in changes:
+            fields['title'] = title
+        if 'body' in changes:
+            fields['body'] = operation['body']
+        if 'labels' in changes:
+            fields['labels'] = operation['labels']
+        if 'state' in changes:
+            fields['state'] = operation['state']
+        self.repo.get_issue(operation['number']).edit(**fields)
+        print(f"已{'关闭' if operation['action'] == 'close' else '更新'}Issue: {title}")
+        return operation['number'], operation['url']
+    
+    @staticmethod
+    def _retry_delay(error: Exception, attempt: int) -> Optional[float]:
+        """计算重试等待时间，不可重试的错误返回None"""
+        if isinstance(error, RateLimitExhausted):
+            return None
+        status = getattr(error, 'status', None)
+        headers = {k.lower(): v for k, v in (getattr(error, 'headers', None) or {}).items()}
+        if status in (403, 429):
+            if headers.get('retry-after'):
+                return float(headers['retry-after'])
+            if headers.get('x-ratelimit-remaining') == '0' and headers.get('x-ratelimit-reset'):
+                wait = int(headers['x-ratelimit-reset']) - time.time() + 1
+                # 等待时间过长时留给下次运行继续
+                return max(wait, 1) if wait <= MAX_RATE_LIMIT_WAIT else None
+        elif status is not None and status < 500:
+            return None
+        elif status is None and not isinstance(error, OSError):
+            # 非网络错误（如数据问题）重试也无济于事
+            return None
+        return RETRY_BASE_DELAY * 2 ** (attempt - 1) + random.uniform(0, 1)
+    
+    @staticmethod
+    def _is_permanent_error(error: Exception) -> bool:
+        """Issue不存在/已删除、请求校验失败等客户端错误，后续运行重试也不会成功（限流与权限错误除外）"""
+        status = getattr(error, 'status', None)
+        return status is not None and 400 <= status < 500 and status not in (403, 429)
+    
+    def _find_created_issue(self, operation: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """上次运行在创建请求发出后中断时，在最近创建的Issue中查找是否已经创建成功"""
+        marker = TASK_ID_MARKER.format(task_id=operation['taskId'])
+        params = {'state': 'all', 'sort': 'created', 'direction': 'desc', 'per_page': 50}
+        recent, _ = self.http.get(f"/repos/{self.repo_name}/issues", params)
+        for issue in recent or []:
+            if marker in (issue.get('body') or '') or issue['title'] == operation['title']:
+                return issue
+        return None
+    
+    def execute_operation(self, operation: Dict[str, Any], journal: Optional[SyncJournal] = None) -> str:
+        """执行同步计划中的单个操作（按幂等键跳过已完成的操作，失败时退避重试），返回Issue链接"""
+        title = operation['title']
+        if operation['action'] == 'noop':
+            return operation['url']
+        
+        key = operation.get('idempotencyKey')
+        if journal and journal.is_completed(key):
+            print(f"跳过已完成的操作: {title}")
+            operation['number'] = operation['number'] or journal.result(key).get('number')
+            return journal.result(key).get('url') or operation['url']
+        if journal and journal.is_abandoned(key):
+            print(f"跳过已放弃的操作: {title}")
+            return "已放弃"
+        
+        # 上次尝试在创建请求发出后中断时，请求可能已经成功，先确认再决定是否创建
+        uncertain = journal is not None and journal.status(key) in ('started', 'failed', 'abandoned')
+        for attempt in range(1, MAX_ATTEMPTS + 1):
+            if journal and operation['action'] == 'create' and (uncertain or attempt > 1) \
+                    and journal.result(key).get('number') is None:
+                existing = self._find_created_issue(operation)
+                if existing:
+                    print(f"发现已创建的Issue #{existing['number']}: {title}")
+                    journal.created(key, existing['number'], existing['html_url'])
+            if journal:
+                journal.started(key)
+            try:
+                if self.budget:
+                    self.budget.acquire(title)
+                number, url = self._apply_operation(operation, journal)
+            except Exception as e:
+                delay = self._retry_delay(e, attempt)
+                if delay is None or attempt == MAX_ATTEMPTS:
+                    if journal and journal.failed(key, str(e), self._is_permanent_error(e)):
+                        print(f"处理Issue失败，已放弃: {title} - {e}")
+                        return f"处理失败（已放弃）: {e}"
+                    print(f"处理Issue失败: {title} - {e}")
+                    return f"处理失败: {e}"
+                print(f"处理Issue失败，{delay:.0f} 秒后重试（第 {attempt} 次）: {title} - {e}")
+                time.sleep(delay)
+                continue
+            
+            if journal:
+                journal.completed(key, number, url)
+            # 新建的Issue编号供子Issue挂接使用
+            operation['number'] = number
+            self._record_issue(operation, number, url)
+            return url
+    
+    def _record_issue(self, operation: Dict[str, Any], number: int, url: str):
+        """把执行结果写回远程快照，保证快照与远程一致"""
+        issues = self.snapshot['issues']
+        entry = next((issue for issue in issues if issue['number'] == number), None)
+        if entry is None:
+            entry = {'number': number, 'title': operation['title'], 'html_url': url, 'node_id': None}
+            issues.append(entry)
+        previous_title = entry['title']
+        entry.update({
+            'title': operation['title'],
+            'state': operation['state'],
+            'body': operation['body'],
+            'labels': list(operation['labels']),
+            'updated_at': datetime.now(timezone.utc).isoformat()
+        })
+        self._index_issue(entry, previous_title)
+    
+    def _index_issue(self, entry: Dict[str, Any], previous_title: Optional[str] = None):
+        """快照中的Issue新建或改名后，同步更新复用中的规划器索引"""
+        if self.planner is not None and self.planner.snapshot is self.snapshot:
+            self.planner.index_issue(entry, previous_title)
+    
+    def execute_plan(self, plan: Dict[str, Any], journal: Optional[SyncJournal] = None,
+                     scheduler: Optional[SyncScheduler] = None) -> List[str]:
+        """
+        按同步计划执行：先创建缺失的标签，再按调度顺序在时间与请求额度内执行Issue操作，最后批量同步有变化的子Issue。
+        额度用尽时推迟的操作在同步日志中保持未完成，下次运行从检查点继续
+        """
+        from sub_issue_sync import SubIssueSync
+        
+        scheduler = scheduler or SyncScheduler.from_env(self.budget)
+        for label in plan['labelsToCreate']:
+            self._create_label_if_not_exists(label)
+        
+        operations = plan['operations']
+        urls = [None] * len(operations)
+        pending = []
+        for position, operation in enumerate(operations):
+            if operation['action'] == 'noop' or (journal and journal.is_settled(operation['idempotencyKey'])):
+                urls[position] = self.execute_operation(operation, journal)
+            else:
+                pending.append(position)
+        for position in sorted(pending, key=lambda position: schedule_key(operations[position])):
+            operation = operations[position]
+            if not scheduler.admit(operation):
+                urls[position] = "已推迟到下次运行"
+                continue
+            urls[position] = self.execute_operation(operation, journal)
+            scheduler.done()
+        if pending:
+            print(scheduler.summary())
+        if any(operation.get('subIssues') for operation in operations):
+            if scheduler.exhausted:
+                print("⏸ 额度已用尽，子Issue同步推迟到下次运行")
+            else:
+                sub_sync = SubIssueSync(self, journal)
+                sub_sync.run(plan)
+                print(sub_sync.summary())
+        return urls
             
     def create_issues_from_docs(self, json_file: str) -> List[str]:
         """从docs中的JSON文件创建Issues"""
+        from sync_planner import default_snapshot_file, save_snapshot, render_text
+        from sub_issue_sync import sub_issue_operations
+        from plan_stream import iter_phase_details
+        
         try:
-            with open(json_file, 'r', encoding='utf-8') as f:
-                data = json.load(f)
-                
-            issue_urls = []
+            journal = SyncJournal(default_journal_dir(self.project_root))
+            snapshot = self.fetch_remote_snapshot()
+            resume = journal.pending_plan() is not None
+            if resume:
+                # 上次运行中断或有推迟的操作：继续同一次运行，但按当前文档与远程状态重新生成计划，
+                # 本次运行中已完成的操作按幂等键跳过
+                print(f"♻️ 发现未完成的同步（{journal.run_id}），按当前文档重新计划并继续")
+            # 逐个阶段流式读取计划文件，只保留生成同步计划所需的任务（阶段之前的字段写入 data）
+            data = {}
+            data['phaseDetails'] = iter_phase_details(json_file, data)
             
-            # 遍历所有阶段的详细任务
-            for phase_detail in data.get('phaseDetails', []):
-                phase = phase_detail.get('phase', '')
-                tasks = phase_detail.get('tasks', [])
-                
-                for task in tasks:
-                    url = self.create_or_update_issue(task, phase)
-                    issue_urls.append(url)
-                
+            # 先生成计划，再按计划执行，与离线dry-run的结果完全一致
+            plan = self._get_planner().plan(data)
+            journal.begin(plan, resume=resume)
+            print(render_text(plan, verbose=False))
+            issue_urls = self.execute_plan(plan, journal)
+            journal.finish(plan['operations'] + sub_issue_operations(plan))
+            
+            save_snapshot(self.snapshot, default_snapshot_file(self.project_root))
+            print(self.http.summary())
             return issue_urls
             
         except FileNotFoundError:
@@ -288,6 +576,7 @@ def main():
         json_file = sys.argv[1]
         
     urls = creator.create_issues_from_docs(json_file)
+    creator.cache.record_stats('create_github_issues')
     
     print(f"\n处理了 {len(urls)} 个Issues:")
     for url in urls:
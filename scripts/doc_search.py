@@ -0,0 +1,271 @@
+#!/usr/bin/env python3
+"""
+文档全文搜索
+以标题划分的章节为检索单位，对 docs/ 建立持久化倒排索引：中文按二元组切分，英文按单词切分，
+BM25 排序，结果带章节锚点。索引存放在共享缓存中，每次查询前只重新解析修改过的文件
+"""
+
+import os
+import re
+import json
+import math
+import time
+import hashlib
+import argparse
+from typing import List, Dict, Any, Optional
+
+from check_doc_links import FENCE_PATTERN, ATX_HEADING_PATTERN, HeadingAnchors
+from tool_cache import ToolCache, default_cache_root
+
+
+INDEX_VERSION = 1
+CACHE_NAMESPACE = 'search-index'
+# 英文单词（含数字）或连续的中日韩字符
+TOKEN_PATTERN = re.compile(r'[a-z0-9]+|[\u3400-\u4dbf\u4e00-\u9fff\uf900-\ufaff]+')
+# 标题中的词元按该权重计入词频
+HEADING_WEIGHT = 2
+BM25_K1 = 1.2
+BM25_B = 0.75
+SNIPPET_LENGTH = 80
+
+
+def tokenize(text: str) -> List[str]:
+    """英文按单词切分，中文按相邻二元组切分（单个汉字保留为一元组）"""
+    tokens = []
+    for run in TOKEN_PATTERN.findall(text.lower()):
+        if run[0] < '\u3400':
+            tokens.append(run)
+        elif len(run) == 1:
+            tokens.append(run)
+        else:
+            tokens.extend(run[index:index + 2] for index in range(len(run) - 1))
+    return tokens
+
+
+def split_sections(content: str) -> List[Dict[str, Any]]:
+    """按 ATX 标题把文档切分为章节（代码块内的 # 不视为标题），第一个标题之前的内容锚点为空"""
+    sections = [{'anchor': '', 'heading': '', 'line': 1, 'lines': []}]
+    anchors = HeadingAnchors()
+    fence = None
+    for line_number, line in enumerate(content.split('\n'), 1):
+        fence_match = FENCE_PATTERN.match(line)
+        if fence:
+            if fence_match and fence_match.group(1)[0] == fence[0] and len(fence_match.group(1)) >= len(fence):
+                fence = None
+        elif fence_match:
+            fence = fence_match.group(1)
+        else:
+            heading = ATX_HEADING_PATTERN.match(line)
+            if heading:
+                sections.append({'anchor': anchors.next(heading.group(2)), 'heading': heading.group(2).strip(),
+                                 'line': line_number, 'lines': []})
+                continue
+        sections[-1]['lines'].append(line)
+    return [section for section in sections if section['heading'] or any(line.strip() for line in section['lines'])]
+
+
+def section_terms(section: Dict[str, Any]) -> Dict[str, int]:
+    terms = {}
+    for token in tokenize(section['heading']):
+        terms[token] = terms.get(token, 0) + HEADING_WEIGHT
+    for token in tokenize('\n'.join(section['lines'])):
+        terms[token] = terms.get(token, 0) + 1
+    return terms
+
+
+class SearchIndex:
+    """
+    倒排索引：词元 -> {章节键: 词频}，章节键为 "文档路径#序号"。
+    每个文件记录修改时间、大小与内容哈希，以及各章节的锚点、长度和词元，文件变化时只替换该文件的章节
+    """
+
+    def __init__(self, project_root: str = ".", cache: Optional[ToolCache] = None):
+        self.project_root = os.path.abspath(project_root)
+        self.docs_dir = os.path.join(self.project_root, "docs")
+        self.cache = cache
+        self.stats = {'parsed': 0, 'removed': 0}
+        self.data = self._load()
+        self._dirty = False
+
+    def _cache_key(self) -> str:
+        # 不含仓库的绝对路径：索引中每个文件都记录了内容哈希，换目录检出后只重新解析内容变化的文件
+        docs_path = os.path.relpath(self.docs_dir, self.project_root).replace(os.sep, '/')
+        return f"v{INDEX_VERSION}:{docs_path}"
+
+    def _load(self) -> Dict[str, Any]:
+        data = self.cache.get(CACHE_NAMESPACE, self._cache_key()) if self.cache else None
+        return data or {'files': {}, 'postings': {}, 'totalLength': 0}
+
+    def save(self):
+        if self.cache and self._dirty:
+            self.cache.put(CACHE_NAMESPACE, self._cache_key(), self.data)
+
+    def doc_files(self) -> List[str]:
+        files = []
+        for dirpath, _, filenames in os.walk(self.docs_dir):
+            for filename in filenames:
+                if filename.endswith('.md'):
+                    files.append(os.path.relpath(os.path.join(dirpath, filename), self.project_root).replace(os.sep, '/'))
+        return sorted(files)
+
+    def _remove_file(self, path: str):
+        entry = self.data['files'].pop(path)
+        postings = self.data['postings']
+        for index, section in enumerate(entry['sections']):
+            key = f"{path}#{index}"
+            for term in section['terms']:
+                documents = postings.get(term)
+                if documents is not None:
+                    documents.pop(key, None)
+                    if not documents:
+                        del postings[term]
+            self.data['totalLength'] -= section['length']
+
+    def _add_file(self, path: str, stat: os.stat_result, digest: str, content: str):
+        postings = self.data['postings']
+        sections = []
+        for index, section in enumerate(split_sections(content)):
+            terms = section_terms(section)
+            key = f"{path}#{index}"
+            for term, frequency in terms.items():
+                postings.setdefault(term, {})[key] = frequency
+            length = sum(terms.values())
+            self.data['totalLength'] += length
+            sections.append({
+                'anchor': section['anchor'],
+                'heading': section['heading'],
+                'line': section['line'],
+                'end': section['line'] + len(section['lines']) - (0 if section['heading'] else 1),
+                'length': length,
+                'terms': sorted(terms)
+            })
+        self.data['files'][path] = {'mtime': stat.st_mtime_ns, 'size': stat.st_size, 'hash': digest, 'sections': sections}
+
+    def update(self) -> int:
+        """同步索引与磁盘上的文档：修改时间与大小都未变化的文件不读取，内容哈希未变化的文件不重新解析"""
+        current = self.doc_files()
+        for path in set(self.data['files']) - set(current):
+            self._remove_file(path)
+            self.stats['removed'] += 1
+            self._dirty = True
+        for path in current:
+            full_path = os.path.join(self.project_root, path)
+            stat = os.stat(full_path)
+            entry = self.data['files'].get(path)
+            if entry and entry['mtime'] == stat.st_mtime_ns and entry['size'] == stat.st_size:
+                continue
+            with open(full_path, 'rb') as f:
+                data = f.read()
+            digest = hashlib.sha1(data).hexdigest()
+            if entry and entry['hash'] == digest:
+                entry['mtime'], entry['size'] = stat.st_mtime_ns, stat.st_size
+                self._dirty = True
+                continue
+            if entry:
+                self._remove_file(path)
+            self._add_file(path, stat, digest, data.decode('utf-8', 'replace'))
+            self.stats['parsed'] += 1
+            self._dirty = True
+        self.save()
+        return self.stats['parsed'] + self.stats['removed']
+
+    def section_count(self) -> int:
+        return sum(len(entry['sections']) for entry in self.data['files'].values())
+
+    def search(self, query: str, limit: int = 10) -> List[Dict[str, Any]]:
+        """BM25 排序，返回 [{'path', 'anchor', 'heading', 'line', 'score', 'snippet'}]"""
+        terms = set(tokenize(query))
+        total = self.section_count()
+        if not terms or not total:
+            return []
+        average_length = self.data['totalLength'] / total
+        scores = {}
+        for term in terms:
+            documents = self.data['postings'].get(term)
+            if not documents:
+                continue
+            idf = math.log(1 + (total - len(documents) + 0.5) / (len(documents) + 0.5))
+            for key, frequency in documents.items():
+                path, index = key.rsplit('#', 1)
+                length = self.data['files'][path]['sections'][int(index)]['length']
+                norm = frequency + BM25_K1 * (1 - BM25_B + BM25_B * length / average_length)
+                scores[key] = scores.get(key, 0) + idf * frequency * (BM25_K1 + 1) / norm
+
+        results = []
+        for key, score in sorted(scores.items(), key=lambda item: (-item[1], item[0]))[:limit]:
+            path, index = key.rsplit('#', 1)
+            section = self.data['files'][path]['sections'][int(index)]
+            results.append({
+                'path': path,
+                'anchor': section['anchor'],
+                'heading': section['heading'],
+                'line': section['line'],
+                'score': round(score, 3),
+                'snippet': self._snippet(path, section, terms)
+            })
+        return results
+
+    def _snippet(self, path: str, section: Dict[str, Any], terms: set) -> str:
+        """章节中第一个包含查询词元的正文行"""
+        try:
+            with open(os.path.join(self.project_root, path), 'r', encoding='utf-8', errors='replace') as f:
+                lines = f.read().split('\n')[section['line'] - 1:section['end']]
+        except FileNotFoundError:
+            return ''
+        for line in lines[1:] if section['heading'] else lines:
+            if terms & set(tokenize(line)):
+                text = line.strip()
+                return text if len(text) <= SNIPPET_LENGTH else text[:SNIPPET_LENGTH] + '……'
+        return ''
+
+
+def format_results(query: str, results: List[Dict[str, Any]]) -> str:
+    lines = []
+    for rank, result in enumerate(results, 1):
+        location = f"{result['path']}#{result['anchor']}" if result['anchor'] else f"{result['path']}:{result['line']}"
+        lines.append(f"{rank:>2}. {location}  ({result['score']})")
+        if result['heading']:
+            lines.append(f"    {result['heading']}")
+        if result['snippet']:
+            lines.append(f"    {result['snippet']}")
+    return '\n'.join(lines)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='文档全文搜索（中文二元组 + 英文单词，BM25 排序）')
+    parser.add_argument('--root', default='.', help='仓库根目录')
+    parser.add_argument('--no-cache', action='store_true', help='不读写持久化索引')
+    subparsers = parser.add_subparsers(dest='command', required=True)
+    search_parser = subparsers.add_parser('search', help='搜索文档章节')
+    search_parser.add_argument('query', nargs='+', help='查询词，如 "refresh token" 或 告警')
+    search_parser.add_argument('-n', '--limit', type=int, default=10, help='最多返回的结果数')
+    search_parser.add_argument('--json', action='store_true', help='以JSON格式输出')
+    subparsers.add_parser('index', help='只更新索引并输出统计')
+    args = parser.parse_args()
+
+    cache = None if args.no_cache else ToolCache(default_cache_root(args.root))
+    started = time.perf_counter()
+    index = SearchIndex(args.root, cache)
+    updated = index.update()
+    indexed = time.perf_counter()
+
+    if args.command == 'index':
+        print(f"✅ 索引 {len(index.data['files'])} 个文档、{index.section_count()} 个章节、{len(index.data['postings'])} 个词元"
+              f"（重新解析 {index.stats['parsed']}，移除 {index.stats['removed']}），耗时 {(indexed - started) * 1000:.0f}ms")
+    else:
+        query = ' '.join(args.query)
+        results = index.search(query, args.limit)
+        searched = time.perf_counter()
+        if args.json:
+            print(json.dumps(results, ensure_ascii=False, indent=2))
+        else:
+            print(f"🔍 \"{query}\"：{len(results)} 个结果（更新 {updated} 个文件 {(indexed - started) * 1000:.0f}ms，"
+                  f"查询 {(searched - indexed) * 1000:.1f}ms）")
+            if results:
+                print(format_results(query, results))
+    if cache:
+        cache.record_stats('doc_search')
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,236 @@
+#!/usr/bin/env python3
+"""
+文档统计脚本
+在线程池中并行统计 docs/ 下每个 Markdown 文件的英文单词数、中文字符数、标题、代码块、链接与 TODO 数量，
+用一次 `git log` 获取所有文件的最后修改提交以标记过时文档；统计结果按 blob 哈希缓存，
+内容没有变化时不重写 docs/doc-stats.md
+"""
+
+import os
+import re
+import time
+import hashlib
+import argparse
+import threading
+import subprocess
+from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Dict, Any, Optional
+
+from check_doc_links import FENCE_PATTERN, INLINE_LINK_PATTERN, REFERENCE_PATTERN, ATX_HEADING_PATTERN, INLINE_CODE_PATTERN
+from git_access import GitRepository
+from tool_cache import ToolCache, default_cache_root
+
+
+STATS_VERSION = 1
+STATS_FILE = "doc-stats.md"
+DEFAULT_STALE_DAYS = 90
+WORD_PATTERN = re.compile(r'[A-Za-z][A-Za-z0-9\'-]*')
+CJK_PATTERN = re.compile(r'[\u3400-\u4dbf\u4e00-\u9fff\uf900-\ufaff]')
+TODO_PATTERN = re.compile(r'\b(?:TODO|FIXME)\b|待完成|待办')
+GENERATED_AT_PATTERN = re.compile(r'^> 生成时间: .*$', re.MULTILINE)
+METRICS = [
+    ('words', '英文单词'),
+    ('cjkChars', '中文字符'),
+    ('headings', '标题'),
+    ('codeBlocks', '代码块'),
+    ('links', '链接'),
+    ('todos', 'TODO')
+]
+
+
+def git_blob_hash(data: bytes) -> str:
+    """与 `git hash-object` 相同的 blob 哈希，无需调用 git"""
+    return hashlib.sha1(b"blob %d\0" % len(data) + data).hexdigest()
+
+
+def compute_stats(content: str) -> Dict[str, int]:
+    """统计单个文档（代码块内的内容只计入代码块数量）"""
+    stats = {key: 0 for key, _ in METRICS}
+    fence = None
+    for line in content.split('\n'):
+        fence_match = FENCE_PATTERN.match(line)
+        if fence:
+            if fence_match and fence_match.group(1)[0] == fence[0] and len(fence_match.group(1)) >= len(fence):
+                fence = None
+            continue
+        if fence_match:
+            fence = fence_match.group(1)
+            stats['codeBlocks'] += 1
+            continue
+
+        if ATX_HEADING_PATTERN.match(line):
+            stats['headings'] += 1
+        text = INLINE_CODE_PATTERN.sub('', line)
+        stats['links'] += len(INLINE_LINK_PATTERN.findall(text)) + bool(REFERENCE_PATTERN.match(text))
+        stats['words'] += len(WORD_PATTERN.findall(text))
+        stats['cjkChars'] += len(CJK_PATTERN.findall(text))
+        stats['todos'] += len(TODO_PATTERN.findall(line))
+    return stats
+
+
+class DocStatsEngine:
+    CACHE_NAMESPACE = 'doc-stats'
+
+    def __init__(self, project_root: str = ".", cache: Optional[ToolCache] = None, workers: int = 8):
+        self.project_root = os.path.abspath(project_root)
+        self.docs_dir = os.path.join(self.project_root, "docs")
+        # 统计结果按 blob 哈希存放在共享缓存中，相同内容的文档（包括其他项目中的）只统计一次
+        self.cache = cache
+        self.workers = workers
+        self.stats = {'parsed': 0, 'cached': 0}
+        self._lock = threading.Lock()
+
+    def doc_files(self) -> List[str]:
+        """docs/ 下的 Markdown 文件（相对仓库根目录），不含统计页本身"""
+        files = []
+        for dirpath, _, filenames in os.walk(self.docs_dir):
+            for filename in filenames:
+                if filename.endswith('.md'):
+                    path = os.path.relpath(os.path.join(dirpath, filename), self.project_root).replace(os.sep, '/')
+                    if path != f"docs/{STATS_FILE}":
+                        files.append(path)
+        return sorted(files)
+
+    def _analyze(self, path: str) -> Dict[str, Any]:
+        with open(os.path.join(self.project_root, path), 'rb') as f:
+            data = f.read()
+        blob = git_blob_hash(data)
+        key = f"v{STATS_VERSION}:{blob}"
+        cached = self.cache.get(self.CACHE_NAMESPACE, key) if self.cache else None
+        hit = cached is not None
+        if not hit:
+            cached = compute_stats(data.decode('utf-8', 'replace'))
+            if self.cache:
+                self.cache.put(self.CACHE_NAMESPACE, key, cached)
+        with self._lock:
+            self.stats['cached' if hit else 'parsed'] += 1
+        return {'path': path, 'blob': blob, 'size': len(data), **cached}
+
+    def last_modified(self, paths: List[str]) -> Dict[str, int]:
+        """一次 `git log` 从新到旧遍历，记录每个文件第一次出现的提交时间，全部找到后提前结束"""
+        remaining = set(paths)
+        result = {}
+        process = subprocess.Popen(
+            ['git', '-c', 'core.quotepath=off', 'log', '--name-only', '--no-renames', '--format=%x00%ct', '--', 'docs'],
+            cwd=self.project_root, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL, text=True, encoding='utf-8'
+        )
+        timestamp = None
+        try:
+            for line in process.stdout:
+                line = line.rstrip('\n')
+                if line.startswith('\x00'):
+                    timestamp = int(line[1:])
+                elif line in remaining:
+                    result[line] = timestamp
+                    remaining.discard(line)
+                    if not remaining:
+                        break
+        finally:
+            process.kill()
+            process.wait()
+        return result
+
+    def collect(self, stale_days: int = DEFAULT_STALE_DAYS) -> List[Dict[str, Any]]:
+        """
+        并行统计所有文档并补充最后修改时间（未提交的文件没有该字段）。
+        浅克隆只加深到覆盖过时判断的时间窗口：窗口外修改的文档记为边界提交的时间，同样会被判为过时
+        """
+        paths = self.doc_files()
+        with ThreadPoolExecutor(max_workers=self.workers) as executor:
+            files = list(executor.map(self._analyze, paths))
+        GitRepository(self.project_root).ensure_since(time.time() - stale_days * 86400)
+        modified = self.last_modified(paths)
+        for entry in files:
+            if entry['path'] in modified:
+                entry['lastModified'] = modified[entry['path']]
+        return files
+
+
+def render_stats_page(files: List[Dict[str, Any]], stale_days: int = DEFAULT_STALE_DAYS,
+                      now: Optional[float] = None) -> str:
+    now = now or time.time()
+    totals = {key: sum(entry[key] for entry in files) for key, _ in METRICS}
+    stale = [entry for entry in files if 'lastModified' in entry and now - entry['lastModified'] > stale_days * 86400]
+    by_directory = {}
+    for entry in files:
+        directory = os.path.dirname(entry['path'])
+        summary = by_directory.setdefault(directory, {'files': 0, 'words': 0, 'cjkChars': 0})
+        summary['files'] += 1
+        summary['words'] += entry['words']
+        summary['cjkChars'] += entry['cjkChars']
+
+    lines = [
+        "# 文档统计报告",
+        "",
+        f"> 生成时间: {datetime.fromtimestamp(now).strftime('%Y/%m/%d %H:%M:%S')}",
+        "",
+        "## 📊 总体统计",
+        "",
+        f"- **文档总数**: {len(files)}",
+        f"- **总大小**: {sum(entry['size'] for entry in files) / 1024:.2f} KB",
+    ]
+    lines.extend(f"- **{label}**: {totals[key]}" for key, label in METRICS)
+    lines.append(f"- **过时文档**: {len(stale)} 个（超过 {stale_days} 天未修改）")
+
+    lines.extend(["", "## 📂 按目录统计", "", "| 目录 | 文件数 | 英文单词 | 中文字符 |", "|------|--------|----------|----------|"])
+    for directory, summary in sorted(by_directory.items()):
+        lines.append(f"| {directory} | {summary['files']} | {summary['words']} | {summary['cjkChars']} |")
+
+    if stale:
+        lines.extend(["", "## ⏰ 过时文档", ""])
+        for entry in sorted(stale, key=lambda item: item['lastModified']):
+            days = int((now - entry['lastModified']) // 86400)
+            lines.append(f"- [{entry['path']}]({os.path.relpath(entry['path'], 'docs')}) - {days} 天未修改")
+
+    lines.extend(["", "## 📋 文档列表", "",
+                  "| 文档 | " + " | ".join(label for _, label in METRICS) + " | 最后修改 |",
+                  "|------|" + "------|" * len(METRICS) + "----------|"])
+    for entry in files:
+        modified = datetime.fromtimestamp(entry['lastModified']).strftime('%Y-%m-%d') if 'lastModified' in entry else '未提交'
+        values = " | ".join(str(entry[key]) for key, _ in METRICS)
+        lines.append(f"| [{entry['path']}]({os.path.relpath(entry['path'], 'docs')}) | {values} | {modified} |")
+    return '\n'.join(lines) + '\n'
+
+
+def write_if_changed(path: str, content: str) -> bool:
+    """忽略生成时间后内容没有变化时不重写文件，避免无意义的提交"""
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            existing = f.read()
+    except FileNotFoundError:
+        existing = None
+    if existing is not None and GENERATED_AT_PATTERN.sub('', existing) == GENERATED_AT_PATTERN.sub('', content):
+        return False
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write(content)
+    return True
+
+
+def main():
+    parser = argparse.ArgumentParser(description='统计文档并生成 docs/doc-stats.md')
+    parser.add_argument('--root', default='.', help='仓库根目录')
+    parser.add_argument('--stale-days', type=int, default=DEFAULT_STALE_DAYS, help='超过多少天未修改视为过时')
+    parser.add_argument('--workers', type=int, default=8, help='并行统计的线程数')
+    parser.add_argument('--no-cache', action='store_true', help='不读写统计缓存')
+    args = parser.parse_args()
+
+    started = time.perf_counter()
+    cache = None if args.no_cache else ToolCache(default_cache_root(args.root))
+    engine = DocStatsEngine(args.root, cache, args.workers)
+    files = engine.collect(args.stale_days)
+    output = os.path.join(engine.docs_dir, STATS_FILE)
+    changed = write_if_changed(output, render_stats_page(files, args.stale_days))
+    elapsed = (time.perf_counter() - started) * 1000
+    if cache:
+        cache.record_stats('doc_stats')
+
+    summary = f"{len(files)} 个文档（解析 {engine.stats['parsed']}，缓存 {engine.stats['cached']}），耗时 {elapsed:.0f}ms"
+    if changed:
+        print(f"✅ 已更新 {output}：{summary}")
+    else:
+        print(f"ℹ️ 文档统计没有变化，未重写 {output}：{summary}")
+
+
+if __name__ == "__main__":
+    main()
@@ -10,6 +10,14 @@ import argparse
 import subprocess
 from typing import Optional
 
+from tool_cache import ToolCache, default_cache_root, format_usage
+from parse_tasks import PHASE_FILES
+from pipeline_stages import StageRunner, StageInputs
+from sync_journal import default_journal_dir
+
+PLAN_FILE = os.path.join("docs", "project-plan-structured.json")
+CHANGELOG_FILE = os.path.join("docs", "development", "changelog.md")
+
 # 执行子脚本
 def run_script(script_path: str, env_vars: dict = None) -> bool:
     try:
@@ -34,15 +42,53 @@ def run_script(script_path: str, env_vars: dict = None) -> bool:
         print(f"执行脚本 {script_path} 失败: {e}")
         return False
 
+# 声明各阶段的输入与输出，输入没有变化的阶段跳过
+def stage_definitions(base_dir: str) -> dict:
+    phase_files = [os.path.join("docs", file_name) for file_name in PHASE_FILES.values()]
+    checkpoint = os.path.join(default_journal_dir(base_dir), "checkpoint.json")
+    return {
+        "parse": {
+            "script": "parse_tasks.py",
+            "inputs": lambda env: StageInputs(base_dir).files(PLAN_FILE, *phase_files).scripts(),
+            "outputs": [PLAN_FILE]
+        },
+        "issues": {
+            "script": "create_github_issues.py",
+            "inputs": lambda env: StageInputs(base_dir).files(PLAN_FILE, *phase_files).scripts()
+                .env("SUBTASK_SYNC_MODE").value("repository", env.get("GITHUB_REPOSITORY")),
+            "outputs": [],
+            # 有推迟或失败的操作时检查点会保留，下次必须重新运行
+            "succeeded": lambda ok: ok and not os.path.exists(checkpoint)
+        },
+        "changelog": {
+            "script": "update_dev_changelog.py",
+            "inputs": lambda env: StageInputs(base_dir).files(PLAN_FILE).scripts().git("HEAD"),
+            "outputs": [CHANGELOG_FILE]
+        }
+    }
+
+# 执行一个阶段
+def run_stage(stages: StageRunner, definitions: dict, name: str, base_dir: str, env: dict) -> bool:
+    definition = definitions[name]
+    script_path = os.path.join(base_dir, "scripts", definition["script"])
+    return stages.run(name, definition["inputs"](env), definition["outputs"], lambda: run_script(script_path, env),
+                      definition.get("succeeded", bool))
+
 # 主函数
-def main(mode: str, token: Optional[str] = None):
+def main(mode: str, token: Optional[str] = None, force: bool = False):
     base_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    stages = StageRunner(base_dir, force=force)
+    definitions = stage_definitions(base_dir)
     
     # 设置环境变量
     env = {
         "PYTHONPATH": base_dir
     }
     
+    # 所有子脚本共用一个缓存目录，运行结束后按大小上限淘汰最久未使用的条目
+    cache = ToolCache(os.path.abspath(default_cache_root(base_dir)))
+    env["DOC_TOOLS_CACHE_DIR"] = cache.root
+    
     if token:
         env["GITHUB_TOKEN"] = token
         env["GITHUB_REPOSITORY"] = os.environ.get("GITHUB_REPOSITORY", "your-username/your-repo")
@@ -54,19 +100,19 @@ def main(mode: str, token: Optional[str] = None):
         success = True
         
         # 解析任务
-        if not run_script(os.path.join(base_dir, "scripts", "parse_tasks.py"), env):
+        if not run_stage(stages, definitions, "parse", base_dir, env):
             print("警告：任务解析失败，继续执行下一步")
             success = False
         
         # 创建GitHub Issues
-        if "GITHUB_TOKEN" in env and not run_script(os.path.join(base_dir, "scripts", "create_github_issues.py"), env):
+        if "GITHUB_TOKEN" in env and not run_stage(stages, definitions, "issues", base_dir, env):
             print("警告：GitHub Issues创建失败，继续执行下一步")
             success = False
         elif "GITHUB_TOKEN" not in env:
             print("跳过GitHub Issues创建：未提供GITHUB_TOKEN")
         
         # 更新Changelog
-        if not run_script(os.path.join(base_dir, "scripts", "update_dev_changelog.py"), env):
+        if not run_stage(stages, definitions, "changelog", base_dir, env):
             print("警告：Changelog更新失败")
             success = False
         
@@ -77,7 +123,7 @@ def main(mode: str, token: Optional[str] = None):
         print("同步任务信息...")
         success = True
         
-        if not run_script(os.path.join(base_dir, "scripts", "parse_tasks.py"), env):
+        if not run_stage(stages, definitions, "parse", base_dir, env):
             print("警告：任务解析失败，继续执行下一步")
             success = False
         
@@ -90,7 +136,7 @@ def main(mode: str, token: Optional[str] = None):
     elif mode == "changelog":
         # 仅更新Changelog
         print("更新Changelog...")
-        if not run_script(os.path.join(base_dir, "scripts", "update_dev_changelog.py"), env):
+        if not run_stage(stages, definitions, "changelog", base_dir, env):
             print("警告：Changelog更新失败")
         else:
             print("Changelog更新完成")
@@ -111,10 +157,18 @@ def main(mode: str, token: Optional[str] = None):
         print(f"未知模式: {mode}")
         print("可用模式: full, tasks, changelog, bidirectional")
         sys.exit(1)
+    
+    if stages.stats['run'] or stages.stats['skipped']:
+        print(stages.summary())
+    evicted = cache.prune()
+    if evicted:
+        print(f"缓存超过大小上限，已淘汰 {evicted} 个最久未使用的条目")
+    print(format_usage(cache))
 
 if __name__ == "__main__":
     parser = argparse.ArgumentParser(description="文档同步主控制脚本")
     parser.add_argument("mode", choices=["full", "tasks", "changelog", "bidirectional"], help="同步模式")
     parser.add_argument("--token", help="GitHub令牌")
+    parser.add_argument("--force", action="store_true", help="忽略阶段输入指纹，所有阶段重新运行")
     args = parser.parse_args()
-    main(args.mode, args.token)
\ No newline at end of file
+    main(args.mode, args.token, args.force)
\ No newline at end of file
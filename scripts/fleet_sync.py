@@ -0,0 +1,146 @@
+#!/usr/bin/env python3
+"""
+批量（fleet）同步
+在共享的线程池上并发处理多个项目根目录，所有项目共用一个速率额度、一个HTTP连接池、
+一个PyGithub客户端和一个任务解析缓存；单个项目失败不影响其他项目，最后输出汇总
+"""
+
+import io
+import os
+import sys
+import json
+import time
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import List, Dict, Any, Optional, Callable
+
+from github import Github
+
+from github_http_cache import ConnectionPool, RateLimitBudget
+from parse_tasks import TaskScanCache
+from tool_cache import ToolCache, default_cache_root
+
+
+class SharedResources:
+    """fleet 内所有项目共享的资源"""
+
+    def __init__(self, token: Optional[str] = None, workers: int = 4, cache: Optional[ToolCache] = None):
+        self.token = token
+        # 解析缓存写入共享磁盘缓存，扫描结果跨运行保留
+        self.cache = cache or ToolCache(default_cache_root())
+        self.scan_cache = TaskScanCache(self.cache)
+        self.pool = ConnectionPool(max_idle_per_host=workers)
+        self.budget = RateLimitBudget()
+        self.github = Github(token, pool_size=workers) if token else None
+
+    def close(self):
+        self.pool.close()
+        self.cache.record_stats('fleet_sync')
+        if self.github is not None:
+            self.github.close()
+
+
+class _ThreadOutput(io.TextIOBase):
+    """按线程分流的标准输出：工作线程的输出写入各自的缓冲区，其余线程照常输出"""
+
+    def __init__(self, target):
+        self.target = target
+        self.local = threading.local()
+
+    def capture(self) -> io.StringIO:
+        self.local.buffer = io.StringIO()
+        return self.local.buffer
+
+    def release(self):
+        self.local.buffer = None
+
+    def write(self, text: str) -> int:
+        buffer = getattr(self.local, 'buffer', None)
+        return (buffer or self.target).write(text)
+
+    def flush(self):
+        self.target.flush()
+
+
+def load_fleet_config(path: str) -> Dict[str, Any]:
+    """
+    读取 fleet 配置：
+    {"workers": 4, "projects": [{"root": "../repo-a", "repository": "org/repo-a", "mode": "full-sync"}]}
+    相对路径的 root 以配置文件所在目录为基准
+    """
+    with open(path, 'r', encoding='utf-8') as f:
+        config = json.load(f)
+    base_dir = os.path.dirname(os.path.abspath(path))
+    for project in config.get('projects', []):
+        project['root'] = os.path.normpath(os.path.join(base_dir, project.get('root', '.')))
+    return config
+
+
+class FleetRunner:
+    def __init__(self, projects: List[Dict[str, Any]], manager_factory: Callable[[Dict[str, Any], SharedResources], Any],
+                 resources: SharedResources, workers: int = 4, default_mode: str = 'full-sync'):
+        self.projects = projects
+        self.manager_factory = manager_factory
+        self.resources = resources
+        self.workers = max(1, workers)
+        self.default_mode = default_mode
+
+    def _run_project(self, project: Dict[str, Any], output: _ThreadOutput) -> Dict[str, Any]:
+        """在失败边界内处理单个项目，异常（包括 sys.exit）只记录在该项目的结果中"""
+        mode = project.get('mode') or self.default_mode
+        result = {
+            'root': project['root'],
+            'repository': project.get('repository'),
+            'mode': mode,
+            'status': 'failed',
+            'result': None,
+            'error': None
+        }
+        buffer = output.capture()
+        started = time.perf_counter()
+        try:
+            manager = self.manager_factory(project, self.resources)
+            result['result'] = manager.run_mode(mode)
+            if result['result'] is not None:
+                result['status'] = 'ok'
+        except SystemExit as e:
+            result['error'] = f"进程退出（{e.code}）"
+        except Exception as e:
+            result['error'] = f"{type(e).__name__}: {e}"
+        finally:
+            result['seconds'] = round(time.perf_counter() - started, 2)
+            result['log'] = buffer.getvalue()
+            output.release()
+        return result
+
+    def run(self) -> List[Dict[str, Any]]:
+        """并发处理所有项目，每个项目完成后整块输出其日志"""
+        output = _ThreadOutput(sys.stdout)
+        sys.stdout = output
+        results = []
+        try:
+            with ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix='fleet') as executor:
+                futures = [executor.submit(self._run_project, project, output) for project in self.projects]
+                for future in as_completed(futures):
+                    result = future.result()
+                    name = result['repository'] or result['root']
+                    print(f"\n===== {name}（{result['mode']}，{result['seconds']}s） =====")
+                    print(result['log'].rstrip())
+                    results.append(result)
+        finally:
+            sys.stdout = output.target
+        return results
+
+    def summary(self, results: List[Dict[str, Any]]) -> str:
+        """汇总所有项目的执行结果与共享资源的使用情况"""
+        failed = [result for result in results if result['status'] != 'ok']
+        lines = [f"📦 批量同步完成：{len(results) - len(failed)}/{len(results)} 个项目成功"]
+        for result in sorted(results, key=lambda item: item['root']):
+            mark = '✅' if result['status'] == 'ok' else '❌'
+            detail = result['error'] or ('返回空结果' if result['result'] is None else f"结果 {result['result']}")
+            lines.append(f"  {mark} {result['repository'] or '-'} @ {result['root']}（{result['mode']}，{result['seconds']}s）: {detail}")
+        cache_stats = self.resources.scan_cache.stats
+        lines.append(f"  解析缓存命中 {cache_stats['hits']} 次，未命中 {cache_stats['misses']} 次")
+        if self.resources.budget.remaining is not None:
+            lines.append(f"  共享速率额度剩余 {self.resources.budget.remaining}")
+        return '\n'.join(lines)
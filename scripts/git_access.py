@@ -0,0 +1,172 @@
+#!/usr/bin/env python3
+"""
+浅克隆感知的Git访问
+CI 只需要深度为 1 的检出：读取历史前先确认所需的提交（增量游标、提交区间起点）或时间窗口已在本地，
+不在时才用 `git fetch --deepen` / `--shallow-since` 按需加深，完整克隆时不做任何拉取
+"""
+
+import os
+import sys
+import argparse
+import subprocess
+from datetime import datetime, timezone
+from typing import List, Optional, Tuple
+
+
+# 首次加深的提交数，之后每次翻倍
+DEFAULT_DEEPEN = 50
+
+
+class GitRepository:
+    def __init__(self, project_root: str = ".", remote: Optional[str] = None, initial_deepen: int = DEFAULT_DEEPEN):
+        self.project_root = project_root
+        self._remote = remote
+        self.initial_deepen = initial_deepen
+        self.stats = {'fetches': 0}
+
+    def _git(self, *args: str) -> subprocess.CompletedProcess:
+        return subprocess.run(['git', *args], cwd=self.project_root, capture_output=True, text=True)
+
+    def is_shallow(self) -> bool:
+        result = self._git('rev-parse', '--is-shallow-repository')
+        return result.returncode == 0 and result.stdout.strip() == 'true'
+
+    def remote(self) -> Optional[str]:
+        """拉取使用的远程仓库，默认 origin（不存在时取第一个）"""
+        if self._remote is None:
+            remotes = self._git('remote').stdout.split()
+            self._remote = 'origin' if 'origin' in remotes else (remotes[0] if remotes else '')
+        return self._remote or None
+
+    def shallow_boundary(self) -> List[str]:
+        """浅克隆边界上的提交（历史在这些提交处被截断）"""
+        result = self._git('rev-parse', '--git-path', 'shallow')
+        path = os.path.join(self.project_root, result.stdout.strip())
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                return f.read().split()
+        except FileNotFoundError:
+            return []
+
+    def _commit_time(self, revision: str) -> Optional[int]:
+        result = self._git('show', '-s', '--format=%ct', revision)
+        return int(result.stdout.strip()) if result.returncode == 0 and result.stdout.strip() else None
+
+    def _fetch(self, *args: str) -> bool:
+        remote = self.remote()
+        if not remote:
+            return False
+        self.stats['fetches'] += 1
+        result = self._git('fetch', '--quiet', '--no-tags', remote, *args)
+        if result.returncode != 0:
+            print(f"⚠️ 警告: git fetch {' '.join(args)} 失败 - {result.stderr.strip()}", file=sys.stderr)
+        return result.returncode == 0
+
+    def _deepen_until(self, satisfied) -> bool:
+        """按 50、100、200…… 个提交逐步加深，直到条件满足或历史已完整"""
+        depth = self.initial_deepen
+        while not satisfied():
+            if not self.is_shallow() or not self._fetch(f'--deepen={depth}'):
+                return satisfied()
+            depth *= 2
+        return True
+
+    def unshallow(self) -> bool:
+        """需要完整历史时（没有增量游标）拉取全部提交"""
+        if not self.is_shallow():
+            return True
+        return self._fetch('--unshallow')
+
+    def covers_since(self, timestamp: float) -> bool:
+        """本地历史是否覆盖从 timestamp 至今的时间窗口：完整克隆，或所有边界提交都不晚于该时间"""
+        if not self.is_shallow():
+            return True
+        times = [self._commit_time(sha) for sha in self.shallow_boundary()]
+        return all(time is not None and time <= timestamp for time in times)
+
+    def ensure_since(self, timestamp: float) -> bool:
+        """
+        保证时间窗口内的提交都在本地：先用 --shallow-since 拉取窗口内的历史，
+        再多加深一个提交使边界早于窗口，之后的运行无需再次拉取
+        """
+        if self.covers_since(timestamp):
+            return True
+        since = datetime.fromtimestamp(timestamp, timezone.utc).strftime('%Y-%m-%dT%H:%M:%SZ')
+        if self._fetch(f'--shallow-since={since}'):
+            self._fetch('--deepen=1')
+        return self._deepen_until(lambda: self.covers_since(timestamp))
+
+    def _reachable(self, revision: str, head: str) -> bool:
+        resolved = self._git('rev-parse', '--verify', '-q', f'{revision}^{{commit}}')
+        if resolved.returncode != 0:
+            return False
+        return self._git('merge-base', '--is-ancestor', resolved.stdout.strip(), head).returncode == 0
+
+    def ensure_commit(self, revision: str, head: str = 'HEAD') -> bool:
+        """
+        保证 revision（增量游标、HEAD^、标签等）可以解析且从 head 沿本地历史可达，
+        按需加深；revision 确实不在 head 的历史中时（如历史被改写）加深到完整后返回False
+        """
+        if self._reachable(revision, head):
+            return True
+        if not self.is_shallow():
+            return False
+        tag = None
+        if self._git('rev-parse', '--verify', '-q', f'{revision}^{{commit}}').returncode != 0:
+            # 深度为 1 的检出不含标签：从远程查出标签指向的提交，加深到该提交后再建立本地标签
+            tag, revision = revision, self._remote_tag(revision) or revision
+        reachable = self._deepen_until(lambda: self._reachable(revision, head))
+        if reachable and tag and tag != revision:
+            self._git('update-ref', f'refs/tags/{tag}', revision)
+        return reachable
+
+    def _remote_tag(self, name: str) -> Optional[str]:
+        """远程标签指向的提交（附注标签取其指向的提交）"""
+        remote = self.remote()
+        if not remote or self._git('check-ref-format', f'refs/tags/{name}').returncode != 0:
+            return None
+        result = self._git('ls-remote', remote, f'refs/tags/{name}', f'refs/tags/{name}^{{}}')
+        refs = dict(reversed(line.split('\t', 1)) for line in result.stdout.splitlines() if '\t' in line)
+        return refs.get(f'refs/tags/{name}^{{}}') or refs.get(f'refs/tags/{name}')
+
+    def ensure_range(self, revision_range: str) -> bool:
+        """保证提交区间 A..B / A...B 的起点在本地可达；单个提交表示其全部历史"""
+        base, head = split_range(revision_range)
+        if base is None:
+            return self.unshallow()
+        return self.ensure_commit(base, head or 'HEAD')
+
+
+def split_range(revision_range: str) -> Tuple[Optional[str], Optional[str]]:
+    """'A..B' -> ('A', 'B')，'A..' -> ('A', None)，单个提交 -> (None, 提交)"""
+    for separator in ('...', '..'):
+        if separator in revision_range:
+            base, head = revision_range.split(separator, 1)
+            return base or 'HEAD', head or None
+    return None, revision_range
+
+
+def main():
+    parser = argparse.ArgumentParser(description='按需加深浅克隆的Git历史')
+    parser.add_argument('--root', default='.', help='仓库根目录')
+    group = parser.add_mutually_exclusive_group(required=True)
+    group.add_argument('--since-days', type=float, help='保证最近若干天的提交都在本地')
+    group.add_argument('--range', dest='revision_range', help='保证提交区间（如 v1.0..HEAD）的起点可达')
+    group.add_argument('--unshallow', action='store_true', help='拉取完整历史')
+    args = parser.parse_args()
+
+    repository = GitRepository(args.root)
+    if args.since_days is not None:
+        ok = repository.ensure_since(datetime.now(timezone.utc).timestamp() - args.since_days * 86400)
+    elif args.revision_range:
+        ok = repository.ensure_range(args.revision_range)
+    else:
+        ok = repository.unshallow()
+    state = "浅克隆" if repository.is_shallow() else "完整历史"
+    print(f"{'✅' if ok else '❌'} 当前为{state}，拉取 {repository.stats['fetches']} 次")
+    if not ok:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
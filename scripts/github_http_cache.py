@@ -0,0 +1,276 @@
+#!/usr/bin/env python3
+"""
+GitHub REST 读取客户端（带持久化条件请求缓存）
+按URL缓存响应体及 ETag/Last-Modified，命中 304 Not Modified 时直接回放缓存内容，
+304 响应不计入 GitHub 的速率限制
+另提供 GraphQL 请求，用于把多个写操作合并为一次请求
+"""
+
+import os
+import json
+import time
+import threading
+import http.client
+from urllib.parse import urlencode, urlsplit
+from typing import Any, Dict, Iterator, Optional, Tuple
+
+from tool_cache import ToolCache
+
+
+DEFAULT_API_URL = "https://api.github.com"
+
+
+class GitHubHttpError(Exception):
+    """GitHub API 返回非成功状态码"""
+
+    def __init__(self, status: int, url: str, message: str = ""):
+        super().__init__(f"HTTP {status} {url} {message}".strip())
+        self.status = status
+        self.url = url
+
+
+class RateLimitExhausted(GitHubHttpError):
+    """共享速率额度耗尽，且重置时间超过允许的等待时间"""
+
+    def __init__(self, url: str, reset_at: Optional[int]):
+        super().__init__(403, url, f"速率额度已耗尽，重置时间 {reset_at}")
+        self.reset_at = reset_at
+
+
+class RateLimitBudget:
+    """多个客户端共享的速率额度（线程安全），剩余额度低于保留值时等待重置"""
+
+    def __init__(self, reserve: int = 50, max_wait: int = 300):
+        self.reserve = reserve
+        self.max_wait = max_wait
+        self.remaining = None
+        self.reset_at = None
+        self._lock = threading.Lock()
+
+    def acquire(self, url: str = ""):
+        """发出请求前预扣一次额度；需要等待重置时在锁外等待，醒来后重新检查（其他线程可能已更新额度）"""
+        while True:
+            with self._lock:
+                wait = 0
+                if self.remaining is not None and self.remaining <= self.reserve:
+                    wait = (self.reset_at or 0) - time.time() + 1
+                    if wait > self.max_wait:
+                        raise RateLimitExhausted(url, self.reset_at)
+                    if wait <= 0:
+                        # 已过重置时间，以下一次响应头中的额度为准
+                        self.remaining = None
+                if wait <= 0:
+                    if self.remaining is not None:
+                        self.remaining -= 1
+                    return
+            time.sleep(wait)
+
+    def update(self, headers: Dict[str, str]):
+        """以响应头中的额度为准校正预扣值"""
+        if 'x-ratelimit-remaining' not in headers:
+            return
+        with self._lock:
+            self.remaining = int(headers['x-ratelimit-remaining'])
+            if 'x-ratelimit-reset' in headers:
+                self.reset_at = int(headers['x-ratelimit-reset'])
+
+
+class ConnectionPool:
+    """按主机复用 keep-alive 连接的连接池（线程安全），供多个客户端共享"""
+
+    def __init__(self, max_idle_per_host: int = 8, timeout: int = 30):
+        self.max_idle_per_host = max_idle_per_host
+        self.timeout = timeout
+        self._idle = {}
+        self._lock = threading.Lock()
+
+    def acquire(self, scheme: str, netloc: str) -> http.client.HTTPConnection:
+        with self._lock:
+            idle = self._idle.get((scheme, netloc))
+            if idle:
+                return idle.pop()
+        connection_class = http.client.HTTPSConnection if scheme == 'https' else http.client.HTTPConnection
+        connection = connection_class(netloc, timeout=self.timeout)
+        connection.pool_key = (scheme, netloc)
+        return connection
+
+    def release(self, connection: http.client.HTTPConnection):
+        """归还可复用的连接，空闲连接过多时直接关闭"""
+        with self._lock:
+            idle = self._idle.setdefault(connection.pool_key, [])
+            if len(idle) < self.max_idle_per_host:
+                idle.append(connection)
+                return
+        connection.close()
+
+    def close(self):
+        with self._lock:
+            connections = [connection for idle in self._idle.values() for connection in idle]
+            self._idle = {}
+        for connection in connections:
+            connection.close()
+
+
+class HttpCache:
+    """以URL为键的HTTP响应缓存，存放在共享缓存的 http 命名空间中"""
+
+    NAMESPACE = 'http'
+
+    def __init__(self, store: ToolCache):
+        self.store = store
+
+    def get(self, url: str) -> Optional[Dict[str, Any]]:
+        """读取缓存条目，不存在或损坏时返回None"""
+        return self.store.get(self.NAMESPACE, url)
+
+    def put(self, url: str, entry: Dict[str, Any]):
+        """原子写入缓存条目"""
+        self.store.put(self.NAMESPACE, url, entry)
+
+
+class GitHubHttpClient:
+    """GitHub REST 读取客户端，连接池与速率额度可在多个客户端之间共享"""
+
+    def __init__(self, token: str, cache: Optional[HttpCache] = None, api_url: Optional[str] = None,
+                 pool: Optional[ConnectionPool] = None, budget: Optional[RateLimitBudget] = None):
+        self.token = token
+        self.cache = cache
+        self.api_url = (api_url or os.environ.get('GITHUB_API_URL') or DEFAULT_API_URL).rstrip('/')
+        self._owns_pool = pool is None
+        self.pool = pool or ConnectionPool(max_idle_per_host=1)
+        self.budget = budget
+        self.stats = {'requests': 0, 'notModified': 0, 'rateLimitRemaining': None}
+
+    def close(self):
+        """关闭自有连接池（共享连接池由创建者关闭）"""
+        if self._owns_pool:
+            self.pool.close()
+
+    def _build_url(self, path: str, params: Optional[Dict[str, Any]] = None) -> str:
+        url = path if path.startswith(('http://', 'https://')) else self.api_url + path
+        if params:
+            url += ('&' if '?' in url else '?') + urlencode(sorted(params.items()))
+        return url
+
+    def _send(self, url: str, headers: Dict[str, str], method: str = 'GET',
+              body: Optional[bytes] = None) -> Tuple[int, Dict[str, str], bytes]:
+        """
+        发送请求，复用的连接已被服务器关闭时换新连接重试一次；
+        只重试 GET，POST（GraphQL变更）可能已被服务器执行，重试会重复创建
+        """
+        parts = urlsplit(url)
+        target = parts.path + ('?' + parts.query if parts.query else '')
+        if self.budget:
+            self.budget.acquire(url)
+        for attempt in range(2):
+            connection = self.pool.acquire(parts.scheme, parts.netloc)
+            try:
+                connection.request(method, target, body=body, headers=headers)
+                response = connection.getresponse()
+                content = response.read()
+            except (http.client.HTTPException, ConnectionError):
+                connection.close()
+                if attempt or method != 'GET':
+                    raise
+                continue
+            response_headers = {k.lower(): v for k, v in response.getheaders()}
+            if response.will_close:
+                connection.close()
+            else:
+                self.pool.release(connection)
+            if self.budget:
+                self.budget.update(response_headers)
+            return response.status, response_headers, content
+        raise RuntimeError("unreachable")
+
+    def _headers(self) -> Dict[str, str]:
+        return {
+            'Accept': 'application/vnd.github+json',
+            'Authorization': f'Bearer {self.token}',
+            'User-Agent': 'freemonitor-doc-sync',
+            'X-GitHub-Api-Version': '2022-11-28'
+        }
+
+    def _graphql_url(self) -> str:
+        # GitHub Enterprise 的 REST 地址为 /api/v3，GraphQL 地址为 /api/graphql
+        if self.api_url.endswith('/api/v3'):
+            return self.api_url[:-len('/v3')] + '/graphql'
+        return self.api_url + '/graphql'
+
+    def graphql(self, query: str, variables: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        """
+        发送一个GraphQL请求，返回完整响应 {'data': ..., 'errors': [...]}。
+        同一请求中的多个别名变更只消耗一次请求额度，单个别名失败不影响其他别名
+        """
+        url = self._graphql_url()
+        headers = dict(self._headers(), **{'Content-Type': 'application/json', 'GraphQL-Features': 'sub_issues'})
+        payload = json.dumps({'query': query, 'variables': variables or {}}, ensure_ascii=False).encode('utf-8')
+        status, response_headers, body = self._send(url, headers, 'POST', payload)
+        self.stats['requests'] += 1
+        if 'x-ratelimit-remaining' in response_headers:
+            self.stats['rateLimitRemaining'] = int(response_headers['x-ratelimit-remaining'])
+        if status != 200:
+            raise GitHubHttpError(status, url, body.decode('utf-8', 'replace')[:200])
+        return json.loads(body.decode('utf-8'))
+
+    def get(self, path: str, params: Optional[Dict[str, Any]] = None) -> Tuple[Any, Optional[str]]:
+        """条件GET：返回 (JSON数据, Link响应头)，未变更时回放缓存"""
+        url = self._build_url(path, params)
+        headers = self._headers()
+        cached = self.cache.get(url) if self.cache else None
+        if cached:
+            if cached.get('etag'):
+                headers['If-None-Match'] = cached['etag']
+            if cached.get('lastModified'):
+                headers['If-Modified-Since'] = cached['lastModified']
+
+        status, response_headers, body = self._send(url, headers)
+        self.stats['requests'] += 1
+        if 'x-ratelimit-remaining' in response_headers:
+            self.stats['rateLimitRemaining'] = int(response_headers['x-ratelimit-remaining'])
+
+        if status == 304 and cached:
+            self.stats['notModified'] += 1
+            return cached['body'], cached.get('link')
+        if status != 200:
+            raise GitHubHttpError(status, url, body.decode('utf-8', 'replace')[:200])
+
+        data = json.loads(body.decode('utf-8')) if body else None
+        link = response_headers.get('link')
+        if self.cache and (response_headers.get('etag') or response_headers.get('last-modified')):
+            self.cache.put(url, {
+                'etag': response_headers.get('etag'),
+                'lastModified': response_headers.get('last-modified'),
+                'link': link,
+                'body': data
+            })
+        return data, link
+
+    @staticmethod
+    def _next_link(link: Optional[str]) -> Optional[str]:
+        """解析 Link 响应头中的下一页地址"""
+        if not link:
+            return None
+        for part in link.split(','):
+            section = part.split(';')
+            if len(section) > 1 and section[1].strip() == 'rel="next"':
+                return section[0].strip()[1:-1]
+        return None
+
+    def paginate(self, path: str, params: Optional[Dict[str, Any]] = None) -> Iterator[Any]:
+        """逐页读取列表接口，每一页都走条件请求"""
+        data, link = self.get(path, dict(params or {}, per_page=100))
+        while True:
+            for item in data or []:
+                yield item
+            next_url = self._next_link(link)
+            if not next_url:
+                break
+            data, link = self.get(next_url)
+
+    def summary(self) -> str:
+        """本次运行的请求统计"""
+        text = f"HTTP请求 {self.stats['requests']} 次，其中 {self.stats['notModified']} 次命中 304 缓存"
+        if self.stats['rateLimitRemaining'] is not None:
+            text += f"，剩余速率额度 {self.stats['rateLimitRemaining']}"
+        return text
@@ -6,21 +6,356 @@
 
 import os
 import re
+import copy
 import json
-from typing import List, Dict, Any
+import mmap
+import hashlib
+import threading
+from typing import List, Dict, Any, Optional, Tuple
+
+from plan_stream import load_plan
+
+
+# 阶段名称到文档文件的映射
+PHASE_FILES = {
+    "阶段一：认证系统完善": "02-phase-1-auth-system.md",
+    "阶段二：核心监控功能": "03-phase-2-core-monitoring.md",
+    "阶段三：数据展示与处理": "04-phase-3-data-processing.md",
+    "阶段四：用户体验优化": "05-phase-4-ux-optimization.md",
+    "阶段五：API 与数据流": "06-phase-5-api-dataflow.md",
+    "阶段六：后端服务完善": "07-phase-6-backend-enhancement.md",
+    "阶段七：安全增强": "08-phase-7-security.md",
+    "阶段八：测试与质量": "09-phase-8-testing.md",
+    "阶段九：部署与运维": "10-phase-9-deployment.md"
+}
+
+# 扫描结果格式变化时递增，使磁盘缓存中的旧结果失效
+SCAN_VERSION = 1
+
+# 标题中的状态符号到状态文本的映射
+STATUS_SYMBOL_MAP = {
+    '✅': '✅ 已完成',
+    '[x]': '✅ 已完成',
+    '🔄': '🔄 进行中',
+    '[~]': '🔄 进行中',
+    '⏸': '⏸ 暂停/待定',
+    '☐': '☐ 未开始',
+    '[ ]': '☐ 未开始',
+    '': '☐ 未开始'
+}
+STATUS_SYMBOL_PATTERN = re.compile(r'^(✅|🔄|⏸\ufe0f?|☐|\[x\]|\[~\]|\[ \])\s*')
+DONE_MARK_PATTERN = re.compile(r'\s*@done\((.*?)\)')
+STATUS_PREFIX = '**状态**'.encode('utf-8')
+BULLET_PREFIX_PATTERN = re.compile(rb'^\s*(?:[-*]\s+)?')
+TASK_SYMBOL_PREFIXES = tuple(symbol.encode('utf-8') for symbol in ('✅', '🔄', '⏸', '☐', '[x]', '[~]', '[ ]'))
+
+# 任务正文中的字段名到Issue正文字段的映射
+FIELD_NAMES = {
+    '描述': 'description',
+    '实现逻辑': 'implementation_logic',
+    '相关文件': 'related_files',
+    '验收标准': 'acceptance_criteria',
+    '依赖': 'dependencies',
+    '依赖关系': 'dependencies',
+    '前置依赖': 'dependencies'
+}
+LIST_FIELDS = {'related_files', 'acceptance_criteria', 'dependencies'}
+# 子任务清单字段（任务内可按四级标题分组，如 第一阶段/第二阶段 各有一组子任务）
+SUB_TASK_FIELDS = {'子任务', '子任务分解'}
+CHECKED_SYMBOLS = {'✅', '[x]'}
+FIELD_PATTERN = re.compile(r'^\s*(?:[-*]\s+)?\*\*(.+?)\*\*\s*[:：]\s*(.*?)\s*$')
+LIST_ITEM_PATTERN = re.compile(r'^(\s*)(?:[-*+]|\d+\.)\s+(.*?)\s*$')
+
+
+def is_task_completed(task: Dict[str, Any]) -> bool:
+    """已完成的任务对应的Issue应处于关闭状态"""
+    status = task.get('status', '')
+    return "✅" in status or "已完成" in status
+
+
+def status_category(status: str) -> str:
+    """状态文本的分类：completed / in-progress / pending"""
+    if is_task_completed({'status': status}):
+        return 'completed'
+    if "🔄" in status or "进行中" in status:
+        return 'in-progress'
+    return 'pending'
+
+
+def scan_tasks(data, document: str) -> List[Dict[str, Any]]:
+    """
+    按行扫描文档字节内容，只解码标题行和状态行，记录每个任务在文件中的字节范围。
+    三级标题、或带状态符号的四级标题视为任务；既没有状态符号也没有状态行的标题不计为任务。
+    """
+    tasks = []
+    current = None
+    in_code_block = False
+    position = 0
+    size = len(data)
+
+    def close(end: int):
+        if current and (current['symbol'] or 'status' in current):
+            task = {
+                'title': current['title'],
+                'status': current.get('status') or STATUS_SYMBOL_MAP.get(current['symbol'], '☐ 未开始')
+            }
+            if current['completionDate']:
+                task['completionDate'] = current['completionDate']
+            task['source'] = {'document': document, 'span': [current['start'], end]}
+            tasks.append(task)
+
+    while position < size:
+        line_end = data.find(b'\n', position)
+        next_position = size if line_end == -1 else line_end + 1
+        line = data[position:size if line_end == -1 else line_end].rstrip(b'\r')
+
+        if line.lstrip().startswith(b'```'):
+            in_code_block = not in_code_block
+        elif not in_code_block and line.startswith(b'#'):
+            level = len(line) - len(line.lstrip(b'#'))
+            text = line[level:].strip()
+            is_task_heading = level == 3 or (level == 4 and text.startswith(TASK_SYMBOL_PREFIXES))
+            if level <= 3 or is_task_heading:
+                close(position)
+                current = None
+            if is_task_heading:
+                title = text.decode('utf-8')
+                symbol_match = STATUS_SYMBOL_PATTERN.match(title)
+                symbol = symbol_match.group(1).replace('\ufe0f', '') if symbol_match else ''
+                title = title[symbol_match.end():] if symbol_match else title
+                done_match = DONE_MARK_PATTERN.search(title)
+                current = {
+                    'title': DONE_MARK_PATTERN.sub('', title).strip(),
+                    'symbol': symbol,
+                    'completionDate': done_match.group(1) if done_match else None,
+                    'start': position
+                }
+        elif current and 'status' not in current:
+            # 优先从内容中提取状态（兼容段落和列表两种写法）
+            stripped = BULLET_PREFIX_PATTERN.sub(b'', line, count=1)
+            if stripped.startswith(STATUS_PREFIX):
+                value = stripped[len(STATUS_PREFIX):].decode('utf-8').lstrip(':： ').strip()
+                if value:
+                    current['status'] = value
+
+        position = next_position
+
+    close(size)
+    return tasks
+
+
+def parse_task_fields(text: str) -> Dict[str, Any]:
+    """从任务正文中提取描述、实现逻辑、相关文件、验收标准和依赖关系"""
+    fields = {}
+    key = None
+    items = None
+    paragraph = None
+    item_indent = None
+    after_blank = False
+
+    for line in text.split('\n')[1:]:
+        field_match = FIELD_PATTERN.match(line)
+        if field_match:
+            key = FIELD_NAMES.get(field_match.group(1).strip())
+            items, paragraph, item_indent, after_blank = [], [], None, False
+            if key:
+                inline = field_match.group(2)
+                if inline:
+                    paragraph.append(inline)
+                fields[key] = (items, paragraph)
+            continue
+        if key is None:
+            continue
+        if not line.strip():
+            after_blank = True
+            continue
+        if line.startswith('#'):
+            key = None
+            continue
+
+        item_match = LIST_ITEM_PATTERN.match(line)
+        if item_match:
+            indent = len(item_match.group(1))
+            if item_indent is None:
+                item_indent = indent
+            if indent <= item_indent:
+                items.append(item_match.group(2))
+        elif not after_blank and not items:
+            paragraph.append(line.strip())
+        else:
+            key = None
+
+    result = {}
+    sub_tasks = parse_sub_tasks(text)
+    if sub_tasks:
+        result['sub_tasks'] = sub_tasks
+    for key, (items, paragraph) in fields.items():
+        inline = ' '.join(paragraph).strip()
+        if key in LIST_FIELDS:
+            if items:
+                result[key] = items
+            elif inline and key == 'related_files':
+                result[key] = [part.strip() for part in re.split(r'[,，、]', inline) if part.strip()]
+            elif inline:
+                result[key] = inline
+        elif inline or items:
+            result[key] = inline or '\n'.join(f"- {item}" for item in items)
+    return result
+
+
+def _split_sub_task(text: str) -> Tuple[Optional[bool], str]:
+    """拆分子任务的状态符号与标题，没有状态符号时勾选状态为None"""
+    match = STATUS_SYMBOL_PATTERN.match(text)
+    if not match:
+        return None, text
+    symbol = match.group(1).replace('\ufe0f', '')
+    return symbol in CHECKED_SYMBOLS, text[match.end():]
+
+
+def parse_sub_tasks(text: str) -> List[Dict[str, Any]]:
+    """
+    提取任务正文中所有子任务清单：[{'title', 'checked', 'group', 'items': [{'title', 'checked'}]}]。
+    group 为子任务所在的四级标题；缩进的列表项作为子任务的细项，没有状态符号时沿用子任务的勾选状态
+    """
+    sub_tasks = []
+    group = None
+    collecting = False
+    item_indent = None
+    for line in text.split('\n')[1:]:
+        if line.startswith('#'):
+            group = line.lstrip('#').strip() or None
+            collecting = False
+            continue
+        field_match = FIELD_PATTERN.match(line)
+        if field_match:
+            collecting = field_match.group(1).strip() in SUB_TASK_FIELDS
+            item_indent = None
+            continue
+        if not collecting or not line.strip():
+            continue
+        item_match = LIST_ITEM_PATTERN.match(line)
+        if not item_match:
+            collecting = False
+            continue
+        indent = len(item_match.group(1))
+        if item_indent is None:
+            item_indent = indent
+        checked, title = _split_sub_task(item_match.group(2))
+        if indent <= item_indent:
+            sub_tasks.append({'title': title, 'checked': bool(checked), 'group': group, 'items': []})
+        elif sub_tasks:
+            parent = sub_tasks[-1]
+            parent['items'].append({'title': title, 'checked': parent['checked'] if checked is None else checked})
+    return sub_tasks
+
+
+class TaskScanCache:
+    """
+    按文档内容哈希缓存任务扫描结果（线程安全），可在多个解析器之间共享；
+    传入共享磁盘缓存时，扫描结果跨运行保留，未修改的文档不再重新扫描
+    """
+
+    NAMESPACE = 'task-scan'
+
+    def __init__(self, store=None):
+        self._entries = {}
+        self._lock = threading.Lock()
+        self.store = store
+        self.stats = {'hits': 0, 'misses': 0}
+
+    def scan(self, data, document: str) -> List[Dict[str, Any]]:
+        content_hash = hashlib.sha1(data).hexdigest()
+        key = (content_hash, document)
+        with self._lock:
+            tasks = self._entries.get(key)
+        if tasks is None and self.store is not None:
+            tasks = self.store.get(self.NAMESPACE, f"v{SCAN_VERSION}:{document}", content_hash)
+        with self._lock:
+            self.stats['hits' if tasks is not None else 'misses'] += 1
+        if tasks is None:
+            tasks = scan_tasks(data, document)
+            if self.store is not None:
+                self.store.put(self.NAMESPACE, f"v{SCAN_VERSION}:{document}", tasks, content_hash)
+        with self._lock:
+            self._entries[key] = tasks
+        # 调用方会修改任务字典（如补充 extractedAt），返回副本
+        return copy.deepcopy(tasks)
+
+
+class TaskBodyLoader:
+    """按任务记录的字节范围从内存映射的文档中按需提取任务正文字段"""
+
+    def __init__(self, docs_path: str = "docs"):
+        self.docs_path = docs_path
+        self._maps = {}
+        # 文档 -> {任务标题: 字节范围}，按标题定位时每个文档只扫描一次
+        self._spans = {}
+
+    def _map(self, document: str) -> Optional[mmap.mmap]:
+        if document not in self._maps:
+            try:
+                with open(os.path.join(self.docs_path, document), 'rb') as f:
+                    self._maps[document] = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            except (FileNotFoundError, ValueError):
+                # 文件不存在或为空文件（空文件无法映射）
+                self._maps[document] = None
+        return self._maps[document]
+
+    def _locate(self, data, document: str, title: str) -> Optional[List[int]]:
+        """字节范围失效（文档在解析后被修改）或缺失时按标题定位"""
+        if document not in self._spans:
+            spans = self._spans[document] = {}
+            for task in scan_tasks(data, document):
+                spans.setdefault(task['title'], task['source']['span'])
+        return self._spans[document].get(title)
+
+    def load(self, task: Dict[str, Any], phase: Optional[str] = None) -> Dict[str, Any]:
+        """
+        提取单个任务的正文字段；缺少来源信息时（如旧版本的计划）在 phase 对应的阶段文档中按标题查找，
+        仍找不到时返回空字典
+        """
+        source = task.get('source')
+        document = source['document'] if source else PHASE_FILES.get(phase)
+        if not document:
+            return {}
+        data = self._map(document)
+        if data is None:
+            return {}
+
+        span = None
+        if source:
+            start, end = source['span']
+            heading_end = data.find(b'\n', start, end)
+            heading = data[start:end if heading_end == -1 else heading_end].decode('utf-8', 'replace')
+            if heading.startswith('#') and task.get('title', '') in heading:
+                span = (start, end)
+        if span is None:
+            span = self._locate(data, document, task.get('title', ''))
+            if span is None:
+                return {}
+        start, end = span
+        return parse_task_fields(data[start:end].decode('utf-8'))
+
+    def close(self):
+        for data in self._maps.values():
+            if data is not None:
+                data.close()
+        self._maps = {}
+        self._spans = {}
 
 
 class TaskParser:
-    def __init__(self, docs_path: str = "docs", json_file: str = "docs/project-plan-structured.json"):
+    def __init__(self, docs_path: str = "docs", json_file: str = "docs/project-plan-structured.json",
+                 scan_cache: Optional[TaskScanCache] = None):
         self.docs_path = docs_path
         self.json_file = json_file
+        self.scan_cache = scan_cache
         self.project_data = {}
         
     def load_project_data(self):
         """加载现有的project-plan-structured.json文件"""
         try:
-            with open(self.json_file, 'r', encoding='utf-8') as f:
-                self.project_data = json.load(f)
+            self.project_data = load_plan(self.json_file)
         except FileNotFoundError:
             print(f"错误: 找不到文件 {self.json_file}")
             raise
@@ -29,64 +364,28 @@ class TaskParser:
             raise
             
     def extract_tasks_from_md(self, file_path: str) -> List[Dict[str, Any]]:
-        """从Markdown文件中提取任务信息"""
-        tasks = []
-        
+        """从Markdown文件中提取任务信息（标题、状态及任务在文件中的字节范围）"""
         try:
-            with open(file_path, 'r', encoding='utf-8') as f:
-                content = f.read()
+            with open(file_path, 'rb') as f:
+                try:
+                    data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+                except ValueError:
+                    # 空文件无法映射
+                    return []
         except FileNotFoundError:
             print(f"警告: 找不到文件 {file_path}")
-            return tasks
+            return []
         except Exception as e:
             print(f"错误: 无法读取文件 {file_path} - {e}")
-            return tasks
-        
-        # 改进的正则表达式，更好地匹配任务格式
-        # 匹配任务标题和状态（支持多种格式）
-        task_pattern = r'###\s*([✅🔄⏸☐\[x\]\[~\]\[\s\]]?)\s*(.*?)\s*(?:@done\((.*?)\))?\n\n([\s\S]*?)\n(?=\n###|\Z)'
-        task_blocks = re.finditer(task_pattern, content, re.DOTALL)
-        
-        for match in task_blocks:
-            status_symbol = match.group(1).strip()
-            title = match.group(2).strip()
-            completion_date = match.group(3)
-            task_content = match.group(4).strip()
-            
-            # 优先从内容中提取状态
-            status = "☐ 未开始"  # 默认状态
-            status_pattern = r'\*\*状态\*\*:\s*(.*?)(?=\n|$)'
-            status_match = re.search(status_pattern, task_content)
-            if status_match:
-                status = status_match.group(1).strip()
-            else:
-                # 如果内容中没有状态，根据符号判断
-                status_map = {
-                    '✅': '✅ 已完成',
-                    '[x]': '✅ 已完成',
-                    '🔄': '🔄 进行中',
-                    '[~]': '🔄 进行中',
-                    '⏸': '⏸ 暂停/待定',
-                    '☐': '☐ 未开始',
-                    '[ ]': '☐ 未开始',
-                    '': '☐ 未开始'
-                }
-                status = status_map.get(status_symbol, '☐ 未开始')
-            
-            # 清理标题中的状态符号
-            title = re.sub(r'^[✅🔄⏸☐\[x\]\[~\]\[\s\]]\s*', '', title).strip()
-            
-            task = {
-                'title': title,
-                'status': status
-            }
-            
-            if completion_date:
-                task['completionDate'] = completion_date
-                
-            tasks.append(task)
+            return []
         
-        return tasks
+        try:
+            document = os.path.relpath(file_path, self.docs_path)
+            if self.scan_cache is not None:
+                return self.scan_cache.scan(data, document)
+            return scan_tasks(data, document)
+        finally:
+            data.close()
     
     def calculate_progress(self, tasks: List[Dict[str, Any]]) -> Dict[str, Any]:
         """计算任务进度"""
@@ -148,17 +447,7 @@ class TaskParser:
         self.load_project_data()
         
         # 定义阶段文件映射
-        phase_files = {
-            "阶段一：认证系统完善": "02-phase-1-auth-system.md",
-            "阶段二：核心监控功能": "03-phase-2-core-monitoring.md",
-            "阶段三：数据展示与处理": "04-phase-3-data-processing.md",
-            "阶段四：用户体验优化": "05-phase-4-ux-optimization.md",
-            "阶段五：API 与数据流": "06-phase-5-api-dataflow.md",
-            "阶段六：后端服务完善": "07-phase-6-backend-enhancement.md",
-            "阶段七：安全增强": "08-phase-7-security.md",
-            "阶段八：测试与质量": "09-phase-8-testing.md",
-            "阶段九：部署与运维": "10-phase-9-deployment.md"
-        }
+        phase_files = PHASE_FILES
         
         # 确保phaseDetails包含所有阶段
         existing_phases = {phase_detail.get('phase', '') for phase_detail in self.project_data.get('phaseDetails', [])}
@@ -180,6 +469,10 @@ class TaskParser:
                 md_file_path = os.path.join(self.docs_path, phase_files[phase])
                 if os.path.exists(md_file_path):
                     tasks = self.extract_tasks_from_md(md_file_path)
+                    # 沿用已分配的任务ID（延迟导入，task_identity 依赖本模块）
+                    from task_identity import assign_task_ids
+                    for match in assign_task_ids(phase_detail.get('tasks', []), tasks, phase):
+                        print(f"任务标题已改写，沿用ID {match['id']}: {match['from']} -> {match['to']}")
                     phase_detail['tasks'] = tasks
                     
                     # 计算阶段进度
@@ -0,0 +1,183 @@
+#!/usr/bin/env python3
+"""
+同步流水线的阶段跳过
+每个阶段声明输入（阶段文档、计划JSON、Git提交、环境变量、脚本本身）与输出文件，成功运行后记录输入指纹，
+并按内容哈希保存输出文件的副本；下次运行时输入指纹相同的阶段直接跳过，沿用上次的结果。
+输出文件缺失时从副本恢复；输出文件被修改过（与上次记录的哈希不同）时重新运行阶段，不会覆盖修改
+"""
+
+import os
+import glob
+import shutil
+import json
+import hashlib
+import subprocess
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, List, Optional
+
+
+STAGE_STATE_VERSION = 1
+# 任何脚本变化都可能改变阶段的输出；按工具自身所在目录解析，批量同步其他仓库时同样指向这些脚本
+SCRIPTS_DIR = os.path.dirname(os.path.abspath(__file__))
+
+
+def default_state_file(project_root: str = ".") -> str:
+    """各阶段上次成功运行的输入指纹"""
+    return os.path.join(project_root, ".cache", "doc-tools", "stages.json")
+
+
+def hash_file(path: str) -> Optional[str]:
+    try:
+        with open(path, 'rb') as f:
+            return hashlib.sha1(f.read()).hexdigest()
+    except FileNotFoundError:
+        return None
+
+
+class StageInputs:
+    """阶段输入的声明，路径相对仓库根目录"""
+
+    def __init__(self, project_root: str = "."):
+        self.project_root = project_root
+        self.parts = {}
+
+    def files(self, *patterns: str) -> 'StageInputs':
+        """文件内容（支持通配符；不存在的文件也计入，出现后指纹随之变化）"""
+        for pattern in patterns:
+            paths = sorted(glob.glob(os.path.join(self.project_root, pattern))) if glob.has_magic(pattern) \
+                else [os.path.join(self.project_root, pattern)]
+            for path in paths:
+                relative = os.path.relpath(path, self.project_root).replace(os.sep, '/')
+                self.parts[f"file:{relative}"] = hash_file(path)
+        return self
+
+    def scripts(self) -> 'StageInputs':
+        for path in sorted(glob.glob(os.path.join(SCRIPTS_DIR, '*.py'))):
+            self.parts[f"script:{os.path.basename(path)}"] = hash_file(path)
+        return self
+
+    def git(self, revision: str = 'HEAD') -> 'StageInputs':
+        """提交或区间解析出的提交哈希"""
+        result = subprocess.run(['git', 'rev-parse', revision], cwd=self.project_root, capture_output=True, text=True)
+        self.parts[f"git:{revision}"] = result.stdout.split() if result.returncode == 0 else None
+        return self
+
+    def env(self, *names: str) -> 'StageInputs':
+        for name in names:
+            self.parts[f"env:{name}"] = os.environ.get(name)
+        return self
+
+    def value(self, name: str, value: Any) -> 'StageInputs':
+        self.parts[f"value:{name}"] = value
+        return self
+
+    def fingerprint(self) -> str:
+        return hashlib.sha256(json.dumps(self.parts, sort_keys=True, ensure_ascii=False).encode('utf-8')).hexdigest()
+
+
+class StageRunner:
+    def __init__(self, project_root: str = ".", state_file: Optional[str] = None, force: bool = False):
+        self.project_root = project_root
+        self.state_file = state_file or default_state_file(project_root)
+        self.force = force
+        # 输出文件副本，以内容哈希命名
+        self.outputs_dir = os.path.join(os.path.dirname(self.state_file), "stage-outputs")
+        self.stats = {'run': [], 'skipped': [], 'restored': 0}
+        self.state = self._load_state()
+
+    def _load_state(self) -> Dict[str, Any]:
+        try:
+            with open(self.state_file, 'r', encoding='utf-8') as f:
+                state = json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return {}
+        return state.get('stages', {}) if state.get('version') == STAGE_STATE_VERSION else {}
+
+    def save_state(self):
+        os.makedirs(os.path.dirname(self.state_file), exist_ok=True)
+        tmp_file = self.state_file + ".tmp"
+        with open(tmp_file, 'w', encoding='utf-8') as f:
+            json.dump({'version': STAGE_STATE_VERSION, 'stages': self.state}, f, ensure_ascii=False, indent=2)
+        os.replace(tmp_file, self.state_file)
+
+    def _output_hashes(self, outputs: List[str]) -> Dict[str, Optional[str]]:
+        return {path: hash_file(os.path.join(self.project_root, path)) for path in outputs}
+
+    def _store_outputs(self, outputs: Dict[str, Optional[str]]):
+        os.makedirs(self.outputs_dir, exist_ok=True)
+        for path, digest in outputs.items():
+            copy = os.path.join(self.outputs_dir, digest or '')
+            if digest and not os.path.exists(copy):
+                shutil.copyfile(os.path.join(self.project_root, path), copy + ".tmp")
+                os.replace(copy + ".tmp", copy)
+        # 删除不再被任何阶段引用的副本
+        referenced = {digest for record in self.state.values() for digest in record['outputs'].values()}
+        for name in os.listdir(self.outputs_dir):
+            if name not in referenced:
+                os.remove(os.path.join(self.outputs_dir, name))
+
+    def _restore_outputs(self, outputs: Dict[str, Optional[str]]) -> bool:
+        """
+        只恢复缺失的输出文件；输出与上次记录不同（被修改过）、上次没有该输出或缺少副本时返回False，
+        由调用方重新运行阶段，不覆盖工作区中的修改
+        """
+        current = self._output_hashes(list(outputs))
+        changed = [path for path, digest in outputs.items() if current[path] != digest]
+        if any(current[path] is not None or outputs[path] is None
+               or not os.path.exists(os.path.join(self.outputs_dir, outputs[path])) for path in changed):
+            return False
+        for path in changed:
+            target = os.path.join(self.project_root, path)
+            os.makedirs(os.path.dirname(target) or '.', exist_ok=True)
+            shutil.copyfile(os.path.join(self.outputs_dir, outputs[path]), target + ".tmp")
+            os.replace(target + ".tmp", target)
+            self.stats['restored'] += 1
+        return True
+
+    def is_fresh(self, stage: str, fingerprint: str, outputs: List[str]) -> bool:
+        """输入指纹与上次成功运行相同，且声明的输出与上次一致"""
+        record = self.state.get(stage)
+        return (not self.force and record is not None and record['fingerprint'] == fingerprint
+                and sorted(record['outputs']) == sorted(outputs))
+
+    def run(self, stage: str, inputs: StageInputs, outputs: List[str], action: Callable[[], Any],
+            succeeded: Callable[[Any], bool] = lambda result: bool(result)) -> Any:
+        """
+        输入没有变化时跳过阶段并返回上次的结果，否则执行 action；
+        succeeded(结果) 为真时才记录指纹（结果需要可以序列化为JSON），失败的阶段下次一定重新运行
+        """
+        fingerprint = inputs.fingerprint()
+        if self.is_fresh(stage, fingerprint, outputs) and self._restore_outputs(self.state[stage]['outputs']):
+            record = self.state[stage]
+            print(f"⏭️ 跳过阶段 {stage}：输入自 {record['finishedAt']} 的成功运行以来没有变化")
+            self.stats['skipped'].append(stage)
+            return record['result']
+
+        self.stats['run'].append(stage)
+        result = action()
+        if succeeded(result):
+            # 既是输入又是输出的文件（如解析阶段的计划JSON）按运行后的内容记录指纹
+            for path in outputs:
+                key = f"file:{path.replace(os.sep, '/')}"
+                if key in inputs.parts:
+                    inputs.parts[key] = hash_file(os.path.join(self.project_root, path))
+            fingerprint = inputs.fingerprint()
+            self.state[stage] = {
+                'fingerprint': fingerprint,
+                'outputs': self._output_hashes(outputs),
+                'result': result,
+                'finishedAt': datetime.now(timezone.utc).isoformat()
+            }
+        else:
+            self.state.pop(stage, None)
+        self._store_outputs(self.state.get(stage, {}).get('outputs', {}))
+        self.save_state()
+        return result
+
+    def summary(self) -> str:
+        text = f"阶段: 运行 {len(self.stats['run'])} 个"
+        if self.stats['skipped']:
+            text += f"，跳过 {len(self.stats['skipped'])} 个（{', '.join(self.stats['skipped'])}）"
+        if self.stats['restored']:
+            text += f"，从副本恢复 {self.stats['restored']} 个输出文件"
+        return text
@@ -0,0 +1,214 @@
+#!/usr/bin/env python3
+"""
+项目计划扁平化导出
+把 project-plan-structured.json 中的任务展开为 任务/阶段/模块/状态/优先级/完成日期/Issue链接 等扁平行，
+以 NDJSON 或 CSV 输出供看板使用。计划按阶段流式读取，每行生成后立即写出，不在内存中组装整个数据集
+"""
+
+import os
+import sys
+import csv
+import json
+import argparse
+from typing import Any, Dict, Iterator, List, Optional
+
+from create_github_issues import IssueFormatter, format_issue_title
+from parse_tasks import status_category
+from plan_stream import iter_phase_details
+from sync_journal import TASK_ID_MARKER_PATTERN, derive_task_id
+from sync_planner import default_snapshot_file, load_snapshot
+
+
+# 列名 -> 说明
+COLUMNS = {
+    'taskId': '任务ID（文档#锚点）',
+    'task': '任务标题',
+    'phase': '所属阶段',
+    'module': '所属模块（由相关文件的目录推断，多个以逗号分隔）',
+    'status': '状态原文',
+    'statusCategory': '状态分类（completed / in-progress / pending）',
+    'priority': '阶段优先级',
+    'startDate': '开始日期',
+    'completionDate': '完成日期',
+    'document': '阶段文档',
+    'issueNumber': 'Issue编号',
+    'issueState': 'Issue状态',
+    'issueUrl': 'Issue链接'
+}
+DEFAULT_COLUMNS = ['taskId', 'task', 'phase', 'module', 'status', 'priority', 'completionDate', 'issueUrl']
+# 需要从远程快照中查找Issue的列
+ISSUE_COLUMNS = {'issueNumber', 'issueState', 'issueUrl'}
+STATUS_CATEGORIES = ('completed', 'in-progress', 'pending')
+FORMATS = ('ndjson', 'csv')
+
+
+def matches_status(status: str, filters: List[str]) -> bool:
+    """过滤条件为状态分类时按分类匹配，否则按状态原文的子串匹配"""
+    category = status_category(status)
+    return any(category == value if value in STATUS_CATEGORIES else value in status for value in filters)
+
+
+def matches_phase(phase: str, document: str, filters: List[str]) -> bool:
+    """阶段名或阶段文档包含任一过滤条件（如 "阶段一"、"02-phase-1"）"""
+    return any(value in phase or value in document for value in filters)
+
+
+def _clean_path(path: str) -> str:
+    return path.strip().strip('`').removeprefix('./')
+
+
+def task_modules(related_files: Any, modules: List[Dict[str, Any]]) -> List[str]:
+    """相关文件位于哪些模块的目录下（模块目录可以逗号分隔多个，如 "docker/, scripts/"），按模块在计划中的顺序返回"""
+    if isinstance(related_files, str):
+        related_files = [related_files]
+    paths = [_clean_path(str(path)) for path in related_files or []]
+    names = []
+    for module in modules:
+        directories = [_clean_path(directory).rstrip('/') for directory in (module.get('directory') or '').split(',')]
+        if any(directory and (path == directory or path.startswith(directory + '/'))
+               for directory in directories for path in paths):
+            names.append(module.get('name', ''))
+    return names
+
+
+class PlanExporter:
+    """逐个阶段读取计划并产出扁平行；只在选中对应列时才读取任务正文（模块）或远程快照（Issue）"""
+
+    def __init__(self, json_file: str, snapshot: Optional[Dict[str, Any]] = None, docs_path: Optional[str] = None):
+        self.json_file = json_file
+        self.formatter = IssueFormatter(docs_path or os.path.dirname(json_file))
+        self.snapshot = snapshot
+        self.stats = {'rows': 0, 'skipped': 0}
+        self._issues_by_task_id = None
+        self._issues_by_title = None
+
+    def _index_issues(self):
+        self._issues_by_task_id, self._issues_by_title = {}, {}
+        for issue in (self.snapshot or {}).get('issues', []):
+            self._issues_by_title.setdefault(issue['title'], issue)
+            marker = TASK_ID_MARKER_PATTERN.search(issue.get('body') or '')
+            if marker:
+                self._issues_by_task_id.setdefault(marker.group(1), issue)
+
+    def _find_issue(self, task_id: str, task: Dict[str, Any], phase: str) -> Optional[Dict[str, Any]]:
+        """与同步计划相同，先按任务ID标记、再按完整标题匹配"""
+        if self._issues_by_task_id is None:
+            self._index_issues()
+        return self._issues_by_task_id.get(task_id) or self._issues_by_title.get(format_issue_title(task, phase))
+
+    def rows(self, columns: List[str], statuses: Optional[List[str]] = None,
+             phases: Optional[List[str]] = None) -> Iterator[Dict[str, Any]]:
+        header = {}
+        try:
+            for phase_detail in iter_phase_details(self.json_file, header):
+                phase = phase_detail.get('phase', '')
+                document = phase_detail.get('document', '')
+                tasks = phase_detail.get('tasks', [])
+                if phases and not matches_phase(phase, document, phases):
+                    self.stats['skipped'] += len(tasks)
+                    continue
+                # phases / modules 位于 phaseDetails 之前，读到阶段详情时已写入 header
+                phase_status = {item.get('name'): item.get('status', '') for item in header.get('phases', [])}
+                priority = self.formatter._extract_priority_from_phase(phase_status.get(phase) or phase)
+                for task in tasks:
+                    status = task.get('status', '')
+                    if statuses and not matches_status(status, statuses):
+                        self.stats['skipped'] += 1
+                        continue
+                    yield self._row(task, phase, document, priority, header.get('modules', []), columns)
+                    self.stats['rows'] += 1
+        finally:
+            self.formatter.body_loader.close()
+
+    def _row(self, task: Dict[str, Any], phase: str, document: str, priority: str,
+             modules: List[Dict[str, Any]], columns: List[str]) -> Dict[str, Any]:
+        task_id = task.get('id') or derive_task_id(task, phase)
+        values = {
+            'taskId': task_id,
+            'task': task.get('title', ''),
+            'phase': phase,
+            'status': task.get('status', ''),
+            'statusCategory': status_category(task.get('status', '')),
+            'priority': priority,
+            'startDate': task.get('startDate'),
+            'completionDate': task.get('completionDate'),
+            'document': (task.get('source') or {}).get('document') or document.removeprefix('./')
+        }
+        if 'module' in columns:
+            related_files = self.formatter._load_task(task, phase).get('related_files')
+            values['module'] = ','.join(task_modules(related_files, modules))
+        if ISSUE_COLUMNS.intersection(columns):
+            issue = self._find_issue(task_id, task, phase) or {}
+            values.update(issueNumber=issue.get('number'), issueState=issue.get('state'), issueUrl=issue.get('html_url'))
+        return {column: values.get(column) for column in columns}
+
+
+def write_rows(rows: Iterator[Dict[str, Any]], columns: List[str], output_format: str, f):
+    """逐行写出：NDJSON 每行一个JSON对象，CSV 先写表头，空值写为空字符串"""
+    if output_format == 'ndjson':
+        for row in rows:
+            f.write(json.dumps(row, ensure_ascii=False) + '\n')
+        return
+    writer = csv.writer(f, lineterminator='\n')
+    writer.writerow(columns)
+    for row in rows:
+        writer.writerow(['' if row[column] is None else row[column] for column in columns])
+
+
+def main():
+    parser = argparse.ArgumentParser(description='把项目计划导出为扁平的任务行（NDJSON / CSV）')
+    parser.add_argument('--json-file', default=os.path.join('docs', 'project-plan-structured.json'), help='项目计划JSON文件')
+    parser.add_argument('--snapshot', default=default_snapshot_file(), help='远程快照文件（用于Issue列）')
+    parser.add_argument('--format', choices=FORMATS, default='ndjson', help='输出格式')
+    parser.add_argument('--columns', help=f"逗号分隔的列（默认 {','.join(DEFAULT_COLUMNS)}；可选 {','.join(COLUMNS)}）")
+    parser.add_argument('--status', action='append', help=f"只导出该状态的任务，可重复：{' / '.join(STATUS_CATEGORIES)} 或状态原文片段")
+    parser.add_argument('--phase', action='append', help='只导出阶段名或阶段文档包含该片段的任务，可重复')
+    parser.add_argument('--output', help='输出文件（默认输出到标准输出）')
+    args = parser.parse_args()
+
+    columns = [column.strip() for column in args.columns.split(',') if column.strip()] if args.columns else DEFAULT_COLUMNS
+    unknown = [column for column in columns if column not in COLUMNS]
+    if unknown:
+        parser.error(f"未知的列: {', '.join(unknown)}（可选: {', '.join(COLUMNS)}）")
+
+    snapshot = None
+    if ISSUE_COLUMNS.intersection(columns):
+        snapshot = load_snapshot(args.snapshot)
+        if snapshot is None:
+            print(f"⚠️ 警告: 找不到远程快照 {args.snapshot}，Issue列将为空", file=sys.stderr)
+
+    exporter = PlanExporter(args.json_file, snapshot)
+    rows = exporter.rows(columns, args.status, args.phase)
+    tmp_file = args.output + ".tmp" if args.output else None
+    try:
+        if args.output:
+            with open(tmp_file, 'w', encoding='utf-8', newline='') as f:
+                write_rows(rows, columns, args.format, f)
+            os.replace(tmp_file, args.output)
+        else:
+            write_rows(rows, columns, args.format, sys.stdout)
+            sys.stdout.flush()
+    except BrokenPipeError:
+        # 下游（如 head）提前关闭管道时静默退出
+        os.dup2(os.open(os.devnull, os.O_WRONLY), sys.stdout.fileno())
+        return
+    except json.JSONDecodeError as e:
+        print(f"❌ 无法读取 {args.json_file}: {e}", file=sys.stderr)
+        sys.exit(1)
+    except OSError as e:
+        # 计划文件在逐行写出的过程中才被读取，按出错的文件区分读取与写入错误
+        if e.filename == args.json_file:
+            print(f"❌ 无法读取 {args.json_file}: {e}", file=sys.stderr)
+        else:
+            print(f"❌ 无法写入 {args.output or '标准输出'}: {e}", file=sys.stderr)
+        sys.exit(1)
+    finally:
+        # 写入失败时不留下半写的临时文件（成功时已被重命名）
+        if tmp_file and os.path.exists(tmp_file):
+            os.unlink(tmp_file)
+    print(f"✅ 导出 {exporter.stats['rows']} 行（过滤 {exporter.stats['skipped']} 个任务）"
+          + (f" -> {args.output}" if args.output else ''), file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
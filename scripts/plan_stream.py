@@ -0,0 +1,173 @@
+#!/usr/bin/env python3
+"""
+项目计划流式读取
+基于标准库 json.JSONDecoder.raw_decode 按块读取 project-plan-structured.json：
+顶层字段逐个解码，phaseDetails 数组逐个阶段解码后立即交给调用方，
+内存峰值与单个阶段的大小成正比，而不是整个计划文件
+"""
+
+import json
+from typing import Any, Dict, Iterator, Tuple, Iterable, Optional
+
+# 每次从文件读取的字符数
+CHUNK_SIZE = 64 * 1024
+# 逐个元素流式解码的顶层数组
+STREAMED_KEYS = ('phaseDetails',)
+WHITESPACE = ' \t\n\r'
+NUMBER_START = '-0123456789'
+NUMBER_CHARS = '0123456789+-.eE'
+
+
+class PlanStreamReader:
+    """在滑动缓冲区上增量解码JSON，已解码的部分随即丢弃"""
+
+    def __init__(self, f, chunk_size: int = CHUNK_SIZE):
+        self.f = f
+        self.chunk_size = chunk_size
+        self.decoder = json.JSONDecoder()
+        self.buffer = ''
+        self.pos = 0
+        self.eof = False
+        # 已丢弃部分的行数，用于错误信息中的行号
+        self.lines = 0
+
+    def _read(self, size: int = 0) -> bool:
+        """读取下一块（至少 chunk_size 个字符）并丢弃已解码的前缀，文件已读完时返回False"""
+        if self.eof:
+            return False
+        chunk = self.f.read(max(size, self.chunk_size))
+        if not chunk:
+            self.eof = True
+            return False
+        self.lines += self.buffer.count('\n', 0, self.pos)
+        self.buffer = self.buffer[self.pos:] + chunk
+        self.pos = 0
+        return True
+
+    def _error(self, message: str, pos: Optional[int] = None) -> json.JSONDecodeError:
+        pos = self.pos if pos is None else pos
+        line = self.lines + self.buffer.count('\n', 0, pos) + 1
+        return json.JSONDecodeError(f"{message}（文件第 {line} 行）", self.buffer, pos)
+
+    def peek(self) -> str:
+        """跳过空白，返回下一个字符（文件结束时返回空字符串）"""
+        while True:
+            while self.pos < len(self.buffer) and self.buffer[self.pos] in WHITESPACE:
+                self.pos += 1
+            if self.pos < len(self.buffer) or not self._read():
+                return self.buffer[self.pos:self.pos + 1]
+
+    def expect(self, char: str):
+        if self.peek() != char:
+            raise self._error(f"期望 {char!r}")
+        self.pos += 1
+
+    def accept(self, char: str) -> bool:
+        """下一个字符是 char 时消费它并返回True"""
+        if self.peek() == char:
+            self.pos += 1
+            return True
+        return False
+
+    def _truncated(self, end: int) -> bool:
+        """
+        解码结果可能被块边界截断：值恰好结束于缓冲区末尾，或数字之后只剩数字字符
+        （如 "2." / "2.5e" 被解码为 2 / 2.5，后续块中还有其余部分）
+        """
+        if end == len(self.buffer):
+            return True
+        return self.buffer[self.pos] in NUMBER_START and all(char in NUMBER_CHARS for char in self.buffer[end:])
+
+    def value(self) -> Any:
+        """解码一个完整的JSON值；缓冲区中的值不完整（或数字可能被截断）时继续读取"""
+        self.peek()
+        while True:
+            # 每次重试读取的量与未完成部分一样多，单个大阶段的重复解码总量保持线性
+            pending = len(self.buffer) - self.pos
+            try:
+                value, end = self.decoder.raw_decode(self.buffer, self.pos)
+            except json.JSONDecodeError as e:
+                if self._read(pending):
+                    continue
+                raise self._error(e.msg, e.pos) from None
+            if self._truncated(end) and self._read(pending):
+                continue
+            self.pos = end
+            return value
+
+    def members(self, streamed_keys: Iterable[str] = STREAMED_KEYS) -> Iterator[Tuple[str, Any, bool]]:
+        """
+        依次产出顶层对象的 (字段名, 值, 是否为数组元素)：streamed_keys 中的非空数组按元素逐个产出，
+        其余字段（包括空数组）整体产出
+        """
+        streamed_keys = set(streamed_keys)
+        self.expect('{')
+        if self.accept('}'):
+            return
+        while True:
+            key = self.value()
+            if not isinstance(key, str):
+                raise self._error("字段名必须是字符串")
+            self.expect(':')
+            if key in streamed_keys and self.accept('['):
+                if self.accept(']'):
+                    yield key, [], False
+                else:
+                    while True:
+                        yield key, self.value(), True
+                        if not self.accept(','):
+                            self.expect(']')
+                            break
+            else:
+                yield key, self.value(), False
+            if not self.accept(','):
+                self.expect('}')
+                break
+        if self.peek():
+            raise self._error("JSON对象之后存在多余内容")
+
+
+def iter_phase_details(json_file: str, header: Optional[Dict[str, Any]] = None) -> Iterator[Dict[str, Any]]:
+    """
+    逐个产出阶段详情，读完 phaseDetails 后不再解码后续字段；
+    传入 header 时，phaseDetails 之前的顶层字段（如 phases）在读取过程中写入其中
+    """
+    with open(json_file, 'r', encoding='utf-8') as f:
+        seen = False
+        for key, value, element in PlanStreamReader(f).members():
+            if key == 'phaseDetails':
+                seen = True
+                if element:
+                    yield value
+            elif seen:
+                return
+            elif header is not None:
+                header[key] = value
+
+
+def iter_plan_tasks(phase_details: Iterable[Dict[str, Any]]) -> Iterator[Tuple[str, Dict[str, Any]]]:
+    """把阶段详情展开为 (阶段名, 任务)"""
+    for phase_detail in phase_details:
+        phase = phase_detail.get('phase', '')
+        for task in phase_detail.get('tasks', []):
+            yield phase, task
+
+
+def iter_tasks(json_file: str) -> Iterator[Tuple[str, Dict[str, Any]]]:
+    """逐个产出计划中的 (阶段名, 任务)"""
+    return iter_plan_tasks(iter_phase_details(json_file))
+
+
+def load_plan(json_file: str) -> Dict[str, Any]:
+    """
+    流式组装完整的计划对象：与 json.load 结果相同，但不需要先把整个文件读成一个字符串，
+    出错时与 json.load 一样抛出 FileNotFoundError / json.JSONDecodeError
+    """
+    data = {}
+    with open(json_file, 'r', encoding='utf-8') as f:
+        for key, value, element in PlanStreamReader(f).members():
+            if element:
+                data.setdefault(key, []).append(value)
+            else:
+                data[key] = value
+    return data
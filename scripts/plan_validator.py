@@ -0,0 +1,298 @@
+#!/usr/bin/env python3
+"""
+项目计划结构校验脚本
+由声明式的模式（PLAN_SCHEMA）一次编译为校验函数，检查阶段、任务、状态词表、日期格式与模块权重，
+报告精确到 JSON 路径的错误（如 $.phaseDetails[0].tasks[3].status），作为写入 project-plan-structured.json 之前的关卡
+"""
+
+import re
+import sys
+import json
+import time
+import argparse
+from datetime import datetime
+from typing import List, Dict, Any, Callable, Tuple
+
+from parse_tasks import PHASE_FILES
+
+
+# 任务状态词表：标准写法及文档中允许的简写
+STATUS_VOCABULARY = {
+    '✅ 已完成', '已完成',
+    '🔄 进行中', '进行中',
+    '☐ 未开始', '未开始',
+    '⏸ 暂停/待定', '暂停/待定', '暂停', '待定'
+}
+PERCENT_PATTERN = r'^\d+(\.\d+)?%$'
+# @done(...) 标记与任务日期挖掘使用的格式：YY-MM-DD HH:MM
+TASK_DATE_PATTERN = r'^\d{2}-\d{2}-\d{2}( \d{2}:\d{2})?$'
+
+TASK_SCHEMA = {
+    'type': 'object',
+    'required': ['title', 'status'],
+    'properties': {
+        'title': {'type': 'string', 'singleLine': True, 'notPrefix': '#', 'minLength': 1},
+        'status': {'type': 'string', 'enum': STATUS_VOCABULARY},
+        'completionDate': {'type': 'string', 'pattern': TASK_DATE_PATTERN},
+        'startDate': {'type': 'string', 'pattern': TASK_DATE_PATTERN},
+        'extractedAt': {'type': 'string', 'format': 'iso-datetime'},
+        'id': {'type': 'string', 'minLength': 1},
+        'source': {
+            'type': 'object',
+            'required': ['document', 'span'],
+            'properties': {
+                'document': {'type': 'string', 'minLength': 1},
+                'span': {'type': 'array', 'minItems': 2, 'maxItems': 2, 'items': {'type': 'integer', 'minimum': 0}}
+            }
+        }
+    }
+}
+
+PROGRESS_SCHEMA = {
+    'type': 'object',
+    'required': ['completed', 'inProgress', 'pending', 'total', 'percentage'],
+    'properties': {
+        'completed': {'type': 'integer', 'minimum': 0},
+        'inProgress': {'type': 'integer', 'minimum': 0},
+        'pending': {'type': 'integer', 'minimum': 0},
+        'total': {'type': 'integer', 'minimum': 0},
+        'percentage': {'type': 'number', 'minimum': 0, 'maximum': 100}
+    }
+}
+
+PLAN_SCHEMA = {
+    'type': 'object',
+    'required': ['projectName', 'modules', 'phases', 'phaseDetails'],
+    'properties': {
+        'projectName': {'type': 'string', 'minLength': 1},
+        'overallProgress': {'type': 'string', 'pattern': PERCENT_PATTERN},
+        'lastUpdated': {'type': 'string', 'format': 'iso-datetime'},
+        'progressCalculation': {
+            'type': 'object',
+            'properties': {
+                'weights': {'type': 'object', 'values': {'type': 'number', 'minimum': 0, 'maximum': 100}}
+            }
+        },
+        'modules': {
+            'type': 'array',
+            'items': {
+                'type': 'object',
+                'required': ['name', 'status'],
+                'properties': {
+                    'name': {'type': 'string', 'minLength': 1},
+                    'status': {'type': 'string', 'pattern': r'\d+(\.\d+)?%'}
+                }
+            }
+        },
+        'phases': {
+            'type': 'array',
+            'items': {
+                'type': 'object',
+                'required': ['name'],
+                'properties': {
+                    'name': {'type': 'string', 'enum': set(PHASE_FILES)},
+                    'progress': {'type': 'string', 'pattern': PERCENT_PATTERN},
+                    'status': {'type': 'string'}
+                }
+            }
+        },
+        'phaseDetails': {
+            'type': 'array',
+            'items': {
+                'type': 'object',
+                'required': ['phase', 'tasks'],
+                'properties': {
+                    'phase': {'type': 'string', 'enum': set(PHASE_FILES)},
+                    'document': {'type': 'string'},
+                    'lastSynced': {'type': 'string', 'format': 'iso-datetime'},
+                    'progress': PROGRESS_SCHEMA,
+                    'tasks': {'type': 'array', 'items': TASK_SCHEMA}
+                }
+            }
+        }
+    }
+}
+
+TYPE_CHECKS = {
+    'object': (lambda value: isinstance(value, dict), '对象'),
+    'array': (lambda value: isinstance(value, list), '数组'),
+    'string': (lambda value: isinstance(value, str), '字符串'),
+    'integer': (lambda value: isinstance(value, int) and not isinstance(value, bool), '整数'),
+    'number': (lambda value: isinstance(value, (int, float)) and not isinstance(value, bool), '数字'),
+}
+
+Path = Tuple[Any, ...]
+Validator = Callable[[Any, Path, List[Dict[str, Any]]], None]
+
+
+def format_path(path: Path) -> str:
+    """把路径元组格式化为 JSON 路径：$.phaseDetails[0].tasks[3].status"""
+    parts = ['$']
+    for part in path:
+        parts.append(f"[{part}]" if isinstance(part, int) else f".{part}")
+    return ''.join(parts)
+
+
+def _is_iso_datetime(value: str) -> bool:
+    try:
+        datetime.fromisoformat(value)
+        return True
+    except ValueError:
+        return False
+
+
+def compile_schema(schema: Dict[str, Any]) -> Validator:
+    """把声明式模式编译为校验函数：每个约束只生成一次闭包，校验时不再解释模式"""
+    checks = []
+
+    if 'type' in schema:
+        type_check, type_name = TYPE_CHECKS[schema['type']]
+    else:
+        type_check, type_name = (lambda value: True), ''
+
+    if 'enum' in schema:
+        allowed = frozenset(schema['enum'])
+        checks.append(lambda value: None if value in allowed else f"取值 {value!r} 不在允许的词表中")
+    if 'pattern' in schema:
+        pattern = re.compile(schema['pattern'])
+        checks.append(lambda value: None if pattern.search(value) else f"{value!r} 不符合格式 {pattern.pattern}")
+    if schema.get('format') == 'iso-datetime':
+        checks.append(lambda value: None if _is_iso_datetime(value) else f"{value!r} 不是ISO日期时间")
+    if 'minLength' in schema:
+        min_length = schema['minLength']
+        checks.append(lambda value: None if len(value.strip()) >= min_length else "不能为空")
+    if schema.get('singleLine'):
+        checks.append(lambda value: "不能包含换行（疑似把说明段落解析成了任务）" if '\n' in value else None)
+    if 'notPrefix' in schema:
+        prefix = schema['notPrefix']
+        checks.append(lambda value: f"不能以 {prefix!r} 开头（疑似把小标题解析成了任务）" if value.startswith(prefix) else None)
+    if 'minimum' in schema:
+        minimum = schema['minimum']
+        checks.append(lambda value: None if value >= minimum else f"{value} 小于最小值 {minimum}")
+    if 'maximum' in schema:
+        maximum = schema['maximum']
+        checks.append(lambda value: None if value <= maximum else f"{value} 大于最大值 {maximum}")
+    if 'minItems' in schema or 'maxItems' in schema:
+        min_items, max_items = schema.get('minItems', 0), schema.get('maxItems')
+        checks.append(lambda value: None if len(value) >= min_items and (max_items is None or len(value) <= max_items)
+                      else f"元素个数 {len(value)} 不在允许范围内")
+
+    required = schema.get('required', [])
+    properties = [(name, compile_schema(sub_schema)) for name, sub_schema in schema.get('properties', {}).items()]
+    items = compile_schema(schema['items']) if 'items' in schema else None
+    values = compile_schema(schema['values']) if 'values' in schema else None
+
+    def validate(value: Any, path: Path, errors: List[Dict[str, Any]]):
+        if not type_check(value):
+            errors.append({'path': format_path(path), 'message': f"应为{type_name}，实际为 {type(value).__name__}"})
+            return
+        for check in checks:
+            message = check(value)
+            if message:
+                errors.append({'path': format_path(path), 'message': message})
+        if required or properties:
+            for name in required:
+                if name not in value:
+                    errors.append({'path': format_path(path), 'message': f"缺少必填字段 {name}"})
+            for name, validator in properties:
+                if name in value:
+                    validator(value[name], path + (name,), errors)
+        if items is not None:
+            for index, item in enumerate(value):
+                items(item, path + (index,), errors)
+        if values is not None:
+            for key, item in value.items():
+                values(item, path + (key,), errors)
+
+    return validate
+
+
+def check_module_weights(plan: Dict[str, Any], errors: List[Dict[str, Any]], warnings: List[Dict[str, Any]]):
+    """模块权重：总和为100，且与模块列表一一对应"""
+    weights = (plan.get('progressCalculation') or {}).get('weights')
+    if not isinstance(weights, dict) or not isinstance(plan.get('modules'), list):
+        return
+    numeric = [value for value in weights.values() if isinstance(value, (int, float))]
+    if abs(sum(numeric) - 100) > 0.01:
+        errors.append({'path': '$.progressCalculation.weights', 'message': f"模块权重之和为 {sum(numeric)}，应为 100"})
+    names = [module.get('name') for module in plan['modules'] if isinstance(module, dict)]
+    for index, name in enumerate(names):
+        if name not in weights:
+            errors.append({'path': f"$.modules[{index}].name", 'message': f"模块 {name!r} 没有对应的进度权重"})
+    for name in weights:
+        if name not in names:
+            warnings.append({'path': f"$.progressCalculation.weights.{name}", 'message': "权重没有对应的模块"})
+
+
+def check_phases(plan: Dict[str, Any], errors: List[Dict[str, Any]], warnings: List[Dict[str, Any]]):
+    """阶段详情不重复，同一阶段内的同名任务只会对应一个Issue"""
+    seen = {}
+    for index, detail in enumerate(plan.get('phaseDetails') or []):
+        if not isinstance(detail, dict):
+            continue
+        phase = detail.get('phase')
+        if phase in seen:
+            errors.append({'path': f"$.phaseDetails[{index}].phase", 'message': f"阶段 {phase!r} 与 $.phaseDetails[{seen[phase]}] 重复"})
+        seen.setdefault(phase, index)
+        titles = {}
+        for task_index, task in enumerate(detail.get('tasks') or []):
+            title = task.get('title') if isinstance(task, dict) else None
+            if title in titles:
+                warnings.append({
+                    'path': f"$.phaseDetails[{index}].tasks[{task_index}].title",
+                    'message': f"任务标题与 tasks[{titles[title]}] 重复，只会同步为一个Issue"
+                })
+            titles.setdefault(title, task_index)
+
+
+CROSS_CHECKS = [check_module_weights, check_phases]
+
+
+class PlanValidator:
+    def __init__(self, schema: Dict[str, Any] = PLAN_SCHEMA):
+        self._validate = compile_schema(schema)
+
+    def validate(self, plan: Any) -> Dict[str, List[Dict[str, Any]]]:
+        """返回 {'errors': [...], 'warnings': [...]}，errors 为空表示可以写入"""
+        errors, warnings = [], []
+        self._validate(plan, (), errors)
+        if isinstance(plan, dict):
+            for check in CROSS_CHECKS:
+                check(plan, errors, warnings)
+        return {'errors': errors, 'warnings': warnings}
+
+
+def format_report(report: Dict[str, List[Dict[str, Any]]], limit: int = 50) -> str:
+    """输出校验结果（每类最多 limit 条）"""
+    lines = []
+    for kind, mark in (('errors', '❌'), ('warnings', '⚠️')):
+        for item in report[kind][:limit]:
+            lines.append(f"{mark} {item['path']}: {item['message']}")
+        if len(report[kind]) > limit:
+            lines.append(f"   …… 另有 {len(report[kind]) - limit} 条未显示")
+    return '\n'.join(lines)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='校验 project-plan-structured.json 的结构与取值')
+    parser.add_argument('json_file', nargs='?', default='docs/project-plan-structured.json', help='项目计划JSON文件')
+    parser.add_argument('--strict', action='store_true', help='警告也视为失败')
+    args = parser.parse_args()
+
+    with open(args.json_file, 'r', encoding='utf-8') as f:
+        plan = json.load(f)
+    started = time.perf_counter()
+    report = PlanValidator().validate(plan)
+    elapsed = (time.perf_counter() - started) * 1000
+
+    if report['errors'] or report['warnings']:
+        print(format_report(report))
+    summary = f"{len(report['errors'])} 个错误，{len(report['warnings'])} 个警告，耗时 {elapsed:.1f}ms"
+    if report['errors'] or (args.strict and report['warnings']):
+        print(f"❌ 校验失败：{summary}")
+        sys.exit(1)
+    print(f"✅ 校验通过：{summary}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,1065 @@
+#!/usr/bin/env python3
+"""
+数据库模式文档生成
+解析 apps/backend/prisma/schema.prisma 中的模型、字段、关系、索引与枚举，生成 docs/development/architecture/database-schema.md
+（字段表格 + Mermaid 关系图）。每个 model/enum 块的渲染结果按块内容哈希缓存，只有定义变化的块重新渲染；
+diff 子命令按顺序重放 migrations/ 中的 SQL，与 schema 期望的表、列、索引、外键和枚举逐项比较
+"""
+
+import os
+import re
+import sys
+import json
+import time
+import hashlib
+import argparse
+from typing import Any, Dict, List, Optional, Tuple
+
+from check_doc_links import github_slug
+from tool_cache import ToolCache, default_cache_root
+
+
+SCHEMA_FILE = os.path.join('apps', 'backend', 'prisma', 'schema.prisma')
+MIGRATIONS_DIR = os.path.join('apps', 'backend', 'prisma', 'migrations')
+OUTPUT_FILE = os.path.join('docs', 'development', 'architecture', 'database-schema.md')
+CACHE_NAMESPACE = 'prisma-docs'
+
+# Prisma 标量类型 -> PostgreSQL 默认列类型
+SCALAR_TYPES = {
+    'String': 'TEXT',
+    'Boolean': 'BOOLEAN',
+    'Int': 'INTEGER',
+    'BigInt': 'BIGINT',
+    'Float': 'DOUBLE PRECISION',
+    'Decimal': 'DECIMAL(65,30)',
+    'DateTime': 'TIMESTAMP(3)',
+    'Json': 'JSONB',
+    'Bytes': 'BYTEA'
+}
+# @db.* 原生类型中与 SQL 写法不同的名称
+NATIVE_TYPES = {
+    'DoublePrecision': 'DOUBLE PRECISION',
+    'Timestamptz': 'TIMESTAMPTZ',
+    'Timetz': 'TIMETZ'
+}
+# SQL 中的类型别名
+SQL_TYPE_ALIASES = {
+    'INT': 'INTEGER',
+    'INT4': 'INTEGER',
+    'INT8': 'BIGINT',
+    'FLOAT8': 'DOUBLE PRECISION',
+    'BOOL': 'BOOLEAN',
+    'SERIAL': 'INTEGER',
+    'BIGSERIAL': 'BIGINT',
+    'CHARACTER VARYING': 'VARCHAR'
+}
+TIME_TYPES = ('TIMESTAMP', 'TIMESTAMPTZ', 'TIME', 'TIMETZ')
+REFERENTIAL_ACTIONS = {
+    'Cascade': 'CASCADE',
+    'Restrict': 'RESTRICT',
+    'NoAction': 'NO ACTION',
+    'SetNull': 'SET NULL',
+    'SetDefault': 'SET DEFAULT'
+}
+# 由 Prisma Client 生成、数据库中没有默认值的函数
+CLIENT_DEFAULTS = ('cuid', 'uuid', 'nanoid', 'ulid')
+
+BLOCK_START = re.compile(r'^(model|enum|view|type|generator|datasource)\s+(\w+)\s*\{$')
+FIELD_PATTERN = re.compile(r'^(\w+)\s+(\w+(?:\([^)]*\))?)(\[\])?(\?)?(?:\s+(.*))?$')
+ATTRIBUTE_PATTERN = re.compile(r'@@?[\w.]+')
+# SQL 标识符，可带 schema 前缀，如 "public"."devices"
+SQL_IDENT = r'(?:"?\w+"?\.)?"?(\w+)"?'
+SQL_IDENT_LIST = r'\(([^)]*)\)'
+
+
+class SchemaError(ValueError):
+    """schema.prisma 语法不完整"""
+
+
+def hash_text(text: str) -> str:
+    return hashlib.sha1(text.encode('utf-8')).hexdigest()
+
+
+def strip_comment(line: str) -> str:
+    """去掉 // 注释（字符串中的 // 除外），/// 文档注释由调用方先行处理"""
+    quote = None
+    for index, char in enumerate(line):
+        if quote:
+            if char == '\\':
+                continue
+            if char == quote and line[index - 1] != '\\':
+                quote = None
+        elif char in '"\'':
+            quote = char
+        elif line.startswith('//', index):
+            return line[:index]
+    return line
+
+
+def matching_paren(text: str, start: int) -> int:
+    """text[start] 为左括号，返回匹配的右括号位置（跳过字符串中的括号）"""
+    depth = 0
+    quote = None
+    for index in range(start, len(text)):
+        char = text[index]
+        if quote:
+            if char == quote and text[index - 1] != '\\':
+                quote = None
+        elif char in '"\'':
+            quote = char
+        elif char in '([{':
+            depth += 1
+        elif char in ')]}':
+            depth -= 1
+            if depth == 0:
+                return index
+    raise SchemaError(f"括号不匹配: {text[start:start + 60]}")
+
+
+def split_top_level(text: str, separator: str = ',') -> List[str]:
+    """按分隔符拆分，忽略括号与字符串（含SQL的 $$ 块）内部的分隔符"""
+    parts, current = [], []
+    depth = 0
+    quote = None
+    index = 0
+    while index < len(text):
+        char = text[index]
+        if quote:
+            current.append(char)
+            if quote == '$$' and text.startswith('$$', index):
+                current.append('$')
+                index += 1
+                quote = None
+            elif char == quote and quote != '$$':
+                quote = None
+        elif text.startswith('$$', index):
+            current.append('$$')
+            index += 1
+            quote = '$$'
+        elif char in '"\'':
+            current.append(char)
+            quote = char
+        elif char in '([{':
+            depth += 1
+            current.append(char)
+        elif char in ')]}':
+            depth -= 1
+            current.append(char)
+        elif char == separator and depth == 0:
+            parts.append(''.join(current).strip())
+            current = []
+        else:
+            current.append(char)
+        index += 1
+    if ''.join(current).strip():
+        parts.append(''.join(current).strip())
+    return parts
+
+
+def parse_value(value: str) -> Any:
+    """属性参数值：[a, b] -> 列表，"x" -> 字符串，其余（函数调用、标识符、数字）保留原文"""
+    value = value.strip()
+    if value.startswith('[') and value.endswith(']'):
+        return [parse_value(item) for item in split_top_level(value[1:-1])]
+    if len(value) >= 2 and value[0] == value[-1] == '"':
+        return value[1:-1]
+    return value
+
+
+def parse_attributes(text: str) -> List[Tuple[str, Optional[str]]]:
+    """'@id @default(cuid())' -> [('@id', None), ('@default', 'cuid()')]"""
+    attributes = []
+    pos = 0
+    while True:
+        match = ATTRIBUTE_PATTERN.search(text, pos)
+        if not match:
+            return attributes
+        pos = match.end()
+        args = None
+        if pos < len(text) and text[pos] == '(':
+            end = matching_paren(text, pos)
+            args = text[pos + 1:end]
+            pos = end + 1
+        attributes.append((match.group(0), args))
+
+
+def parse_arguments(args: Optional[str]) -> Tuple[List[Any], Dict[str, Any]]:
+    """属性参数拆分为位置参数与命名参数"""
+    positional, named = [], {}
+    for piece in split_top_level(args or ''):
+        match = re.match(r'^(\w+)\s*:\s*(.*)$', piece, re.S)
+        if match:
+            named[match.group(1)] = parse_value(match.group(2))
+        else:
+            positional.append(parse_value(piece))
+    return positional, named
+
+
+def index_field_names(fields: Any) -> List[str]:
+    """[deviceId, timestamp(sort: Desc)] -> ['deviceId', 'timestamp']"""
+    fields = fields if isinstance(fields, list) else [fields]
+    return [re.match(r'\w+', str(field)).group(0) for field in fields]
+
+
+def split_blocks(text: str) -> List[Dict[str, Any]]:
+    """
+    把 schema 拆分为顶层块，每个块带上紧邻其上的 /// 文档注释与内容哈希；
+    哈希基于去掉 // 注释并压缩空白后的定义，prisma format 重新对齐列不会使块失效
+    """
+    blocks = []
+    doc = []
+    lines = text.splitlines()
+    index = 0
+    while index < len(lines):
+        stripped = lines[index].strip()
+        match = BLOCK_START.match(' '.join(strip_comment(stripped).split()))
+        if match:
+            start = index
+            body = []
+            index += 1
+            while index < len(lines) and strip_comment(lines[index]).strip() != '}':
+                body.append(lines[index].strip())
+                index += 1
+            if index == len(lines):
+                raise SchemaError(f"第 {start + 1} 行的 {match.group(1)} {match.group(2)} 缺少右花括号")
+            normalized = [line if line.startswith('///') else ' '.join(strip_comment(line).split()) for line in body]
+            definition = '\n'.join([*('///' + line for line in doc), f"{match.group(1)} {match.group(2)}",
+                                    *(line for line in normalized if line)])
+            blocks.append({
+                'kind': match.group(1),
+                'name': match.group(2),
+                'doc': doc,
+                'body': body,
+                'line': start + 1,
+                'hash': hash_text(definition)
+            })
+            doc = []
+        elif stripped.startswith('///'):
+            doc.append(stripped[3:].strip())
+        elif stripped:
+            doc = []
+        index += 1
+    return blocks
+
+
+def parse_field(line: str, doc: List[str]) -> Dict[str, Any]:
+    match = FIELD_PATTERN.match(line)
+    if not match:
+        raise SchemaError(f"无法解析的字段定义: {line}")
+    name, field_type, is_list, optional, rest = match.groups()
+    field = {
+        'name': name,
+        'type': field_type,
+        'list': bool(is_list),
+        'optional': bool(optional),
+        'column': name,
+        'doc': ' '.join(doc),
+        'default': None,
+        'id': False,
+        'unique': False,
+        'updatedAt': False,
+        'dbType': None,
+        'relation': None
+    }
+    for attribute, args in parse_attributes(rest or ''):
+        positional, named = parse_arguments(args)
+        if attribute == '@id':
+            field['id'] = True
+        elif attribute == '@unique':
+            field['unique'] = True
+        elif attribute == '@updatedAt':
+            field['updatedAt'] = True
+        elif attribute == '@default':
+            field['default'] = args.strip() if args else None
+        elif attribute == '@map':
+            field['column'] = positional[0]
+        elif attribute == '@relation':
+            field['relation'] = {
+                'name': named.get('name', positional[0] if positional else None),
+                'fields': index_field_names(named['fields']) if 'fields' in named else [],
+                'references': index_field_names(named['references']) if 'references' in named else [],
+                'onDelete': named.get('onDelete'),
+                'onUpdate': named.get('onUpdate')
+            }
+        elif attribute.startswith('@db.'):
+            field['dbType'] = attribute[4:] + (f"({args})" if args is not None else '')
+    return field
+
+
+def parse_block(block: Dict[str, Any]) -> Dict[str, Any]:
+    """把一个块解析为模型/枚举/配置的字典表示"""
+    parsed = {'kind': block['kind'], 'name': block['name'], 'doc': ' '.join(block['doc']), 'line': block['line']}
+    if block['kind'] in ('generator', 'datasource'):
+        settings = {}
+        for line in block['body']:
+            key, _, value = strip_comment(line).partition('=')
+            if value:
+                settings[key.strip()] = parse_value(value)
+        parsed['settings'] = settings
+        return parsed
+
+    doc = []
+    if block['kind'] == 'enum':
+        parsed.update(dbName=block['name'], values=[])
+        for line in block['body']:
+            if line.startswith('///'):
+                doc.append(line[3:].strip())
+                continue
+            line = strip_comment(line).strip()
+            if line.startswith('@@map'):
+                parsed['dbName'] = parse_arguments(parse_attributes(line)[0][1])[0][0]
+            elif line:
+                name = line.split()[0]
+                mapped = [parse_arguments(args)[0][0] for attribute, args in parse_attributes(line[len(name):]) if attribute == '@map']
+                parsed['values'].append({'name': name, 'dbName': mapped[0] if mapped else name, 'doc': ' '.join(doc)})
+                doc = []
+        return parsed
+
+    parsed.update(table=block['name'], fields=[], id=[], indexes=[])
+    for line in block['body']:
+        if line.startswith('///'):
+            doc.append(line[3:].strip())
+            continue
+        line = strip_comment(line).strip()
+        if not line:
+            continue
+        if not line.startswith('@@'):
+            parsed['fields'].append(parse_field(line, doc))
+            doc = []
+            continue
+        for attribute, args in parse_attributes(line):
+            positional, named = parse_arguments(args)
+            fields = index_field_names(named.get('fields', positional[0] if positional else []))
+            if attribute == '@@map':
+                parsed['table'] = positional[0]
+            elif attribute == '@@id':
+                parsed['id'] = fields
+            elif attribute in ('@@unique', '@@index', '@@fulltext'):
+                parsed['indexes'].append({
+                    'fields': fields,
+                    'unique': attribute == '@@unique',
+                    'name': named.get('name'),
+                    'map': named.get('map'),
+                    'type': named.get('type', 'Fulltext' if attribute == '@@fulltext' else None)
+                })
+    id_fields = [field['name'] for field in parsed['fields'] if field['id']]
+    if id_fields:
+        parsed['id'] = id_fields
+    return parsed
+
+
+def parse_schema(text: str) -> Dict[str, Any]:
+    """解析整个 schema：models / enums 按名称索引，保留块在文件中的顺序"""
+    schema = {'models': {}, 'enums': {}, 'datasource': None, 'blocks': []}
+    for block in split_blocks(text):
+        parsed = parse_block(block)
+        parsed['hash'] = block['hash']
+        schema['blocks'].append(parsed)
+        if block['kind'] in ('model', 'view'):
+            schema['models'][block['name']] = parsed
+        elif block['kind'] == 'enum':
+            schema['enums'][block['name']] = parsed
+        elif block['kind'] == 'datasource':
+            schema['datasource'] = parsed
+    return schema
+
+
+def type_kinds(schema: Dict[str, Any]) -> Dict[str, str]:
+    """非标量类型名 -> 'model' / 'enum'"""
+    kinds = {name: 'model' for name in schema['models']}
+    kinds.update({name: 'enum' for name in schema['enums']})
+    return kinds
+
+
+def is_relation_field(field: Dict[str, Any], kinds: Dict[str, str]) -> bool:
+    return kinds.get(field['type']) == 'model'
+
+
+def escape_cell(text: Any) -> str:
+    return str(text).replace('|', '\\|').replace('\n', ' ')
+
+
+def format_type(field: Dict[str, Any], kinds: Dict[str, str]) -> str:
+    name = field['type']
+    suffix = '[]' if field['list'] else ''
+    text = f"[{name}](#{github_slug(name)}){suffix}" if name in kinds else f"`{name}{suffix}`"
+    if field['dbType']:
+        text += f" (`@db.{field['dbType']}`)"
+    return text
+
+
+def format_columns(names: List[str]) -> str:
+    return names[0] if len(names) == 1 else f"({', '.join(names)})"
+
+
+def field_notes(field: Dict[str, Any], model: Dict[str, Any], kinds: Dict[str, str]) -> str:
+    notes = []
+    if field['id'] or (len(model['id']) > 1 and field['name'] in model['id']):
+        notes.append('主键')
+    if field['unique']:
+        notes.append('唯一')
+    if field['updatedAt']:
+        notes.append('自动更新时间')
+    if field['column'] != field['name']:
+        notes.append(f"列名 `{field['column']}`")
+    relation = field['relation']
+    if relation and relation['fields']:
+        notes.append(f"外键 {format_columns(relation['fields'])} → {field['type']}.{format_columns(relation['references'])}"
+                     + (f"，删除时 {relation['onDelete']}" if relation['onDelete'] else ''))
+    elif is_relation_field(field, kinds):
+        notes.append('反向关系')
+    if field['doc']:
+        notes.append(field['doc'])
+    return '；'.join(notes)
+
+
+def render_model(model: Dict[str, Any], kinds: Dict[str, str]) -> str:
+    """单个模型的文档片段：字段表格 + 主键/索引列表"""
+    lines = [f"### {model['name']}", ""]
+    if model['doc']:
+        lines += [model['doc'], ""]
+    lines += [f"表名: `{model['table']}`", "", "| 字段 | 类型 | 必填 | 默认值 | 说明 |", "|------|------|------|--------|------|"]
+    for field in model['fields']:
+        required = '否' if field['optional'] else '是'
+        if is_relation_field(field, kinds):
+            required = '-' if field['list'] else required
+        default = f"`{escape_cell(field['default'])}`" if field['default'] else ''
+        lines.append(f"| `{field['name']}` | {format_type(field, kinds)} | {required} | {default} | "
+                     f"{escape_cell(field_notes(field, model, kinds))} |")
+
+    keys = []
+    if len(model['id']) > 1:
+        keys.append(f"- 复合主键 ({', '.join(model['id'])})")
+    for index in model['indexes']:
+        label = '唯一' if index['unique'] else ('全文索引' if index['type'] == 'Fulltext' else '索引')
+        name = index['map'] or index['name']
+        keys.append(f"- {label} ({', '.join(index['fields'])})" + (f" `{name}`" if name else ''))
+    if keys:
+        lines += ["", "**索引**:", ""] + keys
+    return '\n'.join(lines) + '\n'
+
+
+def render_enum(enum: Dict[str, Any]) -> str:
+    lines = [f"### {enum['name']}", ""]
+    if enum['doc']:
+        lines += [enum['doc'], ""]
+    if enum['dbName'] != enum['name']:
+        lines += [f"数据库类型: `{enum['dbName']}`", ""]
+    lines += ["| 值 | 说明 |", "|----|------|"]
+    for value in enum['values']:
+        note = value['doc'] + (f"（数据库值 `{value['dbName']}`）" if value['dbName'] != value['name'] else '')
+        lines.append(f"| `{value['name']}` | {escape_cell(note)} |")
+    return '\n'.join(lines) + '\n'
+
+
+def unique_field_sets(model: Dict[str, Any]) -> List[List[str]]:
+    sets = [[field['name']] for field in model['fields'] if field['unique']]
+    sets += [index['fields'] for index in model['indexes'] if index['unique']]
+    return sets + ([model['id']] if model['id'] else [])
+
+
+def render_relation_graph(schema: Dict[str, Any]) -> str:
+    """Mermaid erDiagram：每个带 fields/references 的关系一条边，由被引用的模型指向持有外键的模型"""
+    kinds = type_kinds(schema)
+    lines = ["```mermaid", "erDiagram"]
+    for model in schema['models'].values():
+        unique_sets = [sorted(fields) for fields in unique_field_sets(model)]
+        for field in model['fields']:
+            relation = field['relation']
+            if not is_relation_field(field, kinds) or not relation or not relation['fields']:
+                continue
+            parent_side = '|o' if field['optional'] else '||'
+            child_side = 'o|' if sorted(relation['fields']) in unique_sets else 'o{'
+            lines.append(f'    {field["type"]} {parent_side}--{child_side} {model["name"]} : "{field["name"]}"')
+    lines.append("```")
+    return '\n'.join(lines) + '\n'
+
+
+class SchemaDocGenerator:
+    """
+    按块增量渲染：片段的缓存键由渲染脚本哈希、块内容哈希与块中引用的非标量类型种类组成，
+    其他模型的变化不会让未修改的模型重新渲染（除非被引用的类型由模型变为枚举或反之）
+    """
+
+    def __init__(self, project_root: str = ".", cache: Optional[ToolCache] = None):
+        self.project_root = project_root
+        self.cache = cache
+        self.stats = {'rendered': [], 'reused': 0}
+        # 渲染代码变化时已缓存的片段全部失效
+        with open(__file__, 'rb') as f:
+            self.renderer = hashlib.sha1(f.read()).hexdigest()
+
+    def load_schema(self, schema_file: Optional[str] = None) -> Dict[str, Any]:
+        with open(schema_file or os.path.join(self.project_root, SCHEMA_FILE), 'r', encoding='utf-8') as f:
+            return parse_schema(f.read())
+
+    def _fragment(self, block: Dict[str, Any], kinds: Dict[str, str]) -> str:
+        if block['kind'] == 'enum':
+            context = {}
+        else:
+            context = {field['type']: kinds[field['type']] for field in block['fields'] if field['type'] in kinds}
+        key = f"{self.renderer}:{block['hash']}:{hash_text(json.dumps(context, sort_keys=True))}"
+        fragment = self.cache.get(CACHE_NAMESPACE, key) if self.cache else None
+        if fragment is not None:
+            self.stats['reused'] += 1
+            return fragment
+        fragment = render_enum(block) if block['kind'] == 'enum' else render_model(block, kinds)
+        self.stats['rendered'].append(block['name'])
+        if self.cache:
+            self.cache.put(CACHE_NAMESPACE, key, fragment)
+        return fragment
+
+    def render(self, schema: Dict[str, Any]) -> str:
+        kinds = type_kinds(schema)
+        provider = (schema['datasource'] or {}).get('settings', {}).get('provider', '未知')
+        lines = [
+            "# 数据库模式", "",
+            f"> 由 `{SCHEMA_FILE.replace(os.sep, '/')}` 自动生成，请勿手动编辑；运行 `npm run generate:db-schema` 更新", "",
+            f"数据库: {provider}，{len(schema['models'])} 个模型，{len(schema['enums'])} 个枚举", "",
+            "## 关系图", "",
+            render_relation_graph(schema),
+            "## 模型", ""
+        ]
+        lines += [self._fragment(model, kinds) for model in schema['models'].values()]
+        if schema['enums']:
+            lines += ["## 枚举", ""]
+            lines += [self._fragment(enum, kinds) for enum in schema['enums'].values()]
+        return '\n'.join(lines).rstrip('\n') + '\n'
+
+
+def write_if_changed(path: str, content: str) -> bool:
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            if f.read() == content:
+                return False
+    except FileNotFoundError:
+        pass
+    os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+    tmp_file = path + ".tmp"
+    with open(tmp_file, 'w', encoding='utf-8') as f:
+        f.write(content)
+    os.replace(tmp_file, path)
+    return True
+
+
+def normalize_sql_type(sql_type: str) -> str:
+    """'"public"."UserRole"' -> 'USERROLE'，'int4' -> 'INTEGER'，保留数组后缀与精度"""
+    sql_type = re.sub(r'"?\w+"?\.(?="?\w)', '', sql_type).replace('"', '')
+    sql_type = ' '.join(sql_type.upper().split()).replace(' (', '(').replace(', ', ',')
+    suffix = '[]' if sql_type.endswith('[]') else ''
+    base = sql_type[:-2] if suffix else sql_type
+    name, _, precision = base.partition('(')
+    name = SQL_TYPE_ALIASES.get(name.strip(), name.strip())
+    if not precision and name in TIME_TYPES:
+        # PostgreSQL 时间类型未指定精度时为 6
+        precision = '6)'
+    return name + (f"({precision}" if precision else '') + suffix
+
+
+def normalize_default(value: Optional[str]) -> Optional[str]:
+    """SQL 默认值：去掉类型转换，关键字统一大写，字符串字面量保持原样"""
+    if value is None:
+        return None
+    value = re.sub(r'::[\w"\s.\[\]()]+$', '', value.strip())
+    if value.lower().startswith('nextval('):
+        return 'AUTOINCREMENT'
+    return value if value.startswith("'") else value.upper()
+
+
+def expected_default(field: Dict[str, Any], kinds: Dict[str, str]) -> Optional[str]:
+    """Prisma @default(...) 在数据库中对应的默认值，由客户端生成的默认值返回None"""
+    value = field['default']
+    if value is None:
+        return None
+    function = re.match(r'^(\w+)\((.*)\)$', value, re.S)
+    if function:
+        name, args = function.groups()
+        if name == 'now':
+            return 'CURRENT_TIMESTAMP'
+        if name == 'autoincrement':
+            return 'AUTOINCREMENT'
+        if name == 'dbgenerated':
+            return normalize_default(parse_value(args)) if args else None
+        if name in CLIENT_DEFAULTS:
+            return None
+    if value.startswith('"'):
+        return "'" + parse_value(value).replace("'", "''") + "'"
+    if kinds.get(field['type']) == 'enum':
+        return f"'{value}'"
+    if value.startswith('['):
+        return normalize_default(f"ARRAY{value}")
+    return value.upper()
+
+
+def expected_column_type(field: Dict[str, Any], schema: Dict[str, Any]) -> str:
+    if field['dbType']:
+        name, _, args = field['dbType'].partition('(')
+        sql_type = NATIVE_TYPES.get(name, name.upper()) + (f"({args}" if args else '')
+    elif field['type'] in schema['enums']:
+        sql_type = schema['enums'][field['type']]['dbName']
+    else:
+        sql_type = SCALAR_TYPES.get(field['type'], field['type'])
+    return normalize_sql_type(sql_type + ('[]' if field['list'] else ''))
+
+
+def expected_structure(schema: Dict[str, Any]) -> Dict[str, Any]:
+    """schema 期望的数据库结构，格式与 MigrationReplay 的状态相同"""
+    kinds = type_kinds(schema)
+    tables, indexes, foreign_keys = {}, [], []
+    for model in schema['models'].values():
+        if model['kind'] != 'model':
+            continue
+        columns_by_field = {field['name']: field['column'] for field in model['fields']}
+        columns = {}
+        for field in model['fields']:
+            if is_relation_field(field, kinds):
+                relation = field['relation']
+                if relation and relation['fields']:
+                    target = schema['models'][field['type']]
+                    target_columns = {item['name']: item['column'] for item in target['fields']}
+                    foreign_keys.append({
+                        'table': model['table'],
+                        'columns': [columns_by_field.get(name, name) for name in relation['fields']],
+                        'refTable': target['table'],
+                        'refColumns': [target_columns.get(name, name) for name in relation['references']],
+                        'onDelete': REFERENTIAL_ACTIONS.get(relation['onDelete'] or ('SetNull' if field['optional'] else 'Restrict')),
+                        'onUpdate': REFERENTIAL_ACTIONS.get(relation['onUpdate'] or 'Cascade')
+                    })
+                continue
+            columns[field['column']] = {
+                'type': expected_column_type(field, schema),
+                'nullable': field['optional'] or field['list'],
+                'default': expected_default(field, kinds)
+            }
+            if field['unique']:
+                indexes.append({'table': model['table'], 'columns': [field['column']], 'unique': True, 'where': None})
+        tables[model['table']] = {'columns': columns, 'primaryKey': [columns_by_field.get(name, name) for name in model['id']]}
+        for index in model['indexes']:
+            indexes.append({'table': model['table'], 'columns': [columns_by_field.get(name, name) for name in index['fields']],
+                            'unique': index['unique'], 'where': None})
+    enums = {enum['dbName']: [value['dbName'] for value in enum['values']] for enum in schema['enums'].values()}
+    return {'tables': tables, 'indexes': indexes, 'foreignKeys': foreign_keys, 'enums': enums}
+
+
+def split_statements(sql: str) -> List[str]:
+    """去掉 -- 与 /* */ 注释后按分号拆分语句"""
+    sql = re.sub(r'/\*.*?\*/', ' ', sql, flags=re.S)
+    sql = '\n'.join(strip_sql_comment(line) for line in sql.splitlines())
+    return [' '.join(statement.split()) for statement in split_top_level(sql, ';') if statement.strip()]
+
+
+def strip_sql_comment(line: str) -> str:
+    quote = False
+    for index, char in enumerate(line):
+        if char == "'":
+            quote = not quote
+        elif not quote and line.startswith('--', index):
+            return line[:index]
+    return line
+
+
+def unquote_list(text: str) -> List[str]:
+    """'"deviceId", "timestamp" DESC' -> ['deviceId', 'timestamp']"""
+    return [item.split()[0].strip('"') for item in split_top_level(text) if item]
+
+
+def parse_column_definition(definition: str) -> Optional[Tuple[str, Dict[str, Any]]]:
+    match = re.match(r'^"?(\w+)"?\s+(.+?)(?=\s+(?:NOT NULL|NULL|DEFAULT|PRIMARY KEY|UNIQUE|REFERENCES|CONSTRAINT|COLLATE)\b|$)(.*)$',
+                     definition, re.I)
+    if not match:
+        return None
+    name, sql_type, rest = match.groups()
+    default = re.search(r'\bDEFAULT\s+(.+?)(?=\s+(?:NOT NULL|NULL|PRIMARY KEY|UNIQUE|REFERENCES|CONSTRAINT)\b|$)', rest, re.I)
+    serial = sql_type.strip().upper() in ('SERIAL', 'BIGSERIAL')
+    return name, {
+        'type': normalize_sql_type(sql_type),
+        'nullable': not re.search(r'\b(NOT NULL|PRIMARY KEY)\b', rest, re.I),
+        'default': 'AUTOINCREMENT' if serial else normalize_default(default.group(1) if default else None)
+    }
+
+
+class MigrationReplay:
+    """按顺序执行迁移SQL的结构部分（表、列、索引、约束、枚举），得到迁移产生的数据库结构"""
+
+    def __init__(self):
+        self.tables = {}
+        self.indexes = {}
+        self.foreign_keys = {}
+        self.enums = {}
+        self.warnings = []
+        self._source = None
+
+    def _warn(self, message: str):
+        self.warnings.append(f"{self._source}: {message}")
+
+    def apply_file(self, path: str, source: str):
+        with open(path, 'r', encoding='utf-8') as f:
+            sql = f.read()
+        self._source = source
+        for statement in split_statements(sql):
+            self.apply(statement)
+
+    def apply(self, statement: str):
+        patterns = (
+            (rf'^CREATE TABLE (?:IF NOT EXISTS )?{SQL_IDENT} \((.*)\)$', self._create_table),
+            (rf'^ALTER TABLE (?:IF EXISTS )?(?:ONLY )?{SQL_IDENT} (.*)$', self._alter_table),
+            (rf'^DROP TABLE (?:IF EXISTS )?{SQL_IDENT}(?: CASCADE)?$', self._drop_table),
+            (rf'^CREATE (UNIQUE )?INDEX (?:CONCURRENTLY )?(?:IF NOT EXISTS )?{SQL_IDENT} ON {SQL_IDENT}(?: USING \w+)? ?{SQL_IDENT_LIST}(?: WHERE (.*))?$',
+             self._create_index),
+            (rf'^DROP INDEX (?:CONCURRENTLY )?(?:IF EXISTS )?{SQL_IDENT}$', self._drop_index),
+            (rf'^ALTER INDEX (?:IF EXISTS )?{SQL_IDENT} RENAME TO {SQL_IDENT}$', self._rename_index),
+            (rf'^CREATE TYPE {SQL_IDENT} AS ENUM \((.*)\)$', self._create_enum),
+            (rf'^ALTER TYPE {SQL_IDENT} (.*)$', self._alter_enum),
+            (rf'^DROP TYPE (?:IF EXISTS )?{SQL_IDENT}$', lambda name: self.enums.pop(name, None)),
+        )
+        for pattern, handler in patterns:
+            match = re.match(pattern, statement, re.I | re.S)
+            if match:
+                handler(*match.groups())
+                return
+        if not re.match(r'^(INSERT|UPDATE|DELETE|SELECT|COMMENT|CREATE EXTENSION|GRANT|SET|(CREATE|ALTER|DROP) SEQUENCE)\b', statement, re.I):
+            self._warn(f"未识别的语句，已忽略: {statement[:80]}")
+
+    def _table(self, name: str) -> Optional[Dict[str, Any]]:
+        if name not in self.tables:
+            self._warn(f"表 {name} 不存在")
+        return self.tables.get(name)
+
+    def _add_constraint(self, table: str, definition: str):
+        match = re.match(rf'^(?:CONSTRAINT {SQL_IDENT} )?(PRIMARY KEY|UNIQUE|FOREIGN KEY) {SQL_IDENT_LIST}(.*)$', definition, re.I)
+        if not match:
+            self._warn(f"未识别的约束，已忽略: {definition[:80]}")
+            return
+        name, kind, columns, rest = match.groups()
+        columns = unquote_list(columns)
+        kind = kind.upper()
+        if kind == 'PRIMARY KEY':
+            self.tables[table]['primaryKey'] = columns
+            self.tables[table]['primaryKeyName'] = name
+        elif kind == 'UNIQUE':
+            self.indexes[name or f"{table}_{'_'.join(columns)}_key"] = {'table': table, 'columns': columns, 'unique': True, 'where': None}
+        else:
+            reference = re.match(rf'^ REFERENCES {SQL_IDENT} ?{SQL_IDENT_LIST}(.*)$', rest, re.I)
+            if not reference:
+                self._warn(f"未识别的外键，已忽略: {definition[:80]}")
+                return
+            ref_table, ref_columns, actions = reference.groups()
+            on_delete = re.search(r'ON DELETE (CASCADE|RESTRICT|NO ACTION|SET NULL|SET DEFAULT)', actions, re.I)
+            on_update = re.search(r'ON UPDATE (CASCADE|RESTRICT|NO ACTION|SET NULL|SET DEFAULT)', actions, re.I)
+            self.foreign_keys[name or f"{table}_{'_'.join(columns)}_fkey"] = {
+                'table': table,
+                'columns': columns,
+                'refTable': ref_table,
+                'refColumns': unquote_list(ref_columns),
+                # PostgreSQL 未指定时为 NO ACTION
+                'onDelete': on_delete.group(1).upper() if on_delete else 'NO ACTION',
+                'onUpdate': on_update.group(1).upper() if on_update else 'NO ACTION'
+            }
+
+    def _create_table(self, name: str, body: str):
+        self.tables[name] = {'columns': {}, 'primaryKey': [], 'primaryKeyName': None}
+        for item in split_top_level(body):
+            if re.match(r'^(CONSTRAINT|PRIMARY KEY|UNIQUE|FOREIGN KEY)\b', item, re.I):
+                self._add_constraint(name, item)
+                continue
+            column = parse_column_definition(item)
+            if column is None:
+                self._warn(f"未识别的列定义，已忽略: {item[:80]}")
+                continue
+            self.tables[name]['columns'][column[0]] = column[1]
+            if re.search(r'\bPRIMARY KEY\b', item, re.I):
+                self.tables[name]['primaryKey'] = [column[0]]
+
+    def _drop_table(self, name: str):
+        self.tables.pop(name, None)
+        for registry in (self.indexes, self.foreign_keys):
+            for key in [key for key, item in registry.items() if item['table'] == name]:
+                del registry[key]
+
+    def _alter_table(self, name: str, actions: str):
+        rename = re.match(rf'^RENAME TO {SQL_IDENT}$', actions, re.I)
+        if rename:
+            if self._table(name) is not None:
+                self.tables[rename.group(1)] = self.tables.pop(name)
+                for registry in (self.indexes, self.foreign_keys):
+                    for item in registry.values():
+                        item['table'] = rename.group(1) if item['table'] == name else item['table']
+            return
+        table = self._table(name)
+        if table is None:
+            return
+        for action in split_top_level(actions):
+            self._alter_table_action(name, table, action)
+
+    def _alter_table_action(self, name: str, table: Dict[str, Any], action: str):
+        columns = table['columns']
+        match = re.match(r'^ADD (?:COLUMN )?(?:IF NOT EXISTS )?(?!CONSTRAINT\b|PRIMARY KEY\b|UNIQUE\b|FOREIGN KEY\b)(.*)$', action, re.I)
+        if match:
+            column = parse_column_definition(match.group(1))
+            if column:
+                columns[column[0]] = column[1]
+            else:
+                self._warn(f"未识别的列定义，已忽略: {action[:80]}")
+            return
+        match = re.match(r'^ADD (.*)$', action, re.I)
+        if match:
+            self._add_constraint(name, match.group(1))
+            return
+        match = re.match(r'^DROP (?:COLUMN )?(?:IF EXISTS )?"?(\w+)"?(?: CASCADE| RESTRICT)?$', action, re.I)
+        if match and not match.group(1).upper() == 'CONSTRAINT':
+            columns.pop(match.group(1), None)
+            for registry in (self.indexes, self.foreign_keys):
+                for key in [key for key, item in registry.items() if item['table'] == name and match.group(1) in item['columns']]:
+                    del registry[key]
+            return
+        match = re.match(r'^DROP CONSTRAINT (?:IF EXISTS )?"?(\w+)"?(?: CASCADE| RESTRICT)?$', action, re.I)
+        if match:
+            constraint = match.group(1)
+            if table.get('primaryKeyName') == constraint:
+                table['primaryKey'] = []
+            self.indexes.pop(constraint, None)
+            self.foreign_keys.pop(constraint, None)
+            return
+        match = re.match(r'^RENAME (?:COLUMN )?"?(\w+)"? TO "?(\w+)"?$', action, re.I)
+        if match:
+            old, new = match.groups()
+            if old in columns:
+                columns[new] = columns.pop(old)
+            for registry in (self.indexes, self.foreign_keys):
+                for item in registry.values():
+                    if item['table'] == name:
+                        item['columns'] = [new if column == old else column for column in item['columns']]
+            table['primaryKey'] = [new if column == old else column for column in table['primaryKey']]
+            return
+        match = re.match(r'^ALTER (?:COLUMN )?"?(\w+)"? (.*)$', action, re.I)
+        if match and match.group(1) not in columns:
+            self._warn(f"列 {name}.{match.group(1)} 不存在: {action[:80]}")
+            return
+        if match:
+            column, change = columns[match.group(1)], match.group(2)
+            if re.match(r'^SET NOT NULL$', change, re.I):
+                column['nullable'] = False
+            elif re.match(r'^DROP NOT NULL$', change, re.I):
+                column['nullable'] = True
+            elif re.match(r'^DROP DEFAULT$', change, re.I):
+                column['default'] = None
+            elif re.match(r'^SET DEFAULT ', change, re.I):
+                column['default'] = normalize_default(change[len('SET DEFAULT '):])
+            elif re.match(r'^(SET DATA )?TYPE ', change, re.I):
+                column['type'] = normalize_sql_type(re.sub(r'^(SET DATA )?TYPE | USING .*$', '', change, flags=re.I))
+            else:
+                self._warn(f"未识别的列修改，已忽略: {action[:80]}")
+            return
+        self._warn(f"未识别的表修改，已忽略: {action[:80]}")
+
+    def _create_index(self, unique: Optional[str], name: str, table: str, columns: str, where: Optional[str]):
+        self.indexes[name] = {'table': table, 'columns': unquote_list(columns), 'unique': bool(unique), 'where': where}
+
+    def _drop_index(self, name: str):
+        if self.indexes.pop(name, None) is None:
+            self._warn(f"索引 {name} 不存在")
+
+    def _rename_index(self, old: str, new: str):
+        if old in self.indexes:
+            self.indexes[new] = self.indexes.pop(old)
+
+    def _create_enum(self, name: str, values: str):
+        self.enums[name] = [value.strip("'") for value in split_top_level(values)]
+
+    def _alter_enum(self, name: str, action: str):
+        values = self.enums.get(name)
+        if values is None:
+            self._warn(f"枚举 {name} 不存在")
+            return
+        add = re.match(r"^ADD VALUE (?:IF NOT EXISTS )?'([^']*)'(?: (BEFORE|AFTER) '([^']*)')?$", action, re.I)
+        rename = re.match(r"^RENAME VALUE '([^']*)' TO '([^']*)'$", action, re.I)
+        if add:
+            value, position, anchor = add.groups()
+            if value not in values:
+                index = len(values) if not position or anchor not in values else values.index(anchor) + (position.upper() == 'AFTER')
+                values.insert(index, value)
+        elif rename and rename.group(1) in values:
+            values[values.index(rename.group(1))] = rename.group(2)
+        elif re.match(rf'^RENAME TO {SQL_IDENT}$', action, re.I):
+            self.enums[re.match(rf'^RENAME TO {SQL_IDENT}$', action, re.I).group(1)] = self.enums.pop(name)
+        else:
+            self._warn(f"未识别的枚举修改，已忽略: {action[:80]}")
+
+    def structure(self) -> Dict[str, Any]:
+        return {
+            'tables': self.tables,
+            'indexes': list(self.indexes.values()),
+            'foreignKeys': list(self.foreign_keys.values()),
+            'enums': self.enums
+        }
+
+
+def replay_migrations(migrations_dir: str) -> MigrationReplay:
+    """按目录名（时间戳）顺序重放 <目录>/migration.sql"""
+    replay = MigrationReplay()
+    for name in sorted(os.listdir(migrations_dir)):
+        path = os.path.join(migrations_dir, name, 'migration.sql')
+        if os.path.isfile(path):
+            replay.apply_file(path, name)
+    return replay
+
+
+def diff_structures(expected: Dict[str, Any], actual: Dict[str, Any]) -> List[Dict[str, str]]:
+    """
+    比较 schema 期望的结构与迁移产生的结构，返回差异列表；
+    "仅在schema中" 表示需要新的迁移，"仅在迁移中" 表示 schema 中已删除或从未声明
+    """
+    differences = []
+
+    def add(table: str, kind: str, detail: str):
+        differences.append({'table': table, 'kind': kind, 'detail': detail})
+
+    for table in sorted(set(expected['tables']) | set(actual['tables'])):
+        if table not in actual['tables']:
+            add(table, '表', '仅在schema中')
+            continue
+        if table not in expected['tables']:
+            add(table, '表', '仅在迁移中')
+            continue
+        want, have = expected['tables'][table], actual['tables'][table]
+        for column in sorted(set(want['columns']) | set(have['columns'])):
+            if column not in have['columns']:
+                add(table, '列', f"{column}: 仅在schema中（{want['columns'][column]['type']}）")
+                continue
+            if column not in want['columns']:
+                add(table, '列', f"{column}: 仅在迁移中（{have['columns'][column]['type']}）")
+                continue
+            want_column, have_column = want['columns'][column], have['columns'][column]
+            if want_column['type'] != have_column['type']:
+                add(table, '列类型', f"{column}: schema {want_column['type']}，迁移 {have_column['type']}")
+            if want_column['nullable'] != have_column['nullable']:
+                add(table, '可空', f"{column}: schema {'可空' if want_column['nullable'] else '非空'}，"
+                                   f"迁移 {'可空' if have_column['nullable'] else '非空'}")
+            if want_column['default'] != have_column['default']:
+                add(table, '默认值', f"{column}: schema {want_column['default'] or '无'}，迁移 {have_column['default'] or '无'}")
+        if want['primaryKey'] != have['primaryKey']:
+            add(table, '主键', f"schema ({', '.join(want['primaryKey'])})，迁移 ({', '.join(have['primaryKey'])})")
+
+    def index_key(index: Dict[str, Any]) -> tuple:
+        return index['table'], tuple(index['columns']), index['unique']
+
+    want_indexes = {index_key(index) for index in expected['indexes']}
+    have_indexes = {index_key(index): index for index in actual['indexes']}
+    for key in sorted(want_indexes | set(have_indexes)):
+        table, columns, unique = key
+        label = f"{'唯一' if unique else '索引'} ({', '.join(columns)})"
+        if key not in have_indexes:
+            add(table, '索引', f"{label}: 仅在schema中")
+        elif key not in want_indexes:
+            where = have_indexes[key]['where']
+            add(table, '索引', f"{label}: 仅在迁移中" + (f"（部分索引 WHERE {where}，schema 无法表达）" if where else ''))
+
+    def foreign_key(item: Dict[str, Any]) -> tuple:
+        return item['table'], tuple(item['columns'])
+
+    want_keys = {foreign_key(item): item for item in expected['foreignKeys']}
+    have_keys = {foreign_key(item): item for item in actual['foreignKeys']}
+    for key in sorted(set(want_keys) | set(have_keys)):
+        table, columns = key
+        label = f"外键 ({', '.join(columns)})"
+        if key not in have_keys:
+            add(table, '外键', f"{label} → {want_keys[key]['refTable']}: 仅在schema中")
+            continue
+        if key not in want_keys:
+            add(table, '外键', f"{label} → {have_keys[key]['refTable']}: 仅在迁移中")
+            continue
+        for attribute in ('refTable', 'refColumns', 'onDelete', 'onUpdate'):
+            if want_keys[key][attribute] != have_keys[key][attribute]:
+                add(table, '外键', f"{label} {attribute}: schema {want_keys[key][attribute]}，迁移 {have_keys[key][attribute]}")
+
+    for enum in sorted(set(expected['enums']) | set(actual['enums'])):
+        if enum not in actual['enums']:
+            add(enum, '枚举', '仅在schema中')
+        elif enum not in expected['enums']:
+            add(enum, '枚举', '仅在迁移中')
+        else:
+            missing = [value for value in expected['enums'][enum] if value not in actual['enums'][enum]]
+            extra = [value for value in actual['enums'][enum] if value not in expected['enums'][enum]]
+            if missing:
+                add(enum, '枚举值', f"仅在schema中: {', '.join(missing)}")
+            if extra:
+                add(enum, '枚举值', f"仅在迁移中: {', '.join(extra)}")
+    return differences
+
+
+def format_differences(differences: List[Dict[str, str]], warnings: List[str]) -> str:
+    if not differences:
+        lines = ["✅ schema.prisma 与迁移一致"]
+    else:
+        lines = [f"⚠️ schema.prisma 与迁移存在 {len(differences)} 处差异:"]
+        table = None
+        for difference in differences:
+            if difference['table'] != table:
+                table = difference['table']
+                lines.append(f"  {table}")
+            lines.append(f"    - [{difference['kind']}] {difference['detail']}")
+    if warnings:
+        lines.append(f"ℹ️ 重放迁移时忽略了 {len(warnings)} 条语句:")
+        lines += [f"  - {warning}" for warning in warnings]
+    return '\n'.join(lines)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='由 schema.prisma 生成数据库模式文档，或与迁移目录比较')
+    parser.add_argument('--root', default='.', help='仓库根目录')
+    parser.add_argument('--schema', help=f'schema 文件（默认 {SCHEMA_FILE}）')
+    subparsers = parser.add_subparsers(dest='command', required=True)
+    render_parser = subparsers.add_parser('render', help='生成数据库模式文档')
+    render_parser.add_argument('--output', help=f'输出文件（默认 {OUTPUT_FILE}）')
+    render_parser.add_argument('--check', action='store_true', help='只检查文档是否最新，过期时以非零状态退出')
+    render_parser.add_argument('--no-cache', action='store_true', help='不读写渲染缓存')
+    diff_parser = subparsers.add_parser('diff', help='比较 schema 与 migrations/ 重放后的结构')
+    diff_parser.add_argument('--migrations', help=f'迁移目录（默认 {MIGRATIONS_DIR}）')
+    diff_parser.add_argument('--json', action='store_true', help='以JSON格式输出差异')
+    diff_parser.add_argument('--strict', action='store_true', help='存在差异时以非零状态退出')
+    args = parser.parse_args()
+
+    started = time.perf_counter()
+    schema_file = args.schema or os.path.join(args.root, SCHEMA_FILE)
+    try:
+        with open(schema_file, 'r', encoding='utf-8') as f:
+            schema = parse_schema(f.read())
+    except (FileNotFoundError, SchemaError) as e:
+        print(f"❌ 无法读取 {schema_file}: {e}", file=sys.stderr)
+        sys.exit(1)
+
+    if args.command == 'diff':
+        replay = replay_migrations(args.migrations or os.path.join(args.root, MIGRATIONS_DIR))
+        differences = diff_structures(expected_structure(schema), replay.structure())
+        if args.json:
+            print(json.dumps({'differences': differences, 'warnings': replay.warnings}, ensure_ascii=False, indent=2))
+        else:
+            print(format_differences(differences, replay.warnings))
+        if args.strict and differences:
+            sys.exit(1)
+        return
+
+    cache = None if args.no_cache else ToolCache(default_cache_root(args.root))
+    generator = SchemaDocGenerator(args.root, cache)
+    content = generator.render(schema)
+    output = args.output or os.path.join(args.root, OUTPUT_FILE)
+    rendered = generator.stats['rendered']
+    detail = f"重新渲染 {len(rendered)} 个块" + (f"（{', '.join(rendered)}）" if rendered else '') + f"，复用 {generator.stats['reused']} 个"
+    if args.check:
+        try:
+            with open(output, 'r', encoding='utf-8') as f:
+                current = f.read() == content
+        except FileNotFoundError:
+            current = False
+        print(f"{'✅' if current else '❌'} {output} {'已是最新' if current else '需要重新生成'}（{detail}）")
+        if not current:
+            sys.exit(1)
+    else:
+        changed = write_if_changed(output, content)
+        print(f"{'✅ 已更新' if changed else '⏭️ 无变化'} {output}：{detail}，耗时 {(time.perf_counter() - started) * 1000:.0f}ms")
+    if cache:
+        cache.record_stats('prisma_schema_docs')
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,268 @@
+#!/usr/bin/env python3
+"""
+项目进度时间序列脚本
+用一次 `git log --raw` 流式读取 project-plan-structured.json 与各阶段文档的历史版本，
+通过 `git cat-file --batch` 读取每个版本的内容，按 blob SHA 缓存解析结果（相同内容只解析一次），
+输出各阶段、各模块的进度时间序列（CSV/JSON），用于绘制速度与燃尽图。后续运行只处理新增提交
+"""
+
+import os
+import re
+import io
+import csv
+import sys
+import json
+import argparse
+import threading
+import subprocess
+from datetime import datetime
+from typing import List, Dict, Any, Optional, Iterator, Tuple
+
+from parse_tasks import PHASE_FILES, scan_tasks
+from git_access import GitRepository
+from tool_cache import ToolCache, default_cache_root
+
+
+HISTORY_VERSION = 1
+PLAN_FILE = "docs/project-plan-structured.json"
+COMMIT_MARKER = '\x00'
+NULL_SHA = '0' * 40
+PERCENT_PATTERN = re.compile(r'(\d+(?:\.\d+)?)%')
+CSV_COLUMNS = ['date', 'commit', 'series', 'name', 'total', 'completed', 'inProgress', 'remaining', 'percentage']
+
+
+def _percentage(value: Any) -> Optional[float]:
+    match = PERCENT_PATTERN.search(str(value or ''))
+    return float(match.group(1)) if match else None
+
+
+def summarize_plan(data: bytes) -> Dict[str, Any]:
+    """提取计划JSON中的总体、阶段与模块进度"""
+    try:
+        plan = json.loads(data.decode('utf-8'))
+    except (UnicodeDecodeError, json.JSONDecodeError):
+        return {}
+    summary = {'overall': {'overall': {'percentage': _percentage(plan.get('overallProgress'))}}, 'phase': {}, 'module': {}}
+    for phase in plan.get('phases', []):
+        summary['phase'][phase.get('name', '')] = {'percentage': _percentage(phase.get('progress'))}
+    for module in plan.get('modules', []):
+        summary['module'][module.get('name', '')] = {'percentage': _percentage(module.get('status'))}
+    return summary
+
+
+def summarize_document(data: bytes, document: str) -> Dict[str, Any]:
+    """统计阶段文档中各状态的任务数"""
+    completed = in_progress = 0
+    tasks = scan_tasks(data, document)
+    for task in tasks:
+        status = task['status']
+        if "✅" in status or "已完成" in status:
+            completed += 1
+        elif "🔄" in status or "进行中" in status:
+            in_progress += 1
+    return {'total': len(tasks), 'completed': completed, 'inProgress': in_progress}
+
+
+class ProgressHistory:
+    CACHE_NAMESPACE = 'progress-history'
+
+    def __init__(self, project_root: str = ".", cache: Optional[ToolCache] = None):
+        self.project_root = project_root
+        # 已处理的提交、blob解析结果与数据点是共享缓存中的一个条目
+        self.cache = cache
+        self.paths = [PLAN_FILE] + [f"docs/{file_name}" for file_name in PHASE_FILES.values()]
+        self.phase_by_path = {f"docs/{file_name}": phase for phase, file_name in PHASE_FILES.items()}
+        self.stats = {'commits': 0, 'parsedBlobs': 0, 'cachedBlobs': 0}
+        self.repository = GitRepository(project_root)
+        self.state = self._load_cache()
+
+    def _empty_state(self) -> Dict[str, Any]:
+        return {'version': HISTORY_VERSION, 'head': None, 'blobs': {}, 'current': {}, 'latest': {}, 'points': []}
+
+    def _cache_key(self) -> str:
+        # 多个项目共用缓存目录时以仓库路径区分
+        return f"v{HISTORY_VERSION}:{os.path.abspath(self.project_root)}"
+
+    def _load_cache(self) -> Dict[str, Any]:
+        state = self.cache.get(self.CACHE_NAMESPACE, self._cache_key()) if self.cache else None
+        return state if state is not None else self._empty_state()
+
+    def save_cache(self):
+        """写入进度历史缓存"""
+        if self.cache:
+            self.cache.put(self.CACHE_NAMESPACE, self._cache_key(), self.state)
+
+    def _git(self, *args: str) -> subprocess.CompletedProcess:
+        return subprocess.run(['git', *args], cwd=self.project_root, capture_output=True)
+
+    def _log(self, since: Optional[str], head: str) -> List[Tuple[str, int, Dict[str, str]]]:
+        """按时间顺序列出主线上修改过相关文件的提交：(提交哈希, 时间戳, {路径: 新blob})"""
+        revision = f"{since}..{head}" if since else head
+        command = [
+            'git', '-c', 'core.quotepath=off', 'log', '--raw', '--no-abbrev', '--no-renames',
+            '--first-parent', '-m', '--reverse', '--format=%x00%H %ct', revision, '--', *self.paths
+        ]
+        process = subprocess.Popen(command, cwd=self.project_root, stdout=subprocess.PIPE,
+                                   stderr=subprocess.DEVNULL, text=True, encoding='utf-8')
+        commits = []
+        for line in process.stdout:
+            if line.startswith(COMMIT_MARKER):
+                sha, timestamp = line[1:].split()
+                commits.append((sha, int(timestamp), {}))
+            elif line.startswith(':') and commits:
+                meta, path = line.rstrip('\n').split('\t', 1)
+                commits[-1][2][path] = meta.split()[3]
+        process.wait()
+        return commits
+
+    def _read_blobs(self, shas: List[str]) -> Iterator[Tuple[str, bytes]]:
+        """通过单个 `git cat-file --batch` 进程流式读取blob内容"""
+        process = subprocess.Popen(['git', 'cat-file', '--batch'], cwd=self.project_root,
+                                   stdin=subprocess.PIPE, stdout=subprocess.PIPE)
+
+        def feed():
+            for sha in shas:
+                process.stdin.write(f"{sha}\n".encode())
+            process.stdin.close()
+
+        writer = threading.Thread(target=feed, daemon=True)
+        writer.start()
+        for _ in shas:
+            header = process.stdout.readline().split()
+            if len(header) < 3:
+                continue
+            data = process.stdout.read(int(header[2]))
+            process.stdout.read(1)
+            yield header[0].decode(), data
+        writer.join()
+        process.wait()
+
+    def _summarize_blobs(self, needed: Dict[str, str]):
+        """解析尚未缓存的blob（sha -> 路径）"""
+        blobs = self.state['blobs']
+        missing = [sha for sha in needed if sha not in blobs]
+        self.stats['cachedBlobs'] += len(needed) - len(missing)
+        for sha, data in self._read_blobs(missing):
+            path = needed[sha]
+            if path == PLAN_FILE:
+                blobs[sha] = summarize_plan(data)
+            else:
+                blobs[sha] = {'phase': {self.phase_by_path[path]: summarize_document(data, os.path.basename(path))}}
+            self.stats['parsedBlobs'] += 1
+
+    def _snapshot(self) -> Dict[str, Dict[str, Any]]:
+        """合并当前各文件版本的摘要，得到 序列:名称 -> 指标"""
+        metrics = {}
+        for path in self.paths:
+            sha = self.state['current'].get(path)
+            for series, items in self.state['blobs'].get(sha, {}).items():
+                for name, values in items.items():
+                    metrics.setdefault(f"{series}:{name}", {}).update(
+                        {key: value for key, value in values.items() if value is not None}
+                    )
+        return metrics
+
+    def update(self) -> List[Dict[str, Any]]:
+        """处理新增提交，返回本次新增的数据点"""
+        result = self._git('rev-parse', '--verify', '-q', 'HEAD')
+        if result.returncode != 0:
+            print("⚠️ 警告: 当前目录不是Git仓库或没有提交，跳过进度历史统计")
+            return []
+        head = result.stdout.decode().strip()
+        since = self.state.get('head')
+        if since == head:
+            return []
+        # 浅克隆只需加深到上次处理的提交
+        if since and not self.repository.ensure_commit(since, head):
+            # 历史被改写，全量重建（blob缓存仍然有效）
+            blobs = self.state['blobs']
+            self.state = dict(self._empty_state(), blobs=blobs)
+            since = None
+        if not since:
+            self.repository.unshallow()
+
+        commits = self._log(since, head)
+        self.stats['commits'] = len(commits)
+        needed = {}
+        for _, _, changes in commits:
+            for path, sha in changes.items():
+                if sha != NULL_SHA:
+                    needed.setdefault(sha, path)
+        self._summarize_blobs(needed)
+
+        added = []
+        latest = self.state['latest']
+        for sha, timestamp, changes in commits:
+            for path, blob in changes.items():
+                if blob == NULL_SHA:
+                    self.state['current'].pop(path, None)
+                else:
+                    self.state['current'][path] = blob
+            # 只记录发生变化的序列，保持时间序列紧凑
+            for key, values in self._snapshot().items():
+                if latest.get(key) != values:
+                    latest[key] = values
+                    series, name = key.split(':', 1)
+                    added.append(dict(values, date=timestamp, commit=sha, series=series, name=name))
+        self.state['points'].extend(added)
+        self.state['head'] = head
+        self.save_cache()
+        return added
+
+    def rows(self) -> Iterator[Dict[str, Any]]:
+        """展开为表格行（含燃尽所需的剩余任务数）"""
+        for point in self.state['points']:
+            row = dict(point, date=datetime.fromtimestamp(point['date']).isoformat(timespec='seconds'))
+            if 'total' in point:
+                row['remaining'] = point['total'] - point.get('completed', 0)
+            yield row
+
+
+def render_csv(rows: Iterator[Dict[str, Any]]) -> str:
+    output = io.StringIO()
+    writer = csv.DictWriter(output, fieldnames=CSV_COLUMNS, extrasaction='ignore', lineterminator='\n')
+    writer.writeheader()
+    writer.writerows(rows)
+    return output.getvalue()
+
+
+def render_json(rows: Iterator[Dict[str, Any]]) -> str:
+    """按序列分组输出：{序列:名称: [[时间, 提交, total, completed, inProgress, remaining, percentage], ...]}"""
+    series = {}
+    for row in rows:
+        series.setdefault(f"{row['series']}:{row['name']}", []).append(
+            [row.get(column) for column in CSV_COLUMNS if column not in ('series', 'name')]
+        )
+    columns = [column for column in CSV_COLUMNS if column not in ('series', 'name')]
+    return json.dumps({'columns': columns, 'series': series}, ensure_ascii=False, separators=(',', ':'))
+
+
+def main():
+    parser = argparse.ArgumentParser(description='从Git历史生成各阶段/模块的进度时间序列')
+    parser.add_argument('--root', default='.', help='仓库根目录')
+    parser.add_argument('--format', choices=['csv', 'json'], default='csv', help='输出格式')
+    parser.add_argument('--output', help='输出文件（默认输出到标准输出）')
+    parser.add_argument('--no-cache', action='store_true', help='不读写进度历史缓存')
+    args = parser.parse_args()
+
+    cache = None if args.no_cache else ToolCache(default_cache_root(args.root))
+    history = ProgressHistory(args.root, cache)
+    added = history.update()
+    rows = history.rows()
+    content = render_json(rows) if args.format == 'json' else render_csv(rows)
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            f.write(content)
+        print(f"✅ 进度时间序列已写入: {args.output}")
+    else:
+        sys.stdout.write(content)
+    if cache:
+        cache.record_stats('progress_history')
+    stats = history.stats
+    print(f"处理 {stats['commits']} 个提交，新增 {len(added)} 个数据点（解析 {stats['parsedBlobs']} 个blob，缓存命中 {stats['cachedBlobs']}）",
+          file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,289 @@
+#!/usr/bin/env python3
+"""
+子任务同步为子Issue
+每个子任务对应一个带任务ID标记的Issue，挂在父任务的Issue下，勾选状态对应Issue的关闭/打开状态。
+只有标题、细项或勾选状态变化的子任务产生写操作，写操作以别名合并为少量 GraphQL 请求：
+第一批新建与更新子Issue，第二批把新建的子Issue挂到父Issue下（并关闭已勾选的）
+"""
+
+from typing import List, Dict, Any, Optional, Tuple
+
+from check_doc_links import github_slug
+from create_github_issues import format_issue_title
+from github_http_cache import GitHubHttpError
+from sync_journal import SyncJournal, TASK_ID_MARKER, idempotency_key
+
+
+# 每个 GraphQL 请求合并的变更数
+BATCH_SIZE = 20
+SUB_ACTION_NAMES = {
+    'create': '新建',
+    'update': '更新',
+    'close': '关闭',
+    'reopen': '重新打开',
+    'noop': '无变化'
+}
+INPUT_TYPES = {
+    'createIssue': 'CreateIssueInput',
+    'updateIssue': 'UpdateIssueInput',
+    'addSubIssue': 'AddSubIssueInput'
+}
+ISSUE_SELECTION = "issue { id number url }"
+
+
+def sub_task_ids(parent_id: str, sub_tasks: List[Dict[str, Any]]) -> List[str]:
+    """子任务ID：父任务ID + 子任务标题锚点，同名子任务依次追加序号"""
+    ids = []
+    used = set()
+    for sub_task in sub_tasks:
+        base = f"{parent_id}/{github_slug(sub_task['title'])}"
+        task_id, suffix = base, 0
+        while task_id in used:
+            suffix += 1
+            task_id = f"{base}-{suffix}"
+        used.add(task_id)
+        ids.append(task_id)
+    return ids
+
+
+def format_sub_issue_body(parent: Dict[str, Any], sub_task: Dict[str, Any], task_id: str) -> str:
+    body = f"所属任务: {parent.get('title', '未命名任务')}\n"
+    if sub_task.get('group'):
+        body += f"分组: {sub_task['group']}\n"
+    if sub_task.get('items'):
+        body += "\n## 细项\n\n"
+        for item in sub_task['items']:
+            body += f"- [{'x' if item['checked'] else ' '}] {item['title']}\n"
+    body += "\n---\n"
+    body += "<!-- 此Issue由自动化脚本创建/更新 -->\n"
+    body += TASK_ID_MARKER.format(task_id=task_id) + "\n"
+    return body
+
+
+def plan_sub_issues(planner, operation: Dict[str, Any], task: Dict[str, Any], phase: str) -> List[Dict[str, Any]]:
+    """为任务的子任务计算子Issue操作（planner 为 SyncPlanner，用于按任务ID/标题匹配已有Issue）"""
+    sub_tasks = planner.formatter._load_task(task).get('sub_tasks') or []
+    operations = []
+    for sub_task, task_id in zip(sub_tasks, sub_task_ids(operation['taskId'], sub_tasks)):
+        title = format_issue_title(sub_task, phase)
+        body = format_sub_issue_body(task, sub_task, task_id)
+        state = 'closed' if sub_task['checked'] else 'open'
+        sub_operation = {
+            'taskId': task_id,
+            'title': title,
+            'body': body,
+            'state': state,
+            'changes': {}
+        }
+        issue, _ = planner._match_issue(task_id, title, fuzzy=False)
+        if issue is None:
+            sub_operation.update(action='create', number=None, url=None, nodeId=None,
+                                 idempotencyKey=idempotency_key('create', task_id))
+            operations.append(sub_operation)
+            continue
+
+        planner.claimed.add(issue['number'])
+        if planner.unavailable is not None:
+            planner.unavailable.add(issue['number'])
+        sub_operation.update(number=issue['number'], url=issue['html_url'], nodeId=issue.get('node_id'))
+        changes = sub_operation['changes']
+        if issue['title'] != title:
+            changes['title'] = [issue['title'], title]
+        if issue.get('body', '') != body:
+            changes['body'] = True
+        if issue['state'] != state:
+            changes['state'] = [issue['state'], state]
+        if 'state' in changes:
+            sub_operation['action'] = 'close' if state == 'closed' else 'reopen'
+        else:
+            sub_operation['action'] = 'update' if changes else 'noop'
+        # 幂等键包含目标状态；完成记录只在同一次运行内有效，勾选→取消→再勾选时新的运行会按远程状态重新提交
+        sub_operation['idempotencyKey'] = idempotency_key('update', task_id, {'title': title, 'body': body, 'state': state})
+        operations.append(sub_operation)
+    return operations
+
+
+def sub_issue_operations(plan: Dict[str, Any]) -> List[Dict[str, Any]]:
+    return [sub for operation in plan['operations'] for sub in operation.get('subIssues', [])]
+
+
+def build_batch_mutation(mutations: List[Tuple[str, str, Dict[str, Any]]]) -> Tuple[str, Dict[str, Any]]:
+    """把 [(别名, 变更名, 输入)] 合并为一个带变量的 GraphQL 变更文档"""
+    definitions = []
+    fields = []
+    variables = {}
+    for alias, name, data in mutations:
+        definitions.append(f"${alias}: {INPUT_TYPES[name]}!")
+        fields.append(f"{alias}: {name}(input: ${alias}) {{ {ISSUE_SELECTION} }}")
+        variables[alias] = data
+    return f"mutation({', '.join(definitions)}) {{ {' '.join(fields)} }}", variables
+
+
+class SubIssueSync:
+    def __init__(self, creator, journal: Optional[SyncJournal] = None, batch_size: int = BATCH_SIZE):
+        self.creator = creator
+        self.http = creator.http
+        self.repo_name = creator.repo_name
+        self.journal = journal
+        self.batch_size = batch_size
+        self.stats = {'requests': 0, 'mutations': 0, 'failed': 0}
+        self._node_ids = {}
+
+    def _run_batches(self, mutations: List[Tuple[str, str, Dict[str, Any]]]) -> Dict[str, Tuple[Optional[Dict[str, Any]], Optional[str]]]:
+        """分批发送变更，返回 别名 -> (issue, 错误信息)；请求整体失败时该批所有别名都记为失败"""
+        results = {}
+        for start in range(0, len(mutations), self.batch_size):
+            batch = mutations[start:start + self.batch_size]
+            query, variables = build_batch_mutation(batch)
+            self.stats['requests'] += 1
+            self.stats['mutations'] += len(batch)
+            try:
+                response = self.http.graphql(query, variables)
+            except Exception as e:
+                for alias, _, _ in batch:
+                    results[alias] = (None, str(e))
+                continue
+            data = response.get('data') or {}
+            errors = {}
+            for error in response.get('errors') or []:
+                path = error.get('path') or ['']
+                errors.setdefault(path[0], error.get('message', '未知错误'))
+            for alias, _, _ in batch:
+                payload = data.get(alias)
+                results[alias] = ((payload or {}).get('issue'), errors.get(alias) or (None if payload else '没有返回结果'))
+        return results
+
+    def _issue_node_id(self, number: int) -> str:
+        """Issue的GraphQL节点ID，优先取远程快照中的记录"""
+        if number not in self._node_ids:
+            entry = next((issue for issue in self.creator.snapshot['issues'] if issue['number'] == number), None)
+            node_id = entry.get('node_id') if entry else None
+            if not node_id:
+                issue, _ = self.http.get(f"/repos/{self.repo_name}/issues/{number}")
+                node_id = issue['node_id']
+            self._node_ids[number] = node_id
+        return self._node_ids[number]
+
+    def _exists(self, number: int) -> bool:
+        """上次运行创建的子Issue是否仍然存在，已被删除（404/410）时需要重新创建"""
+        try:
+            self._issue_node_id(number)
+        except GitHubHttpError as e:
+            if e.status not in (404, 410):
+                raise
+            print(f"上次创建的子Issue #{number} 已不存在，重新创建")
+            return False
+        return True
+
+    def _record(self, sub_operation: Dict[str, Any], issue: Dict[str, Any]):
+        issues = self.creator.snapshot['issues']
+        entry = next((item for item in issues if item['number'] == issue['number']), None)
+        if entry is None:
+            entry = {'number': issue['number'], 'labels': []}
+            issues.append(entry)
+        previous_title = entry.get('title')
+        entry.update({
+            'title': sub_operation['title'],
+            'body': sub_operation['body'],
+            'state': sub_operation['state'],
+            'html_url': issue['url'],
+            'node_id': issue['id']
+        })
+        self.creator._index_issue(entry, previous_title)
+
+    def _fail(self, sub_operation: Dict[str, Any], error: str):
+        self.stats['failed'] += 1
+        if self.journal:
+            # 累计尝试达到上限时放弃，不让检查点一直保留
+            self.journal.failed(sub_operation['idempotencyKey'], error)
+        print(f"处理子Issue失败: {sub_operation['title']} - {error}")
+
+    def run(self, plan: Dict[str, Any]) -> Dict[str, int]:
+        """执行计划中有变化的子Issue操作（跳过日志中已完成的）"""
+        pending = []
+        for operation in plan['operations']:
+            for sub_operation in operation.get('subIssues', []):
+                if sub_operation['action'] == 'noop':
+                    continue
+                if self.journal and self.journal.is_settled(sub_operation['idempotencyKey']):
+                    continue
+                pending.append((operation, sub_operation))
+        if not pending:
+            return self.stats
+
+        repository_id = None
+        first, second = [], []
+        targets = {}
+        for index, (operation, sub_operation) in enumerate(pending):
+            alias = f"s{index}"
+            targets[alias] = (operation, sub_operation)
+            key = sub_operation['idempotencyKey']
+            if self.journal:
+                self.journal.started(key)
+            if sub_operation['action'] == 'create':
+                created = self.journal.result(key) if self.journal else {}
+                if created.get('number') is not None and self._exists(created['number']):
+                    # 上次运行已创建，只需补完挂接与关闭
+                    sub_operation.update(number=created['number'], url=created['url'])
+                    continue
+                if repository_id is None:
+                    repository, _ = self.http.get(f"/repos/{self.repo_name}")
+                    repository_id = repository['node_id']
+                first.append((alias, 'createIssue', {
+                    'repositoryId': repository_id, 'title': sub_operation['title'], 'body': sub_operation['body']
+                }))
+            else:
+                fields = {'id': sub_operation['nodeId'] or self._issue_node_id(sub_operation['number'])}
+                if 'title' in sub_operation['changes']:
+                    fields['title'] = sub_operation['title']
+                if 'body' in sub_operation['changes']:
+                    fields['body'] = sub_operation['body']
+                if 'state' in sub_operation['changes']:
+                    fields['state'] = sub_operation['state'].upper()
+                first.append((alias, 'updateIssue', fields))
+
+        results = self._run_batches(first)
+        for alias, (operation, sub_operation) in targets.items():
+            key = sub_operation['idempotencyKey']
+            if alias in results:
+                issue, error = results[alias]
+                if error:
+                    self._fail(sub_operation, error)
+                    continue
+                self._record(sub_operation, issue)
+                self._node_ids[issue['number']] = issue['id']
+                if sub_operation['action'] != 'create':
+                    if self.journal:
+                        self.journal.completed(key, issue['number'], issue['url'])
+                    continue
+                sub_operation.update(number=issue['number'], url=issue['url'])
+                if self.journal:
+                    self.journal.created(key, issue['number'], issue['url'])
+            # 新建的子Issue：挂到父Issue下，已勾选的同时关闭
+            if operation.get('number') is None:
+                self._fail(sub_operation, "父任务的Issue尚未创建")
+                continue
+            child_id = self._issue_node_id(sub_operation['number'])
+            second.append((f"{alias}l", 'addSubIssue', {
+                'issueId': self._issue_node_id(operation['number']), 'subIssueId': child_id
+            }))
+            if sub_operation['state'] == 'closed':
+                second.append((f"{alias}c", 'updateIssue', {'id': child_id, 'state': 'CLOSED'}))
+
+        results = self._run_batches(second)
+        for alias, (operation, sub_operation) in targets.items():
+            if f"{alias}l" not in results:
+                continue
+            errors = [results[name][1] for name in (f"{alias}l", f"{alias}c") if name in results and results[name][1]]
+            if errors:
+                self._fail(sub_operation, '; '.join(errors))
+                continue
+            self._record(sub_operation, {'number': sub_operation['number'], 'url': sub_operation['url'],
+                                         'id': self._issue_node_id(sub_operation['number'])})
+            if self.journal:
+                self.journal.completed(sub_operation['idempotencyKey'], sub_operation['number'], sub_operation['url'])
+        return self.stats
+
+    def summary(self) -> str:
+        return (f"子Issue: {self.stats['mutations']} 个变更合并为 {self.stats['requests']} 次GraphQL请求"
+                + (f"，{self.stats['failed']} 个失败" if self.stats['failed'] else ""))
@@ -0,0 +1,289 @@
+#!/usr/bin/env python3
+"""
+GitHub Issues <-> 文档 双向同步脚本
+仅拉取上次游标之后变更过的Issue，把关闭/重新打开映射回阶段文档中的任务状态
+"""
+
+import os
+import re
+import sys
+import json
+import bisect
+from datetime import datetime, timezone
+from typing import List, Dict, Any, Optional
+
+from github import Github
+
+from create_github_issues import format_issue_title
+from parse_tasks import PHASE_FILES, scan_tasks
+from plan_stream import iter_tasks
+from sync_journal import TASK_ID_MARKER_PATTERN, derive_task_id
+
+
+# 任务标题行（三级或四级标题），可带状态符号与 @done(...) 标记
+HEADING_PATTERN = re.compile(r'^(#{3,4})\s*(✅|🔄|⏸\ufe0f?|☐|\[x\]|\[~\]|\[ \])?\s*(.*?)\s*$')
+DONE_PATTERN = re.compile(r'\s*@done\((.*?)\)')
+STATUS_LINE_PATTERN = re.compile(r'^(\s*(?:[-*]\s+)?\*\*状态\*\*[:：]\s*)(.*?)\s*$')
+STATUS_SYMBOLS = ('✅', '🔄', '⏸', '☐')
+
+
+def is_completed_status(status: str) -> bool:
+    """判断状态文本是否表示已完成（与Issue关闭逻辑保持一致）"""
+    return "✅" in status or "已完成" in status
+
+
+def default_state_file(project_root: str) -> str:
+    """双向同步状态文件（游标、上次对账结果、未解决冲突）"""
+    return os.path.join(project_root, ".cache", "doc-tools", "bidirectional-state.json")
+
+
+class BidirectionalSync:
+    def __init__(self, repo, project_root: str = ".", state_file: Optional[str] = None):
+        self.repo = repo
+        self.project_root = project_root
+        self.docs_dir = os.path.join(project_root, "docs")
+        self.state_file = state_file or default_state_file(project_root)
+        self.state = {'cursor': None, 'tasks': {}, 'conflicts': []}
+
+    def load_state(self) -> Dict[str, Any]:
+        """加载同步游标与对账记录，文件不存在时视为首次同步"""
+        try:
+            with open(self.state_file, 'r', encoding='utf-8') as f:
+                self.state.update(json.load(f))
+        except FileNotFoundError:
+            print("ℹ️ 未找到双向同步状态，将执行首次全量拉取")
+        except json.JSONDecodeError as e:
+            print(f"⚠️ 警告: 同步状态文件损坏，将执行全量拉取 - {e}")
+        return self.state
+
+    def save_state(self):
+        """保存同步游标与对账记录"""
+        os.makedirs(os.path.dirname(self.state_file), exist_ok=True)
+        tmp_file = self.state_file + ".tmp"
+        with open(tmp_file, 'w', encoding='utf-8') as f:
+            json.dump(self.state, f, ensure_ascii=False, indent=2)
+        os.replace(tmp_file, self.state_file)
+
+    def _scan_tasks(self, data: bytes, lines: List[str], document: str) -> List[Dict[str, Any]]:
+        """复用任务解析器的字节范围，换算为标题行与状态行的行号"""
+        line_starts = [0]
+        for line in lines[:-1]:
+            line_starts.append(line_starts[-1] + len(line.encode('utf-8')) + 1)
+
+        tasks = []
+        for task in scan_tasks(data, document):
+            start, end = task['source']['span']
+            heading = bisect.bisect_left(line_starts, start)
+            last = bisect.bisect_left(line_starts, end)
+            status_line = next(
+                (index for index in range(heading + 1, last) if STATUS_LINE_PATTERN.match(lines[index])),
+                None
+            )
+            task.update(heading=heading, statusLine=status_line, end=last)
+            tasks.append(task)
+        return tasks
+
+    def _plan_task_ids(self) -> Dict[tuple, str]:
+        """项目计划中已分配的任务ID（改名后的任务沿用原ID），计划不存在时返回空"""
+        try:
+            return {
+                (phase, task['title']): task['id']
+                for phase, task in iter_tasks(os.path.join(self.docs_dir, "project-plan-structured.json"))
+                if task.get('id')
+            }
+        except (FileNotFoundError, json.JSONDecodeError):
+            return {}
+
+    def index_documents(self) -> Dict[str, Dict[str, Any]]:
+        """建立 任务ID -> 文档任务位置 的索引，没有任务ID标记的旧Issue按标题查找"""
+        index = {}
+        self.titles = {}
+        self.documents = {}
+        plan_ids = self._plan_task_ids()
+        for phase, file_name in PHASE_FILES.items():
+            file_path = os.path.join(self.docs_dir, file_name)
+            try:
+                with open(file_path, 'rb') as f:
+                    data = f.read()
+            except FileNotFoundError:
+                print(f"⚠️ 警告: 找不到文件 {file_path}")
+                continue
+            lines = data.decode('utf-8').split('\n')
+            self.documents[file_path] = {'lines': lines, 'dirty': False}
+            for task in self._scan_tasks(data, lines, file_name):
+                task['file'] = file_path
+                task['phase'] = phase
+                task['id'] = plan_ids.get((phase, task['title'])) or derive_task_id(task, phase)
+                index[task['id']] = task
+                self.titles[format_issue_title(task, phase)] = task
+        return index
+
+    def find_task(self, index: Dict[str, Dict[str, Any]], issue) -> Optional[Dict[str, Any]]:
+        """按Issue正文中的任务ID标记查找文档任务，没有标记时按完整标题查找"""
+        marker = TASK_ID_MARKER_PATTERN.search(issue.body or '')
+        if marker:
+            return index.get(marker.group(1))
+        return self.titles.get(issue.title)
+
+    def _format_status(self, old_status: str, completed: bool) -> str:
+        """沿用原有状态写法（是否带符号）生成新的状态文本"""
+        text = '已完成' if completed else '进行中'
+        if old_status.startswith(STATUS_SYMBOLS):
+            return ('✅ ' if completed else '🔄 ') + text
+        return text
+
+    def _apply_status(self, task: Dict[str, Any], completed: bool, closed_at: Optional[datetime]):
+        """把Issue状态写回文档中的任务标题行与状态行"""
+        lines = self.documents[task['file']]['lines']
+        heading = HEADING_PATTERN.match(lines[task['heading']])
+        symbol = heading.group(2) or ''
+        rest = DONE_PATTERN.sub('', heading.group(3)).strip()
+
+        if symbol.startswith('['):
+            symbol = '[x]' if completed else '[~]'
+        elif symbol or task['statusLine'] is None:
+            symbol = '✅' if completed else '🔄'
+
+        level = heading.group(1)
+        new_heading = f"{level} {symbol} {rest}" if symbol else f"{level} {rest}"
+        if completed:
+            done_at = (closed_at or datetime.now(timezone.utc)).astimezone()
+            new_heading += f" @done({done_at.strftime('%y-%m-%d %H:%M')})"
+        lines[task['heading']] = new_heading
+
+        new_status = self._format_status(task['status'], completed)
+        if task['statusLine'] is not None:
+            prefix = STATUS_LINE_PATTERN.match(lines[task['statusLine']]).group(1)
+            lines[task['statusLine']] = prefix + new_status
+        task['status'] = new_status
+        self.documents[task['file']]['dirty'] = True
+
+    def fetch_changed_issues(self) -> List[Any]:
+        """只拉取游标之后更新过的自动化Issue，外加尚未解决的冲突Issue"""
+        kwargs = {'state': 'all', 'labels': ['automated'], 'sort': 'updated', 'direction': 'asc'}
+        if self.state.get('cursor'):
+            kwargs['since'] = datetime.fromisoformat(self.state['cursor'])
+        issues = [issue for issue in self.repo.get_issues(**kwargs) if issue.pull_request is None]
+
+        fetched = {issue.number for issue in issues}
+        for conflict in self.state.get('conflicts', []):
+            if conflict['number'] not in fetched:
+                issues.append(self.repo.get_issue(conflict['number']))
+                fetched.add(conflict['number'])
+        return issues
+
+    def run(self) -> Dict[str, Any]:
+        """执行一次双向同步，返回同步摘要"""
+        print("🔄 开始双向同步 GitHub Issues -> 文档...")
+        self.load_state()
+        index = self.index_documents()
+        issues = self.fetch_changed_issues()
+        print(f"📥 自上次游标 {self.state.get('cursor') or '（首次同步）'} 以来变更的Issue: {len(issues)} 个")
+
+        records = self.state.setdefault('tasks', {})
+        conflicts = []
+        applied = []
+        unmatched = 0
+        cursor = self.state.get('cursor')
+
+        for issue in issues:
+            updated_at = issue.updated_at.astimezone(timezone.utc).isoformat()
+            if cursor is None or updated_at > cursor:
+                cursor = updated_at
+
+            task = self.find_task(index, issue)
+            if task is None:
+                unmatched += 1
+                continue
+
+            # 旧版本的对账记录以Issue标题为键
+            record = records.get(task['id']) or records.pop(issue.title, {})
+            doc_completed = is_completed_status(task['status'])
+            issue_closed = issue.state == 'closed'
+
+            if 'issueState' in record:
+                issue_changed = record['issueState'] != issue.state
+            else:
+                # 没有对账记录时无法判断Issue是否被重新打开，仅采信关闭操作
+                issue_changed = issue_closed and not doc_completed
+            doc_changed = 'docStatus' in record and record['docStatus'] != task['status']
+
+            if issue_changed and issue_closed != doc_completed:
+                if doc_changed:
+                    conflicts.append({
+                        'taskId': task['id'],
+                        'title': issue.title,
+                        'number': issue.number,
+                        'url': issue.html_url,
+                        'file': os.path.relpath(task['file'], self.project_root),
+                        'line': task['heading'] + 1,
+                        'docStatusBefore': record['docStatus'],
+                        'docStatusNow': task['status'],
+                        'issueStateBefore': record.get('issueState'),
+                        'issueStateNow': issue.state,
+                        'issueUpdatedAt': updated_at
+                    })
+                    continue
+                self._apply_status(task, issue_closed, issue.closed_at)
+                applied.append((issue, task))
+
+            records[task['id']] = {
+                'number': issue.number,
+                'issueState': issue.state,
+                'docStatus': task['status']
+            }
+
+        for file_path, document in self.documents.items():
+            if document['dirty']:
+                with open(file_path, 'w', encoding='utf-8') as f:
+                    f.write('\n'.join(document['lines']))
+
+        self.state['cursor'] = cursor
+        self.state['conflicts'] = conflicts
+        self.state['lastRun'] = datetime.now(timezone.utc).isoformat()
+        self.save_state()
+
+        for issue, task in applied:
+            action = "关闭" if issue.state == 'closed' else "重新打开"
+            print(f"✅ Issue #{issue.number} 已{action} -> {os.path.relpath(task['file'], self.project_root)}: {task['title']} 更新为 {task['status']}")
+        if unmatched:
+            print(f"ℹ️ {unmatched} 个Issue未找到对应文档任务，已跳过")
+        self.report_conflicts(conflicts)
+
+        print(f"✅ 双向同步完成：处理 {len(issues)} 个变更Issue，回写 {len(applied)} 个任务，冲突 {len(conflicts)} 个")
+        return {'changed': len(issues), 'applied': len(applied), 'conflicts': conflicts, 'cursor': cursor}
+
+    def report_conflicts(self, conflicts: List[Dict[str, Any]]):
+        """输出双方均有修改的冲突，冲突任务保持原样并在下次同步时重新检查"""
+        if not conflicts:
+            return
+        print(f"\n⚠️ 发现 {len(conflicts)} 个冲突（文档与Issue自上次同步后均有修改），未自动处理：")
+        for conflict in conflicts:
+            print(f"  - #{conflict['number']} {conflict['title']}")
+            print(f"    文档 {conflict['file']}:{conflict['line']}: {conflict['docStatusBefore']} -> {conflict['docStatusNow']}")
+            print(f"    Issue {conflict['url']}: {conflict['issueStateBefore'] or '未知'} -> {conflict['issueStateNow']}（{conflict['issueUpdatedAt']}）")
+        print("  请手动统一两侧状态后重新运行同步\n")
+
+
+def main():
+    token = os.environ.get('GITHUB_TOKEN')
+    repo_name = os.environ.get('GITHUB_REPOSITORY')
+
+    if not token:
+        print("错误: 请设置GITHUB_TOKEN环境变量")
+        sys.exit(1)
+
+    if not repo_name:
+        print("错误: 请设置GITHUB_REPOSITORY环境变量")
+        sys.exit(1)
+
+    repo = Github(token).get_repo(repo_name)
+    syncer = BidirectionalSync(repo, project_root=os.getcwd())
+    result = syncer.run()
+
+    if result['conflicts'] and '--fail-on-conflict' in sys.argv:
+        sys.exit(2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,186 @@
+#!/usr/bin/env python3
+"""
+Issue同步日志（追加写入的幂等操作日志）
+记录每次同步计划中各操作的 计划/开始/完成/失败/放弃 事件，幂等键由任务ID派生。
+中断或被限流的同步在下次运行时继续同一次运行（按当前文档重新生成计划），只重试失败与未执行的操作；
+"已完成"只在同一次运行（检查点）内有效，跨运行的记录只用于核对新建操作，不会重复创建Issue。
+永久失败或累计尝试次数过多的操作记为放弃，不会让检查点一直保留
+"""
+
+import os
+import re
+import json
+import hashlib
+from datetime import datetime, timezone
+from typing import List, Dict, Any, Optional
+
+from check_doc_links import github_slug
+from parse_tasks import PHASE_FILES
+
+
+TASK_ID_MARKER = "<!-- task-id: {task_id} -->"
+TASK_ID_MARKER_PATTERN = re.compile(r'<!-- task-id: (.+?) -->')
+# 日志超过该大小且没有未完成的运行时轮转
+MAX_JOURNAL_BYTES = 1024 * 1024
+# 单个操作跨运行累计尝试超过该次数后放弃，留给下一次运行重新计划
+MAX_OPERATION_ATTEMPTS = 10
+
+
+def derive_task_id(task: Dict[str, Any], phase: str) -> str:
+    """任务ID：阶段文档 + 任务标题的GitHub锚点"""
+    document = (task.get('source') or {}).get('document') or PHASE_FILES.get(phase, phase)
+    return f"{document}#{github_slug(task.get('title', ''))}"
+
+
+def idempotency_key(action: str, task_id: str, payload: Optional[Dict[str, Any]] = None) -> str:
+    """
+    新建与关闭的幂等键只由任务ID决定，更新操作附带目标内容摘要；
+    键在同一次运行内去重（恢复检查点时不重复提交），任务重新打开后再次关闭、内容改回旧值时新的运行照常执行
+    """
+    if action in ('create', 'close') or payload is None:
+        return f"{action}:{task_id}"
+    digest = hashlib.sha1(json.dumps(payload, ensure_ascii=False, sort_keys=True).encode('utf-8')).hexdigest()[:12]
+    return f"{action}:{task_id}:{digest}"
+
+
+def default_journal_dir(project_root: str = ".") -> str:
+    """同步日志与检查点目录"""
+    return os.path.join(project_root, ".cache", "doc-tools", "sync-journal")
+
+
+class SyncJournal:
+    def __init__(self, journal_dir: str):
+        self.journal_dir = journal_dir
+        self.journal_file = os.path.join(journal_dir, "journal.jsonl")
+        self.checkpoint_file = os.path.join(journal_dir, "checkpoint.json")
+        self.run_id = None
+        self.operations = {}
+        # 幂等键 -> 完成/放弃该操作的运行ID
+        self._completed_runs = {}
+        self._abandoned_runs = {}
+        self._replay()
+
+    def _replay(self):
+        """回放日志，得到每个幂等键的最新状态"""
+        try:
+            with open(self.journal_file, 'r', encoding='utf-8') as f:
+                for line in f:
+                    try:
+                        event = json.loads(line)
+                    except json.JSONDecodeError:
+                        # 进程在写入过程中退出，只可能损坏最后一行
+                        continue
+                    self._record(event)
+        except FileNotFoundError:
+            pass
+
+    def _record(self, event: Dict[str, Any]):
+        if 'key' not in event:
+            return
+        self.operations[event['key']] = dict(self.operations.get(event['key'], {}), **event)
+        if event.get('event') == 'completed':
+            self._completed_runs.setdefault(event['key'], set()).add(event.get('runId'))
+        elif event.get('event') == 'abandoned':
+            self._abandoned_runs.setdefault(event['key'], set()).add(event.get('runId'))
+
+    def _append(self, event: Dict[str, Any]):
+        """追加一条事件并立即落盘"""
+        os.makedirs(self.journal_dir, exist_ok=True)
+        event = dict(event, runId=self.run_id, at=datetime.now(timezone.utc).isoformat())
+        with open(self.journal_file, 'a', encoding='utf-8') as f:
+            f.write(json.dumps(event, ensure_ascii=False) + '\n')
+            f.flush()
+            os.fsync(f.fileno())
+        self._record(event)
+
+    def pending_plan(self) -> Optional[Dict[str, Any]]:
+        """读取上次未完成运行的同步计划，并把当前运行设为该运行（begin(resume=True) 时沿用）"""
+        try:
+            with open(self.checkpoint_file, 'r', encoding='utf-8') as f:
+                checkpoint = json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return None
+        self.run_id = checkpoint['runId']
+        return checkpoint['plan']
+
+    def begin(self, plan: Dict[str, Any], resume: bool = False):
+        """
+        开始新的运行（resume 时继续 pending_plan 读到的运行，本次运行中已完成的操作仍然跳过）：
+        先写检查点，再记录计划中的操作
+        """
+        if not resume or self.run_id is None:
+            self.run_id = datetime.now(timezone.utc).strftime('%Y%m%dT%H%M%S%fZ')
+        os.makedirs(self.journal_dir, exist_ok=True)
+        tmp_file = self.checkpoint_file + ".tmp"
+        with open(tmp_file, 'w', encoding='utf-8') as f:
+            json.dump({'runId': self.run_id, 'plan': plan}, f, ensure_ascii=False)
+        os.replace(tmp_file, self.checkpoint_file)
+        for operation in plan['operations']:
+            if operation['action'] != 'noop' and not self.is_settled(operation['idempotencyKey']):
+                self._append({
+                    'event': 'planned',
+                    'key': operation['idempotencyKey'],
+                    'title': operation['title'],
+                    'match': operation.get('match')
+                })
+
+    def status(self, key: str) -> Optional[str]:
+        """幂等键在所有运行中的最新事件（用于核对中断的新建操作）"""
+        return self.operations.get(key, {}).get('event')
+
+    def is_completed(self, key: str) -> bool:
+        """操作是否已在当前运行中完成"""
+        return self.run_id is not None and self.run_id in self._completed_runs.get(key, ())
+
+    def is_abandoned(self, key: str) -> bool:
+        """操作是否已在当前运行中放弃"""
+        return self.run_id is not None and self.run_id in self._abandoned_runs.get(key, ())
+
+    def is_settled(self, key: str) -> bool:
+        """本次运行不再执行该操作（已完成或已放弃）"""
+        return self.is_completed(key) or self.is_abandoned(key)
+
+    def attempts(self, key: str) -> int:
+        return self.operations.get(key, {}).get('attempt', 0)
+
+    def result(self, key: str) -> Dict[str, Any]:
+        """幂等键最近一次记录的结果（跨运行），新建操作据此复用已创建的Issue"""
+        return self.operations.get(key, {})
+
+    def started(self, key: str):
+        self._append({'event': 'started', 'key': key, 'attempt': self.attempts(key) + 1})
+
+    def created(self, key: str, number: int, url: str):
+        """创建请求已成功，后续步骤（如关闭）失败时不会再次创建"""
+        self._append({'event': 'created', 'key': key, 'number': number, 'url': url})
+
+    def completed(self, key: str, number: Optional[int], url: Optional[str]):
+        self._append({'event': 'completed', 'key': key, 'number': number, 'url': url})
+
+    def failed(self, key: str, error: str, permanent: bool = False) -> bool:
+        """
+        记录失败；永久失败（如Issue已被锁定）或累计尝试达到上限时记为放弃，
+        本次运行不再重试，检查点不会因此一直保留。返回是否已放弃
+        """
+        abandoned = permanent or self.attempts(key) >= MAX_OPERATION_ATTEMPTS
+        self._append({'event': 'abandoned' if abandoned else 'failed', 'key': key, 'error': error,
+                      'attempt': self.attempts(key)})
+        return abandoned
+
+    def finish(self, operations: List[Dict[str, Any]]) -> bool:
+        """所有操作都完成或放弃时结束本次运行并删除检查点，否则保留检查点供下次继续"""
+        remaining = [op for op in operations if op['action'] != 'noop' and not self.is_settled(op['idempotencyKey'])]
+        if remaining:
+            print(f"⚠️ 本次同步有 {len(remaining)} 个操作未完成，已保留检查点，下次运行将重新计划并继续")
+            return False
+        abandoned = [op for op in operations if op['action'] != 'noop' and self.is_abandoned(op['idempotencyKey'])]
+        if abandoned:
+            print(f"⚠️ 有 {len(abandoned)} 个操作无法完成已放弃，下次同步将按最新文档重新计划")
+        self._append({'event': 'finished'})
+        try:
+            os.remove(self.checkpoint_file)
+        except FileNotFoundError:
+            pass
+        if os.path.getsize(self.journal_file) > MAX_JOURNAL_BYTES:
+            os.replace(self.journal_file, self.journal_file + ".1")
+        return True
@@ -0,0 +1,384 @@
+#!/usr/bin/env python3
+"""
+离线同步计划生成脚本
+结合解析后的项目计划与缓存的远程快照（Issues + 标签），在不访问网络的情况下
+计算出精确的 创建/更新/关闭/无变化 操作，并输出可读文本或JSON差异
+"""
+
+import os
+import sys
+import json
+import difflib
+import argparse
+from typing import Dict, Any, Optional, Tuple
+
+from create_github_issues import AUTO_CREATED_MARKER, IssueFormatter, format_issue_title
+from parse_tasks import is_task_completed
+from sync_journal import TASK_ID_MARKER_PATTERN, derive_task_id, idempotency_key
+from task_identity import NgramIndex
+from plan_stream import iter_phase_details
+from sync_scheduler import task_changed_at
+from sub_issue_sync import SUB_ACTION_NAMES, plan_sub_issues, sub_task_ids
+
+
+ACTION_NAMES = {
+    'create': '新建',
+    'update': '更新',
+    'close': '关闭',
+    'noop': '无变化'
+}
+MATCH_METHODS = {
+    'task-id': '任务ID标记',
+    'title': '标题',
+    'fuzzy': '相似标题',
+    'none': '无'
+}
+ACTION_MARKS = {
+    'create': '+',
+    'update': '~',
+    'close': '-',
+    'noop': '='
+}
+
+
+def default_snapshot_file(project_root: str = ".") -> str:
+    """远程快照文件，由在线同步在每次运行后刷新"""
+    return os.path.join(project_root, ".cache", "doc-tools", "remote-snapshot.json")
+
+
+def load_snapshot(path: str) -> Optional[Dict[str, Any]]:
+    """读取远程快照，不存在时返回None"""
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return None
+
+
+def save_snapshot(snapshot: Dict[str, Any], path: str):
+    """原子写入远程快照"""
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = path + ".tmp"
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(snapshot, f, ensure_ascii=False)
+    os.replace(tmp_path, path)
+
+
+def is_automated_issue(issue: Dict[str, Any]) -> bool:
+    """Issue是否由本工具创建：带 automated 标签，或正文中有自动创建标记/任务ID标记"""
+    body = issue.get('body') or ''
+    return 'automated' in issue.get('labels', []) or AUTO_CREATED_MARKER in body \
+        or TASK_ID_MARKER_PATTERN.search(body) is not None
+
+
+class SyncPlanner:
+    def __init__(self, formatter: IssueFormatter, snapshot: Optional[Dict[str, Any]]):
+        self.formatter = formatter
+        self.snapshot = snapshot or {'labels': [], 'issues': []}
+        self.issues_by_title = {}
+        self.issues_by_task_id = {}
+        self.issues_by_number = {}
+        self.remote_labels = set(self.snapshot.get('labels', []))
+        self.title_index = NgramIndex()
+        for issue in self.snapshot.get('issues', []):
+            self.index_issue(issue)
+        self.reset_claims()
+
+    def index_issue(self, issue: Dict[str, Any], previous_title: Optional[str] = None):
+        """
+        把Issue加入匹配索引；执行操作后快照中的Issue新建或改名时调用，
+        同一次同步中复用的规划器无需重建 n-gram 索引
+        """
+        if previous_title is not None and self.issues_by_title.get(previous_title) is issue:
+            del self.issues_by_title[previous_title]
+        self.issues_by_title.setdefault(issue['title'], issue)
+        marker = TASK_ID_MARKER_PATTERN.search(issue.get('body') or '')
+        if marker:
+            self.issues_by_task_id.setdefault(marker.group(1), issue)
+        self.issues_by_number[issue['number']] = issue
+        # 只有自动化创建的Issue才可能是改名前的任务，人工提交的Issue（如 "[Bug] ..."）不参与相似匹配
+        self.title_index.remove(issue['number'])
+        if is_automated_issue(issue):
+            self.title_index.add(issue['number'], issue['title'])
+
+    def reset_claims(self):
+        """清空认领记录，逐个规划互不相关的任务时使用"""
+        # 已被任务认领的Issue，避免两个任务对应同一个Issue
+        self.claimed = set()
+        # 不参与相似匹配的Issue：已被认领的，以及任务ID标记指向计划中其他任务的
+        self.unavailable = None
+
+    def set_known_task_ids(self, task_ids: Optional[set]):
+        """
+        只有没有任务ID标记、或标记的任务已不在计划中的Issue才可能是改名前的同一任务；
+        不知道计划全貌（task_ids 为None）时所有带标记的Issue都不参与相似匹配
+        """
+        self.unavailable = set(self.claimed)
+        for task_id, issue in self.issues_by_task_id.items():
+            if task_ids is None or task_id in task_ids:
+                self.unavailable.add(issue['number'])
+
+    @staticmethod
+    def _issue_task_id(issue: Dict[str, Any]) -> Optional[str]:
+        marker = TASK_ID_MARKER_PATTERN.search(issue.get('body') or '')
+        return marker.group(1) if marker else None
+
+    def _match_issue(self, task_id: str, title: str, fuzzy: bool = True) -> Tuple[Optional[Dict[str, Any]], Dict[str, Any]]:
+        """按 任务ID标记 -> 完整标题 -> 相似标题 的顺序为任务查找已有Issue，返回 (Issue, 匹配记录)"""
+        issue = self.issues_by_task_id.get(task_id)
+        if issue and issue['number'] not in self.claimed:
+            return issue, {'method': 'task-id'}
+        issue = self.issues_by_title.get(title)
+        if issue and issue['number'] not in self.claimed and self._issue_task_id(issue) in (None, task_id):
+            return issue, {'method': 'title'}
+        if fuzzy:
+            if self.unavailable is None:
+                self.set_known_task_ids(None)
+            match = self.title_index.best_match(title, exclude=self.unavailable)
+            if match:
+                number, score = match
+                issue = self.issues_by_number[number]
+                return issue, {'method': 'fuzzy', 'score': round(score, 3), 'previousTitle': issue['title']}
+        return None, {'method': 'none'}
+
+    @staticmethod
+    def _body_diff(number: int, old_body: str, new_body: str) -> str:
+        """生成Issue正文的统一差异格式文本"""
+        return '\n'.join(difflib.unified_diff(
+            old_body.splitlines(), new_body.splitlines(),
+            fromfile=f"#{number} 当前", tofile=f"#{number} 计划", lineterm=''
+        ))
+
+    def plan_task(self, task: Dict[str, Any], phase: str, fuzzy: bool = True,
+                  matched: Optional[Tuple[Dict[str, Any], Dict[str, Any]]] = None,
+                  phase_status: Optional[str] = None) -> Dict[str, Any]:
+        """
+        为单个任务计算同步操作；matched 为预先精确匹配到的 (Issue, 匹配记录)，
+        phase_status 为 phases 中该阶段的状态（阶段优先级记录在其中）
+        """
+        title = format_issue_title(task, phase)
+        body = self.formatter._format_task_body(task, phase, phase_status)
+        labels = self.formatter._compute_labels(task, phase, phase_status)
+        completed = is_task_completed(task)
+        task_id = task.get('id') or derive_task_id(task, phase)
+
+        operation = {
+            'phase': phase,
+            'taskId': task_id,
+            'taskTitle': task.get('title', '未命名任务'),
+            'title': title,
+            'body': body,
+            'labels': labels,
+            'priority': self.formatter._extract_priority_from_phase(phase_status or phase),
+            'changedAt': task_changed_at(task),
+            'changes': {}
+        }
+
+        issue, match = matched or self._match_issue(task_id, title, fuzzy)
+        operation['match'] = match
+        if issue is None:
+            operation.update(action='create', number=None, url=None,
+                             state='closed' if completed else 'open',
+                             idempotencyKey=idempotency_key('create', task_id))
+            return operation
+
+        # 与原有行为保持一致：只关闭已完成任务的Issue，不主动重新打开
+        state = 'closed' if completed else issue['state']
+        operation.update(number=issue['number'], url=issue['html_url'], state=state)
+        self.claimed.add(issue['number'])
+        if self.unavailable is not None:
+            self.unavailable.add(issue['number'])
+
+        changes = operation['changes']
+        if issue['title'] != title:
+            # 任务标题改写或阶段改名：更新原Issue的标题而不是新建
+            changes['title'] = [issue['title'], title]
+        if issue.get('body', '') != body:
+            changes['body'] = self._body_diff(issue['number'], issue.get('body', ''), body)
+        added = sorted(set(labels) - set(issue.get('labels', [])))
+        removed = sorted(set(issue.get('labels', [])) - set(labels))
+        if added or removed:
+            changes['labels'] = {'added': added, 'removed': removed}
+        if issue['state'] != state:
+            changes['state'] = [issue['state'], state]
+
+        if 'state' in changes:
+            operation['action'] = 'close'
+        elif changes:
+            operation['action'] = 'update'
+        else:
+            operation['action'] = 'noop'
+        operation['idempotencyKey'] = idempotency_key(
+            operation['action'], task_id, {'title': title, 'body': body, 'labels': sorted(labels), 'state': state}
+        )
+        return operation
+
+    def plan(self, project_data: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        为整个项目计划生成同步计划（phaseDetails 可以是流式读取的迭代器，只遍历一次）。
+        相似匹配需要先知道所有任务的精确匹配与任务ID，因此任务列表会完整保留在内存中
+        """
+        operations = []
+        planned_titles = set()
+        labels_to_create = set()
+
+        tasks = [
+            (phase_detail.get('phase', ''), task)
+            for phase_detail in project_data.get('phaseDetails', [])
+            for task in phase_detail.get('tasks', [])
+        ]
+        # 阶段优先级记录在 phases 的状态中（如"🔴 高优先级"），流式读取时在遍历阶段详情后才可用
+        phase_status = {phase.get('name'): phase.get('status', '') for phase in project_data.get('phases', [])}
+        known_task_ids = {task.get('id') or derive_task_id(task, phase) for phase, task in tasks}
+        if self.formatter.sub_task_mode == 'sub-issues':
+            # 子Issue同样带任务ID标记，不能被相似匹配当作改名前的任务
+            for phase, task in tasks:
+                parent_id = task.get('id') or derive_task_id(task, phase)
+                known_task_ids.update(sub_task_ids(parent_id, self.formatter._load_task(task).get('sub_tasks') or []))
+        self.set_known_task_ids(known_task_ids)
+
+        # 先为能精确匹配的任务认领Issue，剩余任务再做相似匹配，避免相似匹配抢占其他任务的Issue
+        # 同名任务只对应一个Issue：重复项在匹配之前识别，既不认领也不相似匹配Issue
+        exact, duplicates = {}, set()
+        for position, (phase, task) in enumerate(tasks):
+            title = format_issue_title(task, phase)
+            if title in planned_titles:
+                duplicates.add(position)
+                continue
+            planned_titles.add(title)
+            task_id = task.get('id') or derive_task_id(task, phase)
+            issue, match = self._match_issue(task_id, title, fuzzy=False)
+            if issue:
+                self.claimed.add(issue['number'])
+                self.unavailable.add(issue['number'])
+                exact[position] = (issue, match)
+
+        for position, (phase, task) in enumerate(tasks):
+            if position in duplicates:
+                operation = self.plan_task(task, phase, matched=(None, {'method': 'none'}),
+                                           phase_status=phase_status.get(phase))
+                # 重复项不产生远程写入
+                operation.update(action='noop', duplicate=True, changes={})
+            else:
+                operation = self.plan_task(task, phase, matched=exact.get(position), phase_status=phase_status.get(phase))
+            if self.formatter.sub_task_mode == 'sub-issues' and not operation.get('duplicate'):
+                operation['subIssues'] = plan_sub_issues(self, operation, task, phase)
+            if operation['action'] != 'noop':
+                for label in operation['labels']:
+                    clean_label = self.formatter._clean_label(label)
+                    if clean_label not in self.remote_labels:
+                        labels_to_create.add(clean_label)
+            operations.append(operation)
+
+        summary = {action: 0 for action in ACTION_NAMES}
+        for operation in operations:
+            summary[operation['action']] += 1
+        sub_summary = {action: 0 for action in SUB_ACTION_NAMES}
+        for sub_operation in [sub for operation in operations for sub in operation.get('subIssues', [])]:
+            sub_summary[sub_operation['action']] += 1
+        matches = [
+            {'taskId': operation['taskId'], 'number': operation['number'], **operation['match']}
+            for operation in operations if operation['match']['method'] == 'fuzzy'
+        ]
+
+        return {
+            'repository': self.snapshot.get('repository'),
+            'snapshotFetchedAt': self.snapshot.get('fetchedAt'),
+            'summary': summary,
+            'subIssueSummary': sub_summary,
+            'labelsToCreate': sorted(labels_to_create),
+            'fuzzyMatches': matches,
+            'operations': operations
+        }
+
+
+def render_text(plan: Dict[str, Any], verbose: bool = True) -> str:
+    """输出人类可读的同步计划"""
+    summary = plan['summary']
+    lines = [
+        f"📋 同步计划（仓库: {plan.get('repository') or '未知'}，快照时间: {plan.get('snapshotFetchedAt') or '无快照'}）",
+        "   " + " | ".join(f"{ACTION_NAMES[action]} {count}" for action, count in summary.items())
+        + f" | 新建标签 {len(plan['labelsToCreate'])}"
+    ]
+    sub_summary = plan.get('subIssueSummary') or {}
+    if any(sub_summary.values()):
+        lines.append("   子Issue: " + " | ".join(f"{SUB_ACTION_NAMES[action]} {count}" for action, count in sub_summary.items()))
+    if not verbose:
+        return '\n'.join(lines)
+
+    if plan['labelsToCreate']:
+        lines.append("")
+        lines.append("🏷️ 待创建标签: " + ", ".join(plan['labelsToCreate']))
+
+    for operation in plan['operations']:
+        sub_changes = [sub for sub in operation.get('subIssues', []) if sub['action'] != 'noop']
+        if operation['action'] == 'noop' and not sub_changes:
+            continue
+        number = f"#{operation['number']} " if operation['number'] else ""
+        lines.append("")
+        lines.append(f"{ACTION_MARKS[operation['action']]} {ACTION_NAMES[operation['action']]} {number}{operation['title']}")
+        for sub in sub_changes:
+            sub_number = f"#{sub['number']} " if sub['number'] else ""
+            lines.append(f"    子Issue {SUB_ACTION_NAMES[sub['action']]}: {sub_number}{sub['title']}")
+        changes = operation['changes']
+        if operation['action'] == 'create':
+            lines.append(f"    标签: {', '.join(operation['labels'])}")
+            if operation['state'] == 'closed':
+                lines.append("    状态: 创建后立即关闭（任务已完成）")
+        if operation.get('match', {}).get('method') == 'fuzzy':
+            lines.append(f"    匹配: 相似标题 {operation['match']['score']:.2f}（原标题: {operation['match']['previousTitle']}）")
+        if 'title' in changes:
+            lines.append(f"    标题: {changes['title'][0]} -> {changes['title'][1]}")
+        if 'state' in changes:
+            lines.append(f"    状态: {changes['state'][0]} -> {changes['state'][1]}")
+        if 'labels' in changes:
+            label_changes = [f"+{label}" for label in changes['labels']['added']]
+            label_changes += [f"-{label}" for label in changes['labels']['removed']]
+            lines.append(f"    标签: {' '.join(label_changes)}")
+        if 'body' in changes:
+            lines.append("    正文:")
+            lines.extend("      " + line for line in changes['body'].splitlines())
+    return '\n'.join(lines)
+
+
+def render_json(plan: Dict[str, Any]) -> str:
+    """输出机器可读的同步计划（无变化的操作不携带正文）"""
+    operations = []
+    for operation in plan['operations']:
+        if operation['action'] == 'noop':
+            operation = {key: value for key, value in operation.items() if key != 'body'}
+        operations.append(operation)
+    return json.dumps(dict(plan, operations=operations), ensure_ascii=False, indent=2)
+
+
+def build_plan(json_file: str, snapshot_file: str) -> Dict[str, Any]:
+    """离线生成同步计划"""
+    project_data = {}
+    project_data['phaseDetails'] = iter_phase_details(json_file, project_data)
+    snapshot = load_snapshot(snapshot_file)
+    if snapshot is None:
+        print(f"⚠️ 警告: 找不到远程快照 {snapshot_file}，所有任务都将被视为新建", file=sys.stderr)
+    return SyncPlanner(IssueFormatter(os.path.dirname(json_file)), snapshot).plan(project_data)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='离线生成GitHub Issues同步计划（dry-run）')
+    parser.add_argument('--json-file', default=os.path.join('docs', 'project-plan-structured.json'), help='项目计划JSON文件')
+    parser.add_argument('--snapshot', default=default_snapshot_file(), help='远程快照文件')
+    parser.add_argument('--format', choices=['text', 'json'], default='text', help='输出格式')
+    parser.add_argument('--output', help='输出文件（默认输出到标准输出）')
+    args = parser.parse_args()
+
+    plan = build_plan(args.json_file, args.snapshot)
+    content = render_json(plan) if args.format == 'json' else render_text(plan)
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            f.write(content + '\n')
+        print(f"✅ 同步计划已写入: {args.output}")
+    else:
+        print(content)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,117 @@
+#!/usr/bin/env python3
+"""
+同步操作调度
+按 阶段优先级（🔴/🟡/🟢）-> 状态变化（关闭 > 新建 > 更新）-> 任务最近变化时间 排序待执行的Issue操作，
+在可配置的时间与请求额度内执行；额度用尽时剩余操作留在同步日志的检查点中，下次运行优先继续
+"""
+
+import os
+import time
+from datetime import datetime
+from typing import Dict, Any, Optional, Callable
+
+from github_http_cache import RateLimitBudget
+
+
+PRIORITY_RANKS = {'🔴': 0, '🟡': 1, '🟢': 2}
+TRANSITION_RANKS = {'close': 0, 'create': 1, 'update': 2}
+# 任务日期可能来自Git历史挖掘或文档中手写的 @done(...)
+DATE_FORMATS = ('%y-%m-%d %H:%M', '%Y-%m-%d %H:%M', '%Y-%m-%d', '%y-%m-%d', '%Y/%m/%d')
+
+
+def parse_task_date(value: Optional[str]) -> Optional[float]:
+    for date_format in DATE_FORMATS:
+        try:
+            return datetime.strptime(value.strip(), date_format).timestamp()
+        except (AttributeError, ValueError):
+            continue
+    return None
+
+
+def task_changed_at(task: Dict[str, Any]) -> Optional[float]:
+    """任务最近一次状态变化的时间（开始或完成日期中较晚的一个），没有日期时返回None"""
+    dates = [parse_task_date(task.get(key)) for key in ('startDate', 'completionDate')]
+    dates = [date for date in dates if date is not None]
+    return max(dates) if dates else None
+
+
+def operation_cost(operation: Dict[str, Any]) -> int:
+    """执行操作预计消耗的GitHub请求数：新建1次（需要关闭时再加1次），更新/关闭先读取再修改共2次"""
+    if operation['action'] == 'create':
+        return 2 if operation['state'] == 'closed' else 1
+    return 2
+
+
+def schedule_key(operation: Dict[str, Any]) -> tuple:
+    """排序键：优先级高的阶段在前，同一优先级中状态变化在前，再按任务最近变化时间从新到旧"""
+    priority = operation.get('priority') or ''
+    return (
+        PRIORITY_RANKS.get(priority[:1], PRIORITY_RANKS['🟡']),
+        TRANSITION_RANKS.get(operation['action'], len(TRANSITION_RANKS)),
+        -(operation.get('changedAt') or 0)
+    )
+
+
+def budget_from_env() -> Dict[str, Optional[float]]:
+    """SYNC_TIME_BUDGET（秒）与 SYNC_REQUEST_BUDGET（请求数），未设置表示不限制"""
+    time_budget = os.environ.get('SYNC_TIME_BUDGET')
+    request_budget = os.environ.get('SYNC_REQUEST_BUDGET')
+    return {
+        'time_budget': float(time_budget) if time_budget else None,
+        'request_budget': int(request_budget) if request_budget else None
+    }
+
+
+class SyncScheduler:
+    def __init__(self, time_budget: Optional[float] = None, request_budget: Optional[int] = None,
+                 rate_budget: Optional[RateLimitBudget] = None, clock: Callable[[], float] = time.monotonic):
+        self.time_budget = time_budget
+        self.request_budget = request_budget
+        self.rate_budget = rate_budget
+        self.clock = clock
+        self.started_at = clock()
+        self.stats = {'executed': 0, 'deferred': 0, 'requests': 0}
+        self.exhausted = None
+        self._slowest = 0.0
+        self._current = None
+
+    @classmethod
+    def from_env(cls, rate_budget: Optional[RateLimitBudget] = None) -> 'SyncScheduler':
+        return cls(rate_budget=rate_budget, **budget_from_env())
+
+    def _exhausted_reason(self, cost: int) -> Optional[str]:
+        if self.time_budget is not None:
+            # 按目前最慢的一次操作预留时间，避免在超时边缘开始新操作
+            if self.clock() - self.started_at + self._slowest > self.time_budget:
+                return f"时间额度 {self.time_budget:.0f} 秒"
+        if self.request_budget is not None and self.stats['requests'] + cost > self.request_budget:
+            return f"请求额度 {self.request_budget} 次"
+        rate = self.rate_budget
+        if rate is not None and rate.remaining is not None and rate.remaining - cost < rate.reserve \
+                and (rate.reset_at or 0) - time.time() > rate.max_wait:
+            # 等待速率额度重置的时间超过上限，剩余操作留给下次运行
+            return "GitHub速率额度"
+        return None
+
+    def admit(self, operation: Dict[str, Any]) -> bool:
+        """额度足够时允许执行操作并开始计时，否则记为推迟；一旦用尽，后续操作全部推迟"""
+        cost = operation_cost(operation)
+        if self.exhausted is None:
+            self.exhausted = self._exhausted_reason(cost)
+        if self.exhausted:
+            self.stats['deferred'] += 1
+            return False
+        self.stats['requests'] += cost
+        self._current = self.clock()
+        return True
+
+    def done(self):
+        """操作执行完毕（无论成功与否）"""
+        self.stats['executed'] += 1
+        self._slowest = max(self._slowest, self.clock() - self._current)
+
+    def summary(self) -> str:
+        text = f"调度: 执行 {self.stats['executed']} 个操作，预计 {self.stats['requests']} 次请求，耗时 {self.clock() - self.started_at:.0f} 秒"
+        if self.stats['deferred']:
+            text += f"；{self.exhausted}已用尽，{self.stats['deferred']} 个操作推迟到下次运行"
+        return text
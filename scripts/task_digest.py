@@ -0,0 +1,198 @@
+#!/usr/bin/env python3
+"""
+每日待办摘要脚本
+保存上次运行时的任务状态快照，只计算变化：新增待办、新开始、新完成、以及新进入停滞的进行中任务，
+生成简短消息并发送到可配置的 Webhook（如 Discord），发送成功后才更新快照
+"""
+
+import os
+import sys
+import json
+import argparse
+import urllib.request
+from datetime import datetime, timezone, timedelta
+from typing import Dict, Any, Optional
+
+from parse_tasks import status_category
+from sync_journal import derive_task_id
+from sync_scheduler import parse_task_date
+
+
+# Discord 单条消息的长度上限
+MAX_MESSAGE_LENGTH = 2000
+MAX_ITEMS_PER_SECTION = 10
+DEFAULT_STALE_DAYS = 7
+SECTIONS = [
+    ('completed', '✅ 新完成'),
+    ('started', '🔄 新开始'),
+    ('pending', '☐ 新增待办'),
+    ('stale', '⏰ 进行中超过 {days} 天')
+]
+
+
+def default_state_file(project_root: str = ".") -> str:
+    """上次摘要时的任务状态快照"""
+    return os.path.join(project_root, ".cache", "doc-tools", "digest-state.json")
+
+
+def collect_tasks(project_data: Dict[str, Any]) -> Dict[str, Dict[str, Any]]:
+    """任务ID -> 阶段、标题、状态分类、开始日期"""
+    tasks = {}
+    for phase_detail in project_data.get('phaseDetails', []):
+        phase = phase_detail.get('phase', '')
+        for task in phase_detail.get('tasks', []):
+            task_id = task.get('id') or derive_task_id(task, phase)
+            tasks.setdefault(task_id, {
+                'phase': phase,
+                'title': task.get('title', '未命名任务'),
+                'category': status_category(task.get('status', '')),
+                'startDate': task.get('startDate')
+            })
+    return tasks
+
+
+class TaskDigest:
+    def __init__(self, state_file: str, stale_days: int = DEFAULT_STALE_DAYS):
+        self.state_file = state_file
+        self.stale_days = stale_days
+        self.previous = self._load_state()
+
+    def _load_state(self) -> Optional[Dict[str, Any]]:
+        try:
+            with open(self.state_file, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return None
+
+    def save_state(self, state: Dict[str, Any]):
+        os.makedirs(os.path.dirname(self.state_file), exist_ok=True)
+        tmp_file = self.state_file + ".tmp"
+        with open(tmp_file, 'w', encoding='utf-8') as f:
+            json.dump(state, f, ensure_ascii=False)
+        os.replace(tmp_file, self.state_file)
+
+    def compute(self, project_data: Dict[str, Any], now: Optional[datetime] = None) -> Dict[str, Any]:
+        """与上次快照比较，返回 {'delta': {...}, 'state': 新快照, 'totals': {...}}"""
+        now = now or datetime.now(timezone.utc)
+        previous = (self.previous or {}).get('tasks', {})
+        last_run = datetime.fromisoformat(self.previous['generatedAt']) if self.previous else now
+        stale_after = timedelta(days=self.stale_days)
+
+        delta = {key: [] for key, _ in SECTIONS}
+        tasks = {}
+        for task_id, task in collect_tasks(project_data).items():
+            old = previous.get(task_id)
+            started = parse_task_date(task.pop('startDate'))
+            # since：任务进入当前状态分类的时间，用于判断进行中任务是否停滞；
+            # 进行中的任务首次出现或刚开始时以文档中的开始日期为准，没有日期时取本次运行时间
+            if old and old['category'] == task['category']:
+                since = old['since']
+            elif task['category'] == 'in-progress' and started is not None:
+                since = datetime.fromtimestamp(started, timezone.utc).isoformat()
+            else:
+                since = now.isoformat()
+            tasks[task_id] = dict(task, since=since)
+            if self.previous is None:
+                continue
+
+            if old is None or old['category'] != task['category']:
+                key = {'completed': 'completed', 'in-progress': 'started', 'pending': 'pending'}[task['category']]
+                delta[key].append(task)
+            elif task['category'] == 'in-progress':
+                entered = datetime.fromisoformat(since)
+                if entered + stale_after <= now and entered + stale_after > last_run:
+                    delta['stale'].append(dict(task, days=(now - entered).days))
+
+        totals = {category: 0 for category in ('completed', 'in-progress', 'pending')}
+        for task in tasks.values():
+            totals[task['category']] += 1
+        return {
+            'delta': delta,
+            'totals': totals,
+            'firstRun': self.previous is None,
+            'state': {'generatedAt': now.isoformat(), 'tasks': tasks}
+        }
+
+    def render(self, result: Dict[str, Any], project_name: str = "") -> Optional[str]:
+        """生成消息，没有变化时返回None"""
+        totals = result['totals']
+        header = (f"📋 {project_name + ' ' if project_name else ''}每日任务摘要 "
+                  f"| 待办 {totals['pending']} · 进行中 {totals['in-progress']} · 已完成 {totals['completed']}")
+        if result['firstRun']:
+            return header + "\n首次运行，已记录当前任务状态作为基线"
+        if not any(result['delta'].values()):
+            return None
+
+        lines = [header]
+        for key, title in SECTIONS:
+            items = result['delta'][key]
+            if not items:
+                continue
+            lines.append(f"**{title.format(days=self.stale_days)}**（{len(items)}）")
+            for task in items[:MAX_ITEMS_PER_SECTION]:
+                suffix = f"（{task['days']} 天）" if 'days' in task else ""
+                lines.append(f"- [{task['phase']}] {task['title']}{suffix}")
+            if len(items) > MAX_ITEMS_PER_SECTION:
+                lines.append(f"- …… 另有 {len(items) - MAX_ITEMS_PER_SECTION} 个")
+
+        message = '\n'.join(lines)
+        if len(message) > MAX_MESSAGE_LENGTH:
+            message = message[:MAX_MESSAGE_LENGTH - 2] + '……'
+        return message
+
+
+def post_webhook(url: str, message: str, timeout: int = 10):
+    """以 Discord Webhook 格式（{"content": ...}）发送消息，失败时抛出异常"""
+    request = urllib.request.Request(
+        url,
+        data=json.dumps({'content': message}, ensure_ascii=False).encode('utf-8'),
+        headers={'Content-Type': 'application/json', 'User-Agent': 'freemonitor-task-digest'},
+        method='POST'
+    )
+    with urllib.request.urlopen(request, timeout=timeout) as response:
+        response.read()
+
+
+def main():
+    parser = argparse.ArgumentParser(description='生成每日待办任务变化摘要并发送到 Webhook')
+    parser.add_argument('--json-file', default=os.path.join('docs', 'project-plan-structured.json'), help='项目计划JSON文件')
+    parser.add_argument('--state-file', default=default_state_file(), help='上次摘要的任务状态快照')
+    parser.add_argument('--webhook', default=os.environ.get('DIGEST_WEBHOOK_URL'), help='Webhook地址（默认读取 DIGEST_WEBHOOK_URL）')
+    parser.add_argument('--stale-days', type=int, default=DEFAULT_STALE_DAYS, help='进行中超过多少天视为停滞')
+    parser.add_argument('--dry-run', action='store_true', help='只输出消息，不发送也不更新快照')
+    args = parser.parse_args()
+
+    try:
+        with open(args.json_file, 'r', encoding='utf-8') as f:
+            project_data = json.load(f)
+    except FileNotFoundError:
+        print(f"❌ 错误: 找不到文件 {args.json_file}")
+        sys.exit(1)
+
+    digest = TaskDigest(args.state_file, args.stale_days)
+    result = digest.compute(project_data)
+    message = digest.render(result, project_data.get('projectName', ''))
+
+    if message is None:
+        print("ℹ️ 自上次摘要以来任务状态没有变化，不发送消息")
+    else:
+        print(message)
+    if args.dry_run:
+        return
+
+    if message is not None:
+        if not args.webhook:
+            print("⚠️ 未配置Webhook地址（--webhook 或 DIGEST_WEBHOOK_URL），未发送消息，快照保持不变")
+            return
+        try:
+            post_webhook(args.webhook, message)
+        except Exception as e:
+            # 快照不更新，下次运行会重新计算并发送这些变化
+            print(f"❌ 错误: 发送摘要失败 - {e}")
+            sys.exit(1)
+        print("✅ 摘要已发送")
+    digest.save_state(result['state'])
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,212 @@
+#!/usr/bin/env python3
+"""
+任务历史挖掘脚本
+对每个阶段文档只运行一次 `git log -p --follow`，从流式输出中还原每个提交后的文档内容，
+找出任务状态首次变为进行中/已完成的提交，为缺少日期的任务补充 startDate 与 completionDate。
+结果按文档的最新已处理提交存入共享缓存，后续运行只处理新增提交
+"""
+
+import os
+import sys
+import json
+import argparse
+import subprocess
+from datetime import datetime
+from typing import Dict, Any, Optional, Iterator, Tuple
+
+from check_doc_links import github_slug
+from parse_tasks import PHASE_FILES, scan_tasks
+from sync_scheduler import parse_task_date
+from tool_cache import ToolCache, default_cache_root
+from git_access import GitRepository
+
+
+HISTORY_VERSION = 1
+# 提交分隔行：\0<提交哈希> <提交时间戳>
+COMMIT_MARKER = b'\x00'
+# 足够大的上下文行数，使每个提交的差异只有一个覆盖全文的 hunk，从而可以还原提交后的完整内容
+FULL_CONTEXT = 10000000
+DATE_FORMAT = '%y-%m-%d %H:%M'
+
+
+def is_completed_status(status: str) -> bool:
+    return "✅" in status or "已完成" in status
+
+
+def is_started_status(status: str) -> bool:
+    return is_completed_status(status) or "🔄" in status or "进行中" in status
+
+
+class TaskHistoryMiner:
+    CACHE_NAMESPACE = 'task-history'
+
+    def __init__(self, project_root: str = ".", cache: Optional[ToolCache] = None):
+        self.project_root = project_root
+        # 每个文档的挖掘结果是共享缓存中的一个条目
+        self.cache = cache
+        self.repository = GitRepository(project_root)
+        self.stats = {'commits': 0, 'cachedDocuments': 0}
+
+    def _cache_key(self, path: str) -> str:
+        # 多个项目共用缓存目录时以仓库路径区分
+        return f"v{HISTORY_VERSION}:{os.path.abspath(self.project_root)}:{path}"
+
+    def _git(self, *args: str) -> subprocess.CompletedProcess:
+        return subprocess.run(['git', *args], cwd=self.project_root, capture_output=True)
+
+    def _head(self) -> Optional[str]:
+        result = self._git('rev-parse', '--verify', '-q', 'HEAD')
+        return result.stdout.decode().strip() if result.returncode == 0 else None
+
+    def _log(self, path: str, since: Optional[str], head: str) -> Iterator[Tuple[str, int, Optional[bytes]]]:
+        """
+        流式读取文档历史，按提交从新到旧产出 (提交哈希, 提交时间戳, 提交后的文档内容)。
+        没有内容变化的提交（合并提交、纯重命名）内容为None
+        """
+        revision = f"{since}..{head}" if since else head
+        command = [
+            'git', '-c', 'core.quotepath=off', 'log', '-p', '--follow', '--no-color', '--no-ext-diff',
+            f'-U{FULL_CONTEXT}', '--format=%x00%H %ct', revision, '--', path
+        ]
+        process = subprocess.Popen(command, cwd=self.project_root, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL)
+        commit = None
+        content = None
+        in_hunk = False
+        try:
+            for line in process.stdout:
+                if line.startswith(COMMIT_MARKER):
+                    if commit:
+                        yield commit[0], commit[1], content
+                    sha, timestamp = line[1:].split()
+                    commit = (sha.decode(), int(timestamp))
+                    content = None
+                    in_hunk = False
+                elif in_hunk:
+                    if line.startswith((b' ', b'+')):
+                        content.append(line[1:])
+                    elif line.startswith(b'\\') and content:
+                        # 文件末尾没有换行
+                        content[-1] = content[-1].rstrip(b'\n')
+                    elif not line.startswith(b'-'):
+                        in_hunk = False
+                elif line.startswith(b'@@'):
+                    in_hunk = True
+                    content = []
+                elif line.startswith(b'deleted file mode'):
+                    content = []
+            if commit:
+                yield commit[0], commit[1], content
+        finally:
+            process.stdout.close()
+            process.wait()
+
+    @staticmethod
+    def _apply_commit(record: Dict[str, Any], timestamp: int, statuses: Dict[str, str]):
+        """根据一个提交后的任务状态更新各任务的开始与完成时间"""
+        timeline = record['tasks']
+        for slug, status in statuses.items():
+            entry = timeline.setdefault(slug, {})
+            previous = record['statuses'].get(slug)
+            if is_started_status(status) and 'started' not in entry:
+                entry['started'] = timestamp
+            if is_completed_status(status):
+                if previous is None or not is_completed_status(previous):
+                    entry['completed'] = timestamp
+            else:
+                # 任务被重新打开，完成时间以下一次完成为准
+                entry.pop('completed', None)
+        record['statuses'] = statuses
+
+    def mine_document(self, path: str, head: str) -> Dict[str, Any]:
+        """增量挖掘单个文档的历史（path 为相对仓库根目录的路径）"""
+        record = self.cache.get(self.CACHE_NAMESPACE, self._cache_key(path)) if self.cache else None
+        if record and record['head'] == head:
+            self.stats['cachedDocuments'] += 1
+            return record
+        # 浅克隆只需加深到上次处理的提交；游标不在当前历史中（历史被改写）或没有缓存时需要完整历史
+        if not record or not self.repository.ensure_commit(record['head'], head):
+            self.repository.unshallow()
+            record = {'head': None, 'statuses': {}, 'tasks': {}}
+
+        commits = list(self._log(path, record['head'], head))
+        self.stats['commits'] += len(commits)
+        statuses = record['statuses']
+        for _, timestamp, content in reversed(commits):
+            if content is not None:
+                statuses = {}
+                for task in scan_tasks(b''.join(content), path):
+                    statuses.setdefault(github_slug(task['title']), task['status'])
+            self._apply_commit(record, timestamp, statuses)
+
+        record['head'] = head
+        if self.cache:
+            self.cache.put(self.CACHE_NAMESPACE, self._cache_key(path), record)
+        return record
+
+    def mine(self, docs_dir: str = "docs") -> Dict[str, Dict[str, Any]]:
+        """挖掘全部阶段文档，返回 文档名 -> {任务锚点: {started, completed}}"""
+        head = self._head()
+        if head is None:
+            print("⚠️ 警告: 当前目录不是Git仓库或没有提交，跳过任务历史挖掘")
+            return {}
+        timelines = {}
+        for file_name in PHASE_FILES.values():
+            path = f"{docs_dir}/{file_name}"
+            if os.path.exists(os.path.join(self.project_root, path)):
+                timelines[file_name] = self.mine_document(path, head)['tasks']
+        return timelines
+
+    @staticmethod
+    def apply(project_data: Dict[str, Any], timelines: Dict[str, Dict[str, Any]]) -> int:
+        """为缺少日期的任务补充开始与完成时间（文档中手写的 @done 优先，与手写日期先后矛盾的挖掘结果跳过），返回补充的任务数"""
+        filled = 0
+        for phase_detail in project_data.get('phaseDetails', []):
+            file_name = PHASE_FILES.get(phase_detail.get('phase', ''))
+            for task in phase_detail.get('tasks', []):
+                document = (task.get('source') or {}).get('document') or file_name
+                entry = timelines.get(document, {}).get(github_slug(task.get('title', '')))
+                if not entry:
+                    continue
+                changed = False
+                started = parse_task_date(task.get('startDate'))
+                if 'completed' in entry and not task.get('completionDate') and is_completed_status(task.get('status', '')) \
+                        and (started is None or entry['completed'] >= started):
+                    task['completionDate'] = datetime.fromtimestamp(entry['completed']).strftime(DATE_FORMAT)
+                    changed = True
+                completed = parse_task_date(task.get('completionDate'))
+                # 手写的 @done 日期可能早于文档中首次出现状态符号的提交，此时挖掘出的开始时间不可信
+                if 'started' in entry and not task.get('startDate') and (completed is None or entry['started'] <= completed):
+                    task['startDate'] = datetime.fromtimestamp(entry['started']).strftime(DATE_FORMAT)
+                    changed = True
+                filled += changed
+        return filled
+
+
+def main():
+    parser = argparse.ArgumentParser(description='从文档Git历史中挖掘任务的开始与完成时间')
+    parser.add_argument('--root', default='.', help='仓库根目录')
+    parser.add_argument('--json-file', default=os.path.join('docs', 'project-plan-structured.json'), help='要补充日期的项目计划JSON文件')
+    parser.add_argument('--no-cache', action='store_true', help='不读写历史缓存')
+    args = parser.parse_args()
+
+    cache = None if args.no_cache else ToolCache(default_cache_root(args.root))
+    miner = TaskHistoryMiner(args.root, cache)
+    timelines = miner.mine()
+    json_file = os.path.join(args.root, args.json_file)
+    try:
+        with open(json_file, 'r', encoding='utf-8') as f:
+            project_data = json.load(f)
+    except FileNotFoundError:
+        print(f"❌ 错误: 找不到文件 {json_file}")
+        sys.exit(1)
+
+    filled = miner.apply(project_data, timelines)
+    with open(json_file, 'w', encoding='utf-8') as f:
+        json.dump(project_data, f, ensure_ascii=False, indent=2)
+    print(f"✅ 处理 {miner.stats['commits']} 个提交（{miner.stats['cachedDocuments']} 个文档命中缓存），补充了 {filled} 个任务的日期")
+    if cache:
+        cache.record_stats('task_history')
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,117 @@
+#!/usr/bin/env python3
+"""
+任务标识与相似标题匹配
+任务ID由阶段文档与标题锚点派生，首次分配后随项目计划持久化，标题改写后沿用原ID；
+改名或迁移的任务通过字符 n-gram 倒排索引查找最相似的已有条目，只比较共享 n-gram 的候选，避免两两比较
+"""
+
+import re
+import unicodedata
+from typing import List, Dict, Any, Optional, Container, Tuple
+
+from sync_journal import derive_task_id
+
+
+NGRAM_SIZE = 2
+# 相似度（Dice系数）不低于该值才视为同一任务
+MATCH_THRESHOLD = 0.6
+# 只去除本工具生成的阶段前缀（"[阶段一：认证系统完善] "），保留 "[Bug]" 等其他方括号内容
+PHASE_PREFIX_PATTERN = re.compile(r'^\[阶段[^\]]*\]\s*')
+
+
+def normalize_title(title: str) -> str:
+    """去除Issue标题中的阶段前缀、标点、符号与空白，统一小写"""
+    title = PHASE_PREFIX_PATTERN.sub('', title).lower()
+    return ''.join(char for char in title if unicodedata.category(char)[0] in 'LN')
+
+
+def ngrams(title: str, size: int = NGRAM_SIZE) -> set:
+    text = normalize_title(title)
+    if len(text) <= size:
+        return {text} if text else set()
+    return {text[index:index + size] for index in range(len(text) - size + 1)}
+
+
+class NgramIndex:
+    """n-gram 倒排索引：n-gram -> 包含它的条目"""
+
+    def __init__(self, size: int = NGRAM_SIZE):
+        self.size = size
+        self.postings = {}
+        self.grams = {}
+
+    def add(self, key: Any, title: str):
+        grams = ngrams(title, self.size)
+        self.grams[key] = grams
+        for gram in grams:
+            self.postings.setdefault(gram, set()).add(key)
+
+    def remove(self, key: Any):
+        for gram in self.grams.pop(key, ()):
+            postings = self.postings.get(gram)
+            if postings:
+                postings.discard(key)
+
+    def best_match(self, title: str, threshold: float = MATCH_THRESHOLD,
+                   exclude: Container = frozenset()) -> Optional[Tuple[Any, float]]:
+        """返回 (条目, 相似度)，没有达到阈值的候选时返回None；只计算与查询共享 n-gram 的候选"""
+        query = ngrams(title, self.size)
+        if not query:
+            return None
+        shared = {}
+        for gram in query:
+            for key in self.postings.get(gram, ()):
+                if key not in exclude:
+                    shared[key] = shared.get(key, 0) + 1
+        best = None
+        for key, count in shared.items():
+            score = 2 * count / (len(query) + len(self.grams[key]))
+            if score >= threshold and (best is None or score > best[1]):
+                best = (key, score)
+        return best
+
+
+def assign_task_ids(previous: List[Dict[str, Any]], tasks: List[Dict[str, Any]], phase: str) -> List[Dict[str, Any]]:
+    """
+    为重新解析出的任务分配ID：同标题沿用原ID，标题改写的任务按相似度沿用原ID，
+    其余任务由文档与标题锚点派生新ID（与已有ID冲突时追加序号）。返回沿用相似任务ID的匹配记录
+    """
+    unclaimed = {}
+    by_title = {}
+    for task in previous:
+        if task.get('id'):
+            unclaimed[task['id']] = task
+            # 同名任务按出现顺序依次沿用
+            by_title.setdefault(task.get('title'), []).append(task['id'])
+
+    pending = []
+    for task in tasks:
+        same_title = by_title.get(task.get('title'))
+        if same_title:
+            task['id'] = same_title.pop(0)
+            del unclaimed[task['id']]
+        else:
+            pending.append(task)
+
+    index = NgramIndex()
+    for task_id, task in unclaimed.items():
+        index.add(task_id, task.get('title', ''))
+
+    matches = []
+    used = {task['id'] for task in tasks if task.get('id')} | set(unclaimed)
+    for task in pending:
+        match = index.best_match(task.get('title', ''))
+        if match:
+            task_id, score = match
+            task['id'] = task_id
+            index.remove(task_id)
+            matches.append({'id': task_id, 'from': unclaimed[task_id].get('title'), 'to': task.get('title'), 'score': round(score, 3)})
+            continue
+        base = derive_task_id(task, phase)
+        task_id, suffix = base, 0
+        while task_id in used:
+            suffix += 1
+            task_id = f"{base}-{suffix}"
+        task['id'] = task_id
+        used.add(task_id)
+    return matches
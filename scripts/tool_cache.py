@@ -0,0 +1,280 @@
+#!/usr/bin/env python3
+"""
+文档工具共享缓存
+所有脚本的可再生缓存（解析结果、HTTP响应、Git挖掘结果）统一存放在一个目录中：
+按命名空间划分，条目可携带内容哈希用于校验，总大小超过上限时按最近访问时间（LRU）淘汰，
+写入采用临时文件 + os.replace，多个CI作业并发读写同一目录也不会读到半写的条目
+"""
+
+import os
+import re
+import json
+import time
+import hashlib
+import argparse
+import tempfile
+import threading
+from typing import Any, Dict, List, Optional, Tuple
+
+
+DEFAULT_MAX_MB = 100
+# 淘汰到上限的该比例为止，避免每次写入都触发淘汰
+EVICT_TARGET_RATIO = 0.8
+# 超过该时间仍未被重命名的临时文件视为崩溃残留
+STALE_TMP_SECONDS = 3600
+STATS_LOG = "stats.jsonl"
+STATS_LOG_MAX_LINES = 1000
+NAMESPACE_PATTERN = re.compile(r'^[a-z0-9][a-z0-9-]*$')
+STAT_KEYS = ('hits', 'misses', 'stale', 'writes')
+
+
+def default_cache_root(project_root: str = ".") -> str:
+    """共享缓存目录，可通过 DOC_TOOLS_CACHE_DIR 指定（如CI中多个作业共用一个目录）"""
+    return os.environ.get('DOC_TOOLS_CACHE_DIR') or os.path.join(project_root, ".cache", "doc-tools", "cache")
+
+
+def default_max_bytes() -> int:
+    """缓存大小上限，可通过 DOC_TOOLS_CACHE_MAX_MB 调整"""
+    return int(float(os.environ.get('DOC_TOOLS_CACHE_MAX_MB', DEFAULT_MAX_MB)) * 1024 * 1024)
+
+
+class ToolCache:
+    """命名空间化的磁盘缓存，每个条目一个JSON文件，文件修改时间记录最近访问时间"""
+
+    def __init__(self, root: str, max_bytes: Optional[int] = None):
+        self.root = root
+        self.max_bytes = max_bytes if max_bytes is not None else default_max_bytes()
+        self.stats = {}
+        self.evictions = 0
+        self._size = None
+        self._lock = threading.Lock()
+
+    def _path(self, namespace: str, key: str) -> str:
+        if not NAMESPACE_PATTERN.match(namespace):
+            raise ValueError(f"无效的缓存命名空间: {namespace!r}")
+        digest = hashlib.sha256(key.encode('utf-8')).hexdigest()
+        return os.path.join(self.root, namespace, digest[:2], digest + ".json")
+
+    def _count(self, namespace: str, stat: str):
+        with self._lock:
+            counters = self.stats.setdefault(namespace, {key: 0 for key in STAT_KEYS})
+            counters[stat] += 1
+
+    def get(self, namespace: str, key: str, content_hash: Optional[str] = None) -> Optional[Any]:
+        """
+        读取缓存值，不存在、损坏或内容哈希不一致时返回None。
+        命中时刷新文件修改时间，作为LRU淘汰的依据
+        """
+        path = self._path(namespace, key)
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                entry = json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError, UnicodeDecodeError):
+            self._count(namespace, 'misses')
+            return None
+        if entry.get('key') != key:
+            self._count(namespace, 'misses')
+            return None
+        if content_hash is not None and entry.get('hash') != content_hash:
+            self._count(namespace, 'stale')
+            return None
+        try:
+            os.utime(path)
+        except OSError:
+            # 条目可能刚被其他进程淘汰，不影响本次读取
+            pass
+        self._count(namespace, 'hits')
+        return entry.get('value')
+
+    def put(self, namespace: str, key: str, value: Any, content_hash: Optional[str] = None):
+        """原子写入缓存值（值必须可以序列化为JSON），写入后总大小超过上限时淘汰最久未访问的条目"""
+        path = self._path(namespace, key)
+        directory = os.path.dirname(path)
+        os.makedirs(directory, exist_ok=True)
+        data = json.dumps({'key': key, 'hash': content_hash, 'value': value}, ensure_ascii=False).encode('utf-8')
+        try:
+            previous = os.path.getsize(path)
+        except OSError:
+            previous = 0
+
+        fd, tmp_path = tempfile.mkstemp(dir=directory, prefix='.', suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                f.write(data)
+            os.replace(tmp_path, path)
+        except BaseException:
+            try:
+                os.unlink(tmp_path)
+            except OSError:
+                pass
+            raise
+
+        self._count(namespace, 'writes')
+        with self._lock:
+            if self._size is None:
+                self._size = sum(size for _, _, size in self._entries())
+            else:
+                self._size += len(data) - previous
+            over_limit = self._size > self.max_bytes
+        if over_limit:
+            self.prune()
+
+    def delete(self, namespace: str, key: str):
+        try:
+            os.unlink(self._path(namespace, key))
+        except FileNotFoundError:
+            pass
+
+    def _entries(self, namespace: Optional[str] = None) -> List[Tuple[str, float, int]]:
+        """列出条目 (路径, 最近访问时间, 大小)，顺带清理崩溃残留的临时文件"""
+        entries = []
+        top = os.path.join(self.root, namespace) if namespace else self.root
+        now = time.time()
+        for dirpath, _, filenames in os.walk(top):
+            for filename in filenames:
+                path = os.path.join(dirpath, filename)
+                try:
+                    stat = os.stat(path)
+                except FileNotFoundError:
+                    continue
+                if filename.endswith('.tmp'):
+                    if now - stat.st_mtime > STALE_TMP_SECONDS:
+                        try:
+                            os.unlink(path)
+                        except FileNotFoundError:
+                            pass
+                elif filename.endswith('.json') and dirpath != self.root:
+                    entries.append((path, stat.st_mtime, stat.st_size))
+        return entries
+
+    def prune(self, max_bytes: Optional[int] = None) -> int:
+        """按最近访问时间从旧到新淘汰条目，直到总大小不超过上限的80%；返回淘汰的条目数"""
+        max_bytes = self.max_bytes if max_bytes is None else max_bytes
+        entries = self._entries()
+        total = sum(size for _, _, size in entries)
+        removed = 0
+        if total > max_bytes:
+            target = max_bytes * EVICT_TARGET_RATIO
+            for path, _, size in sorted(entries, key=lambda entry: entry[1]):
+                if total <= target:
+                    break
+                try:
+                    os.unlink(path)
+                    removed += 1
+                except FileNotFoundError:
+                    # 已被并发运行的其他作业淘汰
+                    pass
+                total -= size
+        with self._lock:
+            self._size = total
+            self.evictions += removed
+        return removed
+
+    def clear(self, namespace: Optional[str] = None) -> int:
+        """删除全部条目（或一个命名空间的条目），返回删除的条目数"""
+        removed = 0
+        for path, _, _ in self._entries(namespace):
+            try:
+                os.unlink(path)
+                removed += 1
+            except FileNotFoundError:
+                pass
+        with self._lock:
+            self._size = None
+        return removed
+
+    def usage(self) -> Dict[str, Dict[str, int]]:
+        """各命名空间的条目数与字节数"""
+        usage = {}
+        for path, _, size in self._entries():
+            namespace = os.path.relpath(path, self.root).split(os.sep)[0]
+            summary = usage.setdefault(namespace, {'entries': 0, 'bytes': 0})
+            summary['entries'] += 1
+            summary['bytes'] += size
+        return usage
+
+    def record_stats(self, source: str):
+        """把本进程的命中统计追加到统计日志（单行追加写入，并发进程不会互相覆盖）"""
+        if not self.stats and not self.evictions:
+            return
+        os.makedirs(self.root, exist_ok=True)
+        line = json.dumps({'time': int(time.time()), 'source': source, 'stats': self.stats,
+                           'evictions': self.evictions}, ensure_ascii=False)
+        with open(os.path.join(self.root, STATS_LOG), 'a', encoding='utf-8') as f:
+            f.write(line + '\n')
+
+    def load_stats(self) -> Dict[str, Any]:
+        """汇总统计日志：{'namespaces': {命名空间: 计数}, 'evictions': n, 'runs': n}"""
+        totals = {'namespaces': {}, 'evictions': 0, 'runs': 0}
+        path = os.path.join(self.root, STATS_LOG)
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                lines = f.readlines()
+        except FileNotFoundError:
+            return totals
+        for line in lines:
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError:
+                # 并发写入时可能截断的行
+                continue
+            totals['runs'] += 1
+            totals['evictions'] += record.get('evictions', 0)
+            for namespace, counters in record.get('stats', {}).items():
+                summary = totals['namespaces'].setdefault(namespace, {key: 0 for key in STAT_KEYS})
+                for key in STAT_KEYS:
+                    summary[key] += counters.get(key, 0)
+        if len(lines) > STATS_LOG_MAX_LINES:
+            # 只保留最近的记录
+            fd, tmp_path = tempfile.mkstemp(dir=self.root, prefix='.', suffix='.tmp')
+            with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                f.writelines(lines[-STATS_LOG_MAX_LINES:])
+            os.replace(tmp_path, path)
+        return totals
+
+    def summary(self) -> str:
+        """本进程的命中统计，供各脚本结束时输出"""
+        parts = []
+        for namespace, counters in sorted(self.stats.items()):
+            parts.append(f"{namespace} 命中 {counters['hits']}/未命中 {counters['misses']}"
+                         + (f"/失效 {counters['stale']}" if counters['stale'] else ""))
+        if self.evictions:
+            parts.append(f"淘汰 {self.evictions} 个条目")
+        return "，".join(parts)
+
+
+def format_usage(cache: ToolCache) -> str:
+    usage = cache.usage()
+    totals = cache.load_stats()
+    total_bytes = sum(summary['bytes'] for summary in usage.values())
+    lines = [f"📦 共享缓存 {cache.root}：{total_bytes / 1024 / 1024:.2f} MB / 上限 {cache.max_bytes / 1024 / 1024:.0f} MB"]
+    for namespace in sorted(set(usage) | set(totals['namespaces'])):
+        summary = usage.get(namespace, {'entries': 0, 'bytes': 0})
+        counters = totals['namespaces'].get(namespace, {key: 0 for key in STAT_KEYS})
+        lookups = counters['hits'] + counters['misses'] + counters['stale']
+        rate = f"{counters['hits'] / lookups * 100:.0f}%" if lookups else "-"
+        lines.append(f"  {namespace}: {summary['entries']} 个条目，{summary['bytes'] / 1024:.1f} KB，"
+                     f"命中率 {rate}（命中 {counters['hits']}，未命中 {counters['misses']}，失效 {counters['stale']}）")
+    lines.append(f"  最近 {totals['runs']} 次运行共淘汰 {totals['evictions']} 个条目")
+    return '\n'.join(lines)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='查看或清理文档工具共享缓存')
+    parser.add_argument('command', choices=['stats', 'prune', 'clear'], help='stats 查看用量与命中率，prune 按上限淘汰，clear 清空')
+    parser.add_argument('--root', default='.', help='仓库根目录')
+    parser.add_argument('--namespace', help='clear 只清空该命名空间')
+    parser.add_argument('--max-mb', type=float, help='缓存大小上限（MB）')
+    args = parser.parse_args()
+
+    max_bytes = int(args.max_mb * 1024 * 1024) if args.max_mb is not None else None
+    cache = ToolCache(default_cache_root(args.root), max_bytes)
+    if args.command == 'prune':
+        print(f"🧹 已淘汰 {cache.prune()} 个条目")
+    elif args.command == 'clear':
+        print(f"🗑️ 已删除 {cache.clear(args.namespace)} 个条目")
+    print(format_usage(cache))
+
+
+if __name__ == "__main__":
+    main()
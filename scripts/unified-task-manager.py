@@ -12,13 +12,30 @@ import argparse
 from datetime import datetime
 from typing import List, Dict, Any, Optional
 
+from parse_tasks import TaskParser, TaskScanCache
+from plan_stream import load_plan
+from plan_validator import PlanValidator, format_report
+from task_identity import assign_task_ids
+from task_history import TaskHistoryMiner
+from tool_cache import ToolCache, default_cache_root
+from pipeline_stages import StageRunner, StageInputs
+from sync_journal import default_journal_dir
+
 
 class UnifiedTaskManager:
-    def __init__(self, project_root: str = "."):
+    def __init__(self, project_root: str = ".", repository: Optional[str] = None, resources=None, force: bool = False):
         self.project_root = project_root
+        # 批量同步时由 fleet 指定仓库并传入共享资源（连接池、速率额度、解析缓存）
+        self.repository = repository
+        self.resources = resources
+        # 解析结果、HTTP响应与Git挖掘结果共用一个有大小上限的缓存目录
+        self.cache = ToolCache(default_cache_root(project_root))
+        self.scan_cache = resources.scan_cache if resources else TaskScanCache(self.cache)
         self.docs_dir = os.path.join(project_root, "docs")
         self.json_file = os.path.join(self.docs_dir, "project-plan-structured.json")
         self.project_data = {}
+        # 输入没有变化的阶段跳过（force 时全部重新运行）
+        self.stages = StageRunner(project_root, force=force)
         
         # 模块权重分配
         self.module_weights = {
@@ -48,14 +65,15 @@ class UnifiedTaskManager:
             'parse-only': '仅解析文档任务',
             'sync-only': '仅同步到GitHub Issues',
             'full-sync': '完整同步（解析+同步）',
+            'plan': '生成同步计划（解析+离线dry-run）',
+            'bidirectional': '双向同步（Issues状态回写文档）',
             'status-check': '检查项目状态'
         }
     
     def load_project_data(self) -> Dict[str, Any]:
         """加载权威数据源"""
         try:
-            with open(self.json_file, 'r', encoding='utf-8') as f:
-                self.project_data = json.load(f)
+            self.project_data = load_plan(self.json_file)
             print(f"✅ 已加载权威数据源: {self.json_file}")
             return self.project_data
         except FileNotFoundError:
@@ -66,7 +84,14 @@ class UnifiedTaskManager:
             sys.exit(1)
     
     def save_project_data(self):
-        """保存权威数据源"""
+        """保存权威数据源（写入前先通过结构校验，校验失败时不覆盖原文件）"""
+        report = PlanValidator().validate(self.project_data)
+        if report['errors'] or report['warnings']:
+            print(format_report(report))
+        if report['errors']:
+            print(f"❌ 错误: 项目数据未通过结构校验（{len(report['errors'])} 个错误），未写入 {self.json_file}")
+            sys.exit(1)
+        
         try:
             with open(self.json_file, 'w', encoding='utf-8') as f:
                 json.dump(self.project_data, f, ensure_ascii=False, indent=2)
@@ -76,63 +101,15 @@ class UnifiedTaskManager:
             sys.exit(1)
     
     def extract_tasks_from_md(self, file_path: str) -> List[Dict[str, Any]]:
-        """从Markdown文件中提取任务信息"""
-        tasks = []
-        
-        try:
-            with open(file_path, 'r', encoding='utf-8') as f:
-                content = f.read()
-        except FileNotFoundError:
+        """从Markdown文件中提取任务信息（正文字段按记录的字节范围在需要时再提取）"""
+        if not os.path.exists(file_path):
             print(f"⚠️ 警告: 找不到文件 {file_path}")
-            return tasks
-        except Exception as e:
-            print(f"❌ 错误: 无法读取文件 {file_path} - {e}")
-            return tasks
-        
-        # 改进的正则表达式，支持多种状态符号格式
-        task_pattern = r'###\s*([✅🔄⏸☐\[x\]\[~\]\[\s\]]?)\s*(.*?)\s*(?:@done\((.*?)\))?\n\n([\s\S]*?)\n(?=\n###|\Z)'
-        task_blocks = re.finditer(task_pattern, content, re.DOTALL)
-        
-        for match in task_blocks:
-            status_symbol = match.group(1).strip()
-            title = match.group(2).strip()
-            completion_date = match.group(3)
-            task_content = match.group(4).strip()
-            
-            # 优先从内容中提取状态
-            status = "☐ 未开始"  # 默认状态
-            status_pattern = r'\*\*状态\*\*:\s*(.*?)(?=\n|$)'
-            status_match = re.search(status_pattern, task_content)
-            if status_match:
-                status = status_match.group(1).strip()
-            else:
-                # 如果内容中没有状态，根据符号判断
-                status_map = {
-                    '✅': '✅ 已完成',
-                    '[x]': '✅ 已完成',
-                    '🔄': '🔄 进行中',
-                    '[~]': '🔄 进行中',
-                    '⏸': '⏸ 暂停/待定',
-                    '☐': '☐ 未开始',
-                    '[ ]': '☐ 未开始',
-                    '': '☐ 未开始'
-                }
-                status = status_map.get(status_symbol, '☐ 未开始')
-            
-            # 清理标题中的状态符号
-            title = re.sub(r'^[✅🔄⏸☐\[x\]\[~\]\[\s\]]\s*', '', title).strip()
-            
-            task = {
-                'title': title,
-                'status': status,
-                'extractedAt': datetime.now().isoformat()
-            }
-            
-            if completion_date:
-                task['completionDate'] = completion_date
-                
-            tasks.append(task)
+            return []
         
+        tasks = TaskParser(docs_path=self.docs_dir, scan_cache=self.scan_cache).extract_tasks_from_md(file_path)
+        extracted_at = datetime.now().isoformat()
+        for task in tasks:
+            task['extractedAt'] = extracted_at
         return tasks
     
     def calculate_task_progress(self, tasks: List[Dict[str, Any]]) -> Dict[str, Any]:
@@ -206,6 +183,9 @@ class UnifiedTaskManager:
                 md_file_path = os.path.join(self.docs_dir, self.phase_files[phase])
                 if os.path.exists(md_file_path):
                     tasks = self.extract_tasks_from_md(md_file_path)
+                    # 沿用已分配的任务ID，标题改写的任务按相似度沿用原ID
+                    for match in assign_task_ids(phase_detail.get('tasks', []), tasks, phase):
+                        print(f"🔗 任务标题已改写，沿用ID {match['id']}（相似度 {match['score']}）: {match['from']} -> {match['to']}")
                     phase_detail['tasks'] = tasks
                     
                     # 计算阶段进度
@@ -219,6 +199,12 @@ class UnifiedTaskManager:
                     print(f"⚠️ 警告: 找不到文件 {md_file_path}")
                     phase_detail.setdefault('tasks', [])
         
+        # 从文档Git历史中补充缺失的开始/完成时间
+        miner = TaskHistoryMiner(self.project_root, self.cache)
+        filled = miner.apply(self.project_data, miner.mine())
+        if filled:
+            print(f"🕒 已从Git历史补充 {filled} 个任务的开始/完成时间")
+        
         # 计算并更新总体进度
         overall_progress = self.calculate_overall_progress()
         self.project_data['overallProgress'] = f"{overall_progress}%"
@@ -230,27 +216,121 @@ class UnifiedTaskManager:
         print(f"✅ 同步完成！共更新 {updated_count} 个任务，总体进度 {overall_progress}%")
         return updated_count
     
+    def _get_github_credentials(self) -> Optional[tuple]:
+        """读取GitHub凭据，未配置时返回None"""
+        token = os.environ.get('GITHUB_TOKEN')
+        repo_name = self.repository or os.environ.get('GITHUB_REPOSITORY')
+        if not token or not repo_name:
+            return None
+        return token, repo_name
+    
     def sync_to_github_issues(self):
         """同步任务到GitHub Issues"""
         print("🔄 开始同步任务到GitHub Issues...")
         
-        # 这里可以调用现有的create_github_issues.py功能
-        # 为了简化，我们暂时模拟这个功能
-        print("✅ GitHub Issues同步功能已集成（待实现）")
-        return True
+        credentials = self._get_github_credentials()
+        if credentials is None:
+            print("⚠️ 跳过GitHub Issues同步：未设置GITHUB_TOKEN或GITHUB_REPOSITORY")
+            return True
+        
+        from create_github_issues import GitHubIssueCreator
+        shared = {}
+        if self.resources:
+            shared = {'github': self.resources.github, 'pool': self.resources.pool, 'budget': self.resources.budget}
+        creator = GitHubIssueCreator(*credentials, cache=self.cache, docs_path=self.docs_dir,
+                                     project_root=self.project_root, **shared)
+        urls = creator.create_issues_from_docs(self.json_file)
+        print(f"✅ GitHub Issues同步完成，共处理 {len(urls)} 个Issues")
+        # 出错时没有处理任何Issue
+        return bool(urls)
+    
+    def _phase_inputs(self) -> StageInputs:
+        """阶段文档与脚本：解析阶段与Issue同步阶段共同的输入"""
+        return StageInputs(self.project_root).files(
+            *[os.path.join('docs', file_name) for file_name in self.phase_files.values()]
+        ).scripts()
+    
+    def parse_stage(self) -> int:
+        """解析阶段：阶段文档与计划JSON（已分配的任务ID、模块状态）都没有变化时沿用上次生成的计划JSON"""
+        plan_file = os.path.relpath(self.json_file, self.project_root)
+        return self.stages.run('parse', self._phase_inputs().files(plan_file), [plan_file], self.sync_from_markdown,
+                               lambda count: count is not None)
+    
+    def issues_stage(self) -> bool:
+        """Issue同步阶段：计划、文档与同步配置都没有变化，且上次同步没有留下未完成的操作时跳过"""
+        inputs = self._phase_inputs().files(os.path.relpath(self.json_file, self.project_root)).env('SUBTASK_SYNC_MODE')
+        inputs.value('credentials', self._get_github_credentials() is not None)
+        inputs.value('repository', self.repository or os.environ.get('GITHUB_REPOSITORY'))
+        checkpoint = os.path.join(default_journal_dir(self.project_root), "checkpoint.json")
+        return self.stages.run('issues', inputs, [], self.sync_to_github_issues,
+                               lambda synced: synced and not os.path.exists(checkpoint))
+    
+    def plan_github_sync(self):
+        """离线生成GitHub Issues同步计划（dry-run，不访问网络）"""
+        from sync_planner import build_plan, default_snapshot_file, render_text, render_json
+        
+        plan = build_plan(self.json_file, default_snapshot_file(self.project_root))
+        text = render_text(plan)
+        print(text)
+        
+        plan_file = os.path.join(self.project_root, ".cache", "doc-tools", "sync-plan.json")
+        os.makedirs(os.path.dirname(plan_file), exist_ok=True)
+        with open(plan_file, 'w', encoding='utf-8') as f:
+            f.write(render_json(plan))
+        print(f"✅ JSON格式同步计划已写入: {plan_file}")
+        
+        # 在GitHub Actions中把计划写入运行摘要，方便评审者查看文档变更对Issue的影响
+        step_summary = os.environ.get('GITHUB_STEP_SUMMARY')
+        if step_summary:
+            with open(step_summary, 'a', encoding='utf-8') as f:
+                f.write(f"```diff\n{text}\n```\n")
+        return plan['summary']
+    
+    def sync_from_github_issues(self):
+        """双向同步：把游标之后变更的Issue状态写回文档，再刷新权威数据源"""
+        credentials = self._get_github_credentials()
+        if credentials is None:
+            print("❌ 错误: 执行双向同步需要设置GITHUB_TOKEN和GITHUB_REPOSITORY")
+            return None
+        
+        from github import Github
+        from sync_bidirectional import BidirectionalSync
+        token, repo_name = credentials
+        github = self.resources.github if self.resources and self.resources.github else Github(token)
+        syncer = BidirectionalSync(github.get_repo(repo_name), project_root=self.project_root)
+        result = syncer.run()
+        if result['applied']:
+            self.sync_from_markdown()
+        return result
     
     def run_mode(self, mode: str):
         """根据指定模式运行任务"""
         print(f"🚀 执行模式: {self.modes.get(mode, mode)}")
-        
+        try:
+            return self._dispatch_mode(mode)
+        finally:
+            summary = self.cache.summary()
+            if summary:
+                print(f"📦 共享缓存: {summary}")
+            if self.stages.stats['run'] or self.stages.stats['skipped']:
+                print(f"🧱 {self.stages.summary()}")
+            self.cache.record_stats('unified-task-manager')
+    
+    def _dispatch_mode(self, mode: str):
         if mode == 'parse-only':
-            return self.sync_from_markdown()
+            return self.parse_stage()
         elif mode == 'sync-only':
-            return self.sync_to_github_issues()
+            return self.issues_stage()
         elif mode == 'full-sync':
-            task_count = self.sync_from_markdown()
-            self.sync_to_github_issues()
+            task_count = self.parse_stage()
+            self.issues_stage()
             return task_count
+        elif mode == 'plan':
+            self.parse_stage()
+            return self.plan_github_sync()
+        elif mode == 'bidirectional':
+            result = self.sync_from_github_issues()
+            return None if result is None else result['applied']
         elif mode == 'status-check':
             self.load_project_data()
             overall_progress = self.calculate_overall_progress()
@@ -262,15 +342,44 @@ class UnifiedTaskManager:
             print(f"❌ 未知模式: {mode}")
             return None
 
+def run_fleet(config_file: str, default_mode: str, workers: Optional[int] = None, force: bool = False):
+    """批量同步：各项目共享线程池、速率额度、连接池与解析缓存，单个项目失败不影响其他项目"""
+    from fleet_sync import FleetRunner, SharedResources, load_fleet_config
+    
+    config = load_fleet_config(config_file)
+    workers = workers or config.get('workers', 4)
+    resources = SharedResources(os.environ.get('GITHUB_TOKEN'), workers)
+    runner = FleetRunner(
+        config.get('projects', []),
+        lambda project, shared: UnifiedTaskManager(project['root'], project.get('repository'), shared, force),
+        resources,
+        workers=workers,
+        default_mode=default_mode
+    )
+    try:
+        results = runner.run()
+    finally:
+        resources.close()
+    print(runner.summary(results))
+    if any(result['status'] != 'ok' for result in results):
+        sys.exit(1)
+
 def main():
     """主函数"""
     parser = argparse.ArgumentParser(description='统一任务管理器')
-    parser.add_argument('--mode', choices=['parse-only', 'sync-only', 'full-sync', 'status-check'], 
+    parser.add_argument('--mode', choices=['parse-only', 'sync-only', 'full-sync', 'plan', 'bidirectional', 'status-check'], 
                        default='full-sync', help='执行模式')
+    parser.add_argument('--fleet', help='批量同步配置文件（JSON），并发处理其中列出的多个项目')
+    parser.add_argument('--workers', type=int, help='批量同步的并发数（默认读取配置文件，否则为4）')
+    parser.add_argument('--force', action='store_true', help='忽略阶段输入指纹，所有阶段重新运行')
     
     args = parser.parse_args()
     
-    manager = UnifiedTaskManager()
+    if args.fleet:
+        run_fleet(args.fleet, args.mode, args.workers, args.force)
+        return
+    
+    manager = UnifiedTaskManager(force=args.force)
     result = manager.run_mode(args.mode)
     
     if result is not None:
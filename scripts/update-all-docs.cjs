@@ -166,7 +166,12 @@ async function updateAllDocs() {
 
   // 步骤7: 生成文档统计报告
   logStep(7, '生成文档统计报告');
-  try {
+  // 优先使用并行、增量的 Python 统计脚本（内容没有变化时不重写 doc-stats.md），不可用时回退到简单统计
+  const statsOutput = runCommand('python3 scripts/doc_stats.py', '生成文档统计报告');
+  if (statsOutput !== null) {
+    log(statsOutput.trim(), 'blue');
+    successCount++;
+  } else try {
     const stats = generateDocStats();
     const reportPath = path.join(DOCS_DIR, 'doc-stats.md');
     fs.writeFileSync(reportPath, stats);
@@ -5,14 +5,47 @@
 """
 
 import os
+import sys
 import subprocess
-import json
 import re
+import time
+import argparse
 from datetime import datetime
 
-# 获取Git提交历史
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+from parse_tasks import TaskBodyLoader
+from plan_stream import load_plan
+from git_access import GitRepository
+from tool_cache import ToolCache, default_cache_root
+
+# Conventional Commits 类型及其在发布说明中的标题与顺序
+COMMIT_TYPES = {
+    'feat': '✨ 新功能',
+    'fix': '🐛 问题修复',
+    'perf': '⚡ 性能优化',
+    'refactor': '♻️ 重构',
+    'docs': '📝 文档',
+    'test': '✅ 测试',
+    'build': '📦 构建',
+    'ci': '👷 持续集成',
+    'style': '💄 代码格式',
+    'chore': '🔧 杂项',
+    'revert': '⏪ 回退',
+    'other': '📌 其他'
+}
+CONVENTIONAL_PATTERN = re.compile(r'^(\w+)(?:\(([^)]*)\))?(!)?[:：]\s*(.+)$')
+PATH_PATTERN = re.compile(r'[\w@.-]+(?:/[\w@.*-]+)+/?')
+WORD_PATTERN = re.compile(r'[a-z][a-z0-9]{2,}|[\u4e00-\u9fff]+')
+# 提交说明中过于常见、不能说明关联任务的英文词
+STOP_WORDS = {'add', 'the', 'and', 'for', 'with', 'update', 'fix', 'feat', 'use', 'from', 'into', 'support'}
+UNLINKED_PHASE = '未关联任务'
+# 开发Changelog统计的提交时间范围（与 `git log --since "1 month ago"` 对应，多留一天余量）
+HISTORY_WINDOW_DAYS = 31
+
+# 获取Git提交历史（浅克隆时先加深到覆盖最近一个月）
 def get_git_commits():
     try:
+        GitRepository().ensure_since(time.time() - HISTORY_WINDOW_DAYS * 86400)
         result = subprocess.run(
             ["git", "log", "--since", "1 month ago", "--pretty=format:%h %an %ad %s", "--date=short"],
             capture_output=True, text=True, check=True
@@ -25,8 +58,7 @@ def get_git_commits():
 # 读取任务状态
 def get_project_status():
     try:
-        with open("docs/project-plan-structured.json", "r", encoding="utf-8") as f:
-            return json.load(f)
+        return load_plan("docs/project-plan-structured.json")
     except Exception as e:
         print(f"读取项目计划失败: {e}")
         return {}
@@ -34,6 +66,7 @@ def get_project_status():
 # 获取最近修改的文件（排除changelog文件本身）
 def get_recently_modified_files():
     try:
+        GitRepository().ensure_commit("HEAD^")
         result = subprocess.run(
             ["git", "diff", "--name-only", "HEAD^..HEAD"],
             capture_output=True, text=True, check=True
@@ -45,6 +78,154 @@ def get_recently_modified_files():
         print(f"获取最近修改文件失败: {e}")
         return []
 
+# 提取用于关键词匹配的词元：英文单词 + 中文二元组
+def keyword_tokens(text):
+    tokens = set()
+    for word in WORD_PATTERN.findall(text.lower()):
+        if word[0] >= '\u4e00':
+            tokens.update(word[i:i + 2] for i in range(max(len(word) - 1, 1)))
+        elif word not in STOP_WORDS:
+            tokens.add(word)
+    return tokens
+
+# 解析 Conventional Commits 格式的提交说明，返回 (类型, 作用域, 说明)
+def parse_commit_subject(subject):
+    match = CONVENTIONAL_PATTERN.match(subject)
+    if match and match.group(1).lower() in COMMIT_TYPES:
+        return match.group(1).lower(), match.group(2), match.group(4)
+    return 'other', None, subject
+
+# 一次 git log 流式读取区间内的提交及其修改的文件
+def get_commits_in_range(revision_range):
+    process = subprocess.Popen(
+        ["git", "-c", "core.quotepath=off", "log", "--no-merges", "--no-renames", "--name-only",
+         "--pretty=format:%x00%h%x1f%an%x1f%ad%x1f%s", "--date=short", revision_range],
+        stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True, encoding="utf-8"
+    )
+    commit = None
+    for line in process.stdout:
+        line = line.rstrip('\n')
+        if line.startswith('\x00'):
+            if commit:
+                yield commit
+            sha, author, date, subject = line[1:].split('\x1f', 3)
+            commit = {'sha': sha, 'author': author, 'date': date, 'subject': subject, 'files': []}
+        elif line and commit:
+            commit['files'].append(line)
+    if commit:
+        yield commit
+    # git 出错时只输出少量错误信息，读完标准输出后再读取不会阻塞
+    error = process.stderr.read().strip()
+    if process.wait() != 0:
+        raise RuntimeError(f"无法读取提交区间 {revision_range}: {error}")
+
+# 读取区间内的提交，按区间端点解析出的提交哈希缓存：端点不变时区间内的提交也不变
+def load_commits_in_range(revision_range, cache=None):
+    # 浅克隆中区间起点可能还不在本地，先按需加深
+    GitRepository().ensure_range(revision_range)
+    if cache is None:
+        return list(get_commits_in_range(revision_range))
+    result = subprocess.run(["git", "rev-parse", revision_range], capture_output=True, text=True)
+    if result.returncode != 0:
+        raise RuntimeError(f"无法解析提交区间 {revision_range}: {result.stderr.strip()}")
+    endpoints = result.stdout.strip()
+    commits = cache.get('git-log', revision_range, endpoints)
+    if commits is None:
+        commits = list(get_commits_in_range(revision_range))
+        cache.put('git-log', revision_range, commits, endpoints)
+    return commits
+
+class TaskLinkIndex:
+    """提交与计划任务的关联索引：相关文件路径索引 + 任务标题关键词倒排索引"""
+
+    def __init__(self, project_status, docs_path="docs"):
+        self.tasks = []
+        self.files = {}
+        self.directories = {}
+        self.keywords = {}
+        loader = TaskBodyLoader(docs_path)
+        for phase_detail in project_status.get('phaseDetails', []):
+            phase = phase_detail.get('phase', '')
+            for task in phase_detail.get('tasks', []):
+                index = len(self.tasks)
+                tokens = keyword_tokens(task.get('title', ''))
+                self.tasks.append({'phase': phase, 'title': task.get('title', ''), 'tokens': len(tokens)})
+                for token in tokens:
+                    self.keywords.setdefault(token, set()).add(index)
+                # 计划中缺少任务来源时按阶段文档中的同名任务读取相关文件
+                related = loader.load(task, phase).get('related_files') or []
+                for entry in related if isinstance(related, list) else [related]:
+                    for path in PATH_PATTERN.findall(entry):
+                        if path.endswith('/'):
+                            self.directories.setdefault(path.rstrip('/'), set()).add(index)
+                        else:
+                            self.files.setdefault(path, set()).add(index)
+        loader.close()
+
+    def _match_paths(self, files):
+        linked = set()
+        for path in files:
+            linked |= self.files.get(path, set())
+            # 相关文件写成目录时，匹配目录下的所有文件
+            parent = path
+            while '/' in parent:
+                parent = parent.rsplit('/', 1)[0]
+                linked |= self.directories.get(parent, set())
+        return linked
+
+    def _match_keywords(self, subject):
+        tokens = keyword_tokens(subject)
+        shared = {}
+        for token in tokens:
+            for index in self.keywords.get(token, ()):
+                shared[index] = shared.get(index, 0) + 1
+        # 至少共享两个词元，且覆盖任务标题一半以上的词元，只取得分最高的任务
+        candidates = [
+            (count / self.tasks[index]['tokens'], index) for index, count in shared.items()
+            if count >= 2 and count * 2 >= self.tasks[index]['tokens']
+        ]
+        return {max(candidates)[1]} if candidates else set()
+
+    def link(self, commit):
+        """返回提交关联的任务序号"""
+        return self._match_paths(commit['files']) | self._match_keywords(commit['subject'])
+
+# 为任意提交区间（如 v1.0.0..v1.1.0）生成按阶段与提交类型分组的发布说明
+def generate_release_notes(revision_range, cache=None):
+    project_status = get_project_status()
+    index = TaskLinkIndex(project_status)
+    groups = {}
+    total = linked_count = 0
+    for commit in load_commits_in_range(revision_range, cache):
+        total += 1
+        commit_type, scope, description = parse_commit_subject(commit['subject'])
+        linked = index.link(commit)
+        linked_count += bool(linked)
+        phases = {}
+        for task_index in linked:
+            task = index.tasks[task_index]
+            phases.setdefault(task['phase'], []).append(task['title'])
+        for phase, titles in (phases or {UNLINKED_PHASE: []}).items():
+            groups.setdefault(phase, {}).setdefault(commit_type, []).append((commit, scope, description, titles))
+
+    lines = [f"## 发布说明 {revision_range}", "", f"共 {total} 个提交，其中 {linked_count} 个关联到计划任务", ""]
+    phase_order = [detail.get('phase') for detail in project_status.get('phaseDetails', [])] + [UNLINKED_PHASE]
+    for phase in sorted(groups, key=lambda name: phase_order.index(name) if name in phase_order else len(phase_order)):
+        lines.append(f"### {phase}")
+        lines.append("")
+        for commit_type in COMMIT_TYPES:
+            entries = groups[phase].get(commit_type)
+            if not entries:
+                continue
+            lines.append(f"#### {COMMIT_TYPES[commit_type]}")
+            lines.append("")
+            for commit, scope, description, titles in entries:
+                scope_text = f"**{scope}**: " if scope else ""
+                task_text = f"（任务: {'、'.join(sorted(set(titles)))}）" if titles else ""
+                lines.append(f"- {scope_text}{description} ({commit['sha']}, {commit['author']}, {commit['date']}){task_text}")
+            lines.append("")
+    return '\n'.join(lines)
+
 # 更新开发Changelog
 def update_dev_changelog():
     commits = get_git_commits()
@@ -136,4 +317,25 @@ def update_dev_changelog():
     print(f"已更新开发Changelog: {changelog_path}")
 
 if __name__ == "__main__":
-    update_dev_changelog()
\ No newline at end of file
+    parser = argparse.ArgumentParser(description='更新开发Changelog，或为指定提交区间生成发布说明')
+    parser.add_argument('--range', dest='revision_range', help='提交区间（如 v1.0.0..v1.1.0），指定时输出发布说明')
+    parser.add_argument('--output', help='发布说明输出文件（默认输出到标准输出）')
+    args = parser.parse_args()
+
+    if args.revision_range:
+        cache = ToolCache(default_cache_root())
+        try:
+            notes = generate_release_notes(args.revision_range, cache)
+        except RuntimeError as e:
+            print(f"❌ 生成发布说明失败: {e}", file=sys.stderr)
+            sys.exit(1)
+        finally:
+            cache.record_stats('update_dev_changelog')
+        if args.output:
+            with open(args.output, "w", encoding="utf-8") as f:
+                f.write(notes + "\n")
+            print(f"已生成发布说明: {args.output}")
+        else:
+            print(notes)
+    else:
+        update_dev_changelog()
\ No newline at end of file